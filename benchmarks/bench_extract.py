@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Compare the old full-page BeautifulSoup summary with the streaming extractor.
+
+Runs offline against a synthetic news homepage: a large <head>, inline
+scripts, navigation and many article teasers, similar in shape to the
+homepages listed in data/sources.json. Reports bytes read and CPU time per
+call for each approach.
+
+    python -m benchmarks.bench_extract [--size-kb 2048] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from src.modules.extract import SummaryExtractor, etree
+
+
+def synthetic_homepage(size_kb: int) -> bytes:
+    head = (
+        "<head><title>News</title>"
+        + "<script>var config = {};"
+        + "x=1;" * 4000
+        + "</script>"
+        + "<style>"
+        + ".c{color:red}" * 2000
+        + "</style></head>"
+    )
+    nav = (
+        "<nav>"
+        + "".join(f"<a href='/s{i}'>Section {i}</a>" for i in range(200))
+        + "</nav>"
+    )
+    intro = "".join(
+        f"<p>Lead paragraph {i} with enough words to count as a real sentence.</p>"
+        for i in range(3)
+    )
+    teaser = (
+        "<article><h2><a href='/story'>Headline about things</a></h2>"
+        "<div class='meta'><span>2 hours ago</span></div>"
+        "<p>A teaser paragraph describing the story in a sentence or two.</p>"
+        "</article>"
+    )
+    body = [f"<html>{head}<body>{nav}<main>{intro}"]
+    size = sum(len(part) for part in body)
+    while size < size_kb * 1024:
+        body.append(teaser)
+        size += len(teaser)
+    body.append("</main></body></html>")
+    return "".join(body).encode()
+
+
+def chunked(page: bytes, chunk_size: int):
+    for start in range(0, len(page), chunk_size):
+        yield page[start : start + chunk_size]
+
+
+def old_summary(page: bytes) -> tuple[str, int]:
+    soup = BeautifulSoup(page, "html.parser")
+    paragraphs = soup.find_all("p")
+    return " ".join(p.text for p in paragraphs[:3]), len(page)
+
+
+def measure(label: str, run, repeat: int) -> None:
+    start = time.process_time()
+    for _ in range(repeat):
+        summary, bytes_read = run()
+    cpu_ms = (time.process_time() - start) / repeat * 1000
+    print(f"{label:<28} {bytes_read:>12,} {cpu_ms:>10.2f}   {summary[:40]!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = synthetic_homepage(args.size_kb)
+    print(f"synthetic homepage: {len(page):,} bytes\n")
+    print(f"{'approach':<28} {'bytes read':>12} {'cpu ms':>10}   summary")
+    measure("bs4 html.parser, full page", lambda: old_summary(page), args.repeat)
+    backends = ["html.parser"] + (["lxml"] if etree is not None else [])
+    for backend in backends:
+        extractor = SummaryExtractor(backend=backend)
+        measure(
+            f"streaming, {backend}",
+            lambda: extractor.extract_counting(chunked(page, extractor.chunk_size)),
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Measure bytes per post for a large in-memory history.
+
+Builds a synthetic corpus shaped like real feeds (links sharing a few site
+prefixes, guids equal to links, HTML descriptions of a few hundred bytes)
+and reports what tracemalloc sees per post for the old dict-backed Post,
+the slotted Post, and PostColumns.
+
+    python -m benchmarks.bench_memory [--posts 100000]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from typing import Callable, Optional
+
+from src.modules.columns import PostColumns
+from src.modules.rss import Feed, Post
+
+SITES = [f"https://www.site{i}.example/news/world/" for i in range(20)]
+WORDS = (
+    "the government said on monday that the new plan would cut prices for "
+    "millions of households across the country after weeks of talks with "
+    "officials from the energy industry and local councils who warned that"
+).split()
+
+
+class LegacyPost:
+    """Post as it was before: a plain class with a per-instance dict"""
+
+    def __init__(
+        self,
+        title: str,
+        link: str,
+        description: str,
+        guid: Optional[str] = None,
+        published: Optional[float] = None,
+        read: bool = False,
+        body: str = "",
+    ) -> None:
+        self.title = title
+        self.link = link
+        self.description = description
+        self.body = body
+        self.topics: frozenset[str] = frozenset()
+        self.sentiment: Optional[float] = None
+        self.summary: Optional[str] = None
+        self.guid = guid or link
+        self.published = published
+        self.read = read
+
+
+def corpus(count: int) -> list[tuple]:
+    """Field tuples, so each representation builds its own strings"""
+    rng = random.Random(0)
+    rows = []
+    for n in range(count):
+        site = SITES[n % len(SITES)]
+        slug = f"story-{n}-{rng.randrange(10**6)}"
+        paragraphs = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 40)))
+            for _ in range(rng.randint(2, 4))
+        ]
+        rows.append(
+            (
+                " ".join(rng.choice(WORDS) for _ in range(10)).capitalize(),
+                site + slug,
+                "".join(f"<p>{paragraph}.</p>" for paragraph in paragraphs),
+                site + slug,
+                1.7e9 + n,
+            )
+        )
+    return rows
+
+
+def fresh(row: tuple) -> tuple:
+    """(title, link, description, guid, published) in Post's argument order"""
+    # copy every string, as parsing a feed would, so nothing is shared
+    # with the corpus or between representations
+    title, link, description, guid, published = row
+    return (
+        title.encode().decode(),
+        link.encode().decode(),
+        description.encode().decode(),
+        guid.encode().decode(),
+        published,
+    )
+
+
+def measure(build: Callable[[list[tuple]], object], rows: list[tuple]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    kept = build(rows)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del kept
+    return used / len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = corpus(args.posts)
+    feed = Feed("Feed", "https://www.site0.example", "https://site0.example/rss", "-")
+    raw = sum(len(row[0]) + len(row[1]) + len(row[2]) for row in rows) / len(rows)
+
+    def legacy(rows):
+        return [LegacyPost(*fresh(row)) for row in rows]
+
+    def slotted(rows):
+        return [Post(*fresh(row)) for row in rows]
+
+    def columns(rows):
+        table = PostColumns()
+        for row in rows:
+            table.append(feed, Post(*fresh(row)))
+        return table
+
+    print(f"{args.posts:,} posts, {raw:.0f} bytes of text each\n")
+    print(f"{'representation':<28} {'bytes/post':>10}")
+    baseline = None
+    for name, build in (
+        ("dict-backed Post (before)", legacy),
+        ("slotted, compressed Post", slotted),
+        ("PostColumns", columns),
+    ):
+        per_post = measure(build, rows)
+        baseline = baseline or per_post
+        print(f"{name:<28} {per_post:>10,.0f}  {per_post / baseline:>5.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Measure full-text search latency over a large synthetic archive.
+
+Fills a throwaway ArticleStore with generated posts spread over many feeds,
+in batches the way refreshes write them, then times store.search() for
+common words, rare words and typed-so-far prefixes.
+
+    python -m benchmarks.bench_search [--posts 300000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.modules.rss import Feed, Post
+from src.modules.store import ArticleStore
+
+COMMON = ["election", "climate", "market", "football", "science", "housing"]
+
+
+def vocabulary(size: int = 20000) -> list[str]:
+    rng = random.Random(0)
+    letters = "etaoinshrdlcumwfgypbvk"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(3, 10)
+        words.add("".join(rng.choice(letters) for _ in range(length)))
+    return sorted(words, key=lambda word: rng.random())
+
+
+VOCABULARY = vocabulary()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    # a skewed draw so some words are common and most are rare
+    picked = [VOCABULARY[int(rng.paretovariate(1.1)) % len(VOCABULARY)]]
+    picked += [rng.choice(VOCABULARY) for _ in range(words - 2)]
+    picked.append(rng.choice(COMMON))
+    rng.shuffle(picked)
+    return " ".join(picked)
+
+
+def fill(store: ArticleStore, count: int, feeds: int = 200, batch: int = 50) -> None:
+    rng = random.Random(1)
+    feed_objects = [
+        Feed(f"Feed {i}", f"https://f{i}.example", f"https://f{i}.example/rss", "-")
+        for i in range(feeds)
+    ]
+    for start in range(0, count, batch):
+        feed = feed_objects[(start // batch) % feeds]
+        posts = [
+            Post(
+                title=sentence(rng, 8),
+                link=f"{feed.website_link}/{n}",
+                description=f"<p>{sentence(rng, 60)}</p>",
+                published=n,
+            )
+            for n in range(start, min(start + batch, count))
+        ]
+        store.upsert_posts(feed, posts)
+
+
+def measure(store: ArticleStore, query: str, repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = store.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(
+        f"{query!r:<24} {len(hits):>6} {timings[len(timings) // 2]:>10.2f} "
+        f"{timings[-1]:>10.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=300000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ArticleStore(os.path.join(directory, "articles.db"))
+        start = time.perf_counter()
+        fill(store, args.posts)
+        elapsed = time.perf_counter() - start
+        print(f"indexed {args.posts:,} posts in {elapsed:.1f}s\n")
+        print(f"{'query':<24} {'hits':>6} {'median ms':>10} {'max ms':>10}")
+        frequent, rare = VOCABULARY[1], VOCABULARY[-1]
+        queries = ["election", frequent, rare, "climate market", "elec", rare[:3]]
+        for query in queries:
+            measure(store, query, args.repeat)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Measure sentiment scoring throughput on one core.
+
+Generates headline-and-teaser posts from a mix of lexicon and filler words,
+then scores them in batches the size a feed refresh produces. Reports posts
+per second for cold scoring (every post new) and for a warm cache (the same
+posts coming back on the next refresh).
+
+    python -m benchmarks.bench_sentiment [--posts 50000] [--batch 500]
+"""
+
+import argparse
+import random
+import time
+
+from src.modules.rss import Post
+from src.modules.sentiment import LEXICON, SentimentScorer
+
+FILLER = (
+    "the a of to in on for with as by at from government city report people "
+    "year week officials said new plan market team company police minister "
+    "school health water energy prices local national world first after"
+).split()
+
+
+def synthetic_posts(count: int, seed: int = 0) -> list[Post]:
+    rng = random.Random(seed)
+    sentiment_words = list(LEXICON) + ["not", "never"]
+
+    def text(words: int) -> str:
+        return " ".join(
+            rng.choice(sentiment_words) if rng.random() < 0.1 else rng.choice(FILLER)
+            for _ in range(words)
+        )
+
+    return [
+        Post(text(10), f"https://example.com/{i}", f"<p>{text(50)}</p>")
+        for i in range(count)
+    ]
+
+
+def run(posts: list[Post], scorer: SentimentScorer, batch: int) -> float:
+    start = time.process_time()
+    for offset in range(0, len(posts), batch):
+        scorer.score(posts[offset : offset + batch])
+    return len(posts) / (time.process_time() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    posts = synthetic_posts(args.posts)
+    scorer = SentimentScorer()
+    cold = run(posts, scorer, args.batch)
+    for post in posts:
+        post.sentiment = None
+    warm = run(posts, scorer, args.batch)
+
+    texts = [f"{post.title}\n{post.description}" for post in posts]
+    start = time.process_time()
+    for offset in range(0, len(texts), args.batch):
+        scorer.score_texts(texts[offset : offset + args.batch])
+    raw = len(texts) / (time.process_time() - start)
+
+    print(f"{args.posts:,} posts, batches of {args.batch}\n")
+    print(f"{'pass':<34} {'posts/s':>10}")
+    print(f"{'score_texts only (no markup)':<34} {raw:>10,.0f}")
+    print(f"{'score(), cold cache':<34} {cold:>10,.0f}")
+    print(f"{'score(), warm cache':<34} {warm:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Benchmark startup: imports and the first frame drawn from a session snapshot.
+
+Writes a sources file and a session snapshot of synthetic feeds, then
+starts fresh interpreters that do what main.py does before its first
+paint: import main, read the sources, restore the
+snapshot and draw the feed list on a VirtualScreen. Reports the time to
+that first frame, the slowest imports from one more run under
+``-X importtime``, and fails (exit status 1) if the
+median is over budget or if a heavy module was imported before it.
+
+    python -m benchmarks.bench_startup [--feeds 40] [--posts 30] [--repeat 5]
+        [--budget-ms 100] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# none of these may load before the first frame is on screen
+HEAVY = ("bs4", "feedparser", "requests", "numpy", "urllib3")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_session(workdir: str, feeds: int, posts: int) -> None:
+    from src.modules.rss import Feed, Post
+    from src.modules.snapshot import SessionSnapshot
+
+    sources = []
+    feed_objects = []
+    for n in range(feeds):
+        site = f"https://site{n}.example.com"
+        sources.append(
+            {"title": f"Feed {n}", "website_link": site, "feedId": f"{site}/rss"}
+        )
+        feed = Feed(f"Feed {n}", site, f"{site}/rss", f"About feed {n}. " * 20)
+        feed.posts = [
+            Post(
+                f"Story {i} from feed {n}",
+                f"{site}/story/{i}",
+                f"What happened in story {i}. " * 30,
+                published=1.7e9 - i * 3600,
+                read=i % 3 == 0,
+            )
+            for i in range(posts)
+        ]
+        feed_objects.append(feed)
+    with open(os.path.join(workdir, "sources.json"), "w") as file:
+        json.dump({"sources": sources}, file)
+    snapshot = SessionSnapshot(os.path.join(workdir, "session.snapshot"), posts)
+    snapshot.save(feed_objects, feeds // 2)
+
+
+def child(workdir: str) -> None:
+    """One launch, up to the first frame; results go to a file, not the pty"""
+    start = time.perf_counter()
+    import main  # noqa: F401  (its module-level imports are part of startup)
+    from benchmarks.screen import VirtualScreen
+    from src.modules.rss import FeedParser
+    from src.modules.snapshot import SessionSnapshot
+
+    imported = time.perf_counter()
+    with VirtualScreen() as stdscr:
+        feeds = FeedParser.read_sources(os.path.join(workdir, "sources.json"))
+        snapshot = SessionSnapshot(os.path.join(workdir, "session.snapshot"))
+        selected = snapshot.restore(feeds)
+        main.first_paint(stdscr, feeds, selected)
+        painted = time.perf_counter()
+        restored = sum(feed.posts_value.done() for feed in feeds)
+    with open(os.path.join(workdir, "child.json"), "w") as file:
+        json.dump(
+            {
+                "import_ms": (imported - start) * 1000,
+                "first_paint_ms": (painted - start) * 1000,
+                "restored": restored,
+                "heavy": [name for name in HEAVY if name in sys.modules],
+            },
+            file,
+        )
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Module name to its own import time in microseconds"""
+    self_us = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:") :].split("|")
+        self_us[name.strip()] = int(own)
+    return self_us
+
+
+def launch(workdir: str, importtime: bool = False) -> tuple[dict, dict, float]:
+    # -X importtime slows every import, so it is only on for the profile run
+    flags = ["-X", "importtime"] if importtime else []
+    start = time.perf_counter()
+    done = subprocess.run(
+        [sys.executable, *flags, "-m", "benchmarks.bench_startup"]
+        + ["--child", workdir],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if done.returncode:
+        sys.exit(f"startup run failed:\n{done.stderr[-2000:]}")
+    with open(os.path.join(workdir, "child.json")) as file:
+        result = json.load(file)
+    return result, parse_importtime(done.stderr), wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=40)
+    parser.add_argument("--posts", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--child", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_session(workdir, args.feeds, args.posts)
+        size = os.path.getsize(os.path.join(workdir, "session.snapshot"))
+        runs = [launch(workdir) for _ in range(args.repeat)]
+        _, self_us, _ = launch(workdir, importtime=True)
+
+    results = [result for result, _, _ in runs]
+    paint = statistics.median(result["first_paint_ms"] for result in results)
+    imports = statistics.median(result["import_ms"] for result in results)
+    wall = statistics.median(seconds for _, _, seconds in runs) * 1000
+    print(f"{args.feeds} feeds x {args.posts} posts, snapshot {size / 1024:.1f}KB")
+    print(f"repo imports       {imports:8.1f} ms (median of {args.repeat})")
+    print(f"first paint        {paint:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"process wall time  {wall:8.1f} ms (with interpreter start and exit)")
+    print(f"feeds restored     {results[-1]['restored']:8d}")
+
+    print(f"\nslowest imports ({sum(self_us.values()) / 1000:.1f} ms in all):")
+    for name, us in sorted(self_us.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    heavy = sorted({name for result in results for name in result["heavy"]})
+    if heavy:
+        failures.append(f"imported before first paint: {', '.join(heavy)}")
+    if paint > args.budget_ms:
+        failures.append(f"first paint {paint:.1f} ms over {args.budget_ms:.0f} ms")
+    if results[-1]["restored"] != args.feeds:
+        failures.append(f"only {results[-1]['restored']} feeds restored")
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nstartup within budget")
+
+
+if __name__ == "__main__":
+    main()
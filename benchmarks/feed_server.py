@@ -0,0 +1,219 @@
+"""A local HTTP server of synthetic feeds and homepages for offline benchmarks.
+
+Feed ``n`` is served at ``/feed/<n>`` (RSS for even ``n``, Atom for odd) and
+its homepage at ``/site/<n>/``. Everything is generated from ``seed``, so two
+servers with the same settings serve the same bytes. ``latency`` seconds are
+slept before every response, and ``error_rate`` of the feeds and homepages
+answer 404, the same ones every run. Query strings are ignored, so callers
+can add one to get past their own caches.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "the government said on monday that the new plan would cut prices for "
+    "millions of households across the country after weeks of talks with "
+    "officials from the energy industry and local councils who warned that "
+    "rising costs could hit schools hospitals and small businesses this winter"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def paragraphs(rng: random.Random, size: int) -> list[str]:
+    """Sentences grouped into paragraphs, about ``size`` bytes in all"""
+    result: list[str] = []
+    total = 0
+    while total < size:
+        paragraph = " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(3))
+        result.append(paragraph)
+        total += len(paragraph) + 7
+    return result
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # the streaming extractor hangs up once it has read enough
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FeedServer:
+    """Serve ``feeds`` synthetic feeds of ``entries`` entries each.
+
+    Use as a context manager; ``url`` is the base URL once it has started.
+    """
+
+    def __init__(
+        self,
+        feeds: int = 20,
+        entries: int = 50,
+        entry_bytes: int = 600,
+        page_bytes: int = 20000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.feeds = feeds
+        self.entries = entries
+        self.entry_bytes = entry_bytes
+        self.page_bytes = page_bytes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests = 0
+        self._server: Optional[_Server] = None
+        self._bodies: dict[str, tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def feed_url(self, n: int) -> str:
+        return f"{self.url}/feed/{n}"
+
+    def site_url(self, n: int) -> str:
+        return f"{self.url}/site/{n}/"
+
+    def broken(self, path: str) -> bool:
+        # a stable hash, so the same paths fail on every run
+        key = zlib.crc32(f"{self.seed}:{path}".encode()) / 2**32
+        return key < self.error_rate
+
+    def write_sources(self, path: str, query: str = "") -> None:
+        """A sources.json listing every feed, in FeedParser's format"""
+        sources = [
+            {
+                "title": f"Synthetic {n}",
+                "website_link": self.site_url(n) + query,
+                "feedId": self.feed_url(n) + query,
+                "description": "",
+            }
+            for n in range(self.feeds)
+        ]
+        with open(path, "w") as file:
+            json.dump({"sources": sources}, file)
+
+    def entries_for(self, n: int) -> list[dict]:
+        rng = random.Random(f"{self.seed}:{n}")
+        published = 1.7e9
+        entries = []
+        for i in range(self.entries):
+            published -= rng.randint(600, 7200)
+            entries.append(
+                {
+                    "title": sentence(rng, rng.randint(6, 12)).rstrip("."),
+                    "link": f"{self.site_url(n)}story/{i}",
+                    "description": "".join(
+                        f"<p>{p}</p>" for p in paragraphs(rng, self.entry_bytes)
+                    ),
+                    "published": published,
+                }
+            )
+        return entries
+
+    def rss(self, n: int) -> bytes:
+        items = "".join(
+            f"<item><title>{escape(e['title'])}</title><link>{e['link']}</link>"
+            f"<guid>{e['link']}</guid>"
+            f"<pubDate>{formatdate(e['published'], usegmt=True)}</pubDate>"
+            f"<description>{escape(e['description'])}</description></item>"
+            for e in self.entries_for(n)
+        )
+        return (
+            f'<?xml version="1.0"?><rss version="2.0"><channel>'
+            f"<title>Synthetic {n}</title><link>{self.site_url(n)}</link>"
+            f"<ttl>60</ttl>{items}</channel></rss>"
+        ).encode()
+
+    def atom(self, n: int) -> bytes:
+        entries = []
+        for e in self.entries_for(n):
+            updated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(e["published"]))
+            entries.append(
+                f"<entry><title>{escape(e['title'])}</title>"
+                f'<link href="{e["link"]}"/><id>{e["link"]}</id>'
+                f"<updated>{updated}</updated>"
+                f'<summary type="html">{escape(e["description"])}</summary></entry>'
+            )
+        return (
+            f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>Synthetic {n}</title><link href="{self.site_url(n)}"/>'
+            f"{''.join(entries)}</feed>"
+        ).encode()
+
+    def homepage(self, n: int) -> bytes:
+        rng = random.Random(f"{self.seed}:page:{n}")
+        head = (
+            f"<head><title>Synthetic {n}</title>"
+            f'<link rel="alternate" type="application/rss+xml" href="/feed/{n}">'
+            f"<script>{'var x = 1;' * 200}</script></head>"
+        )
+        nav = "".join(f"<a href='/section/{i}'>Section {i}</a>" for i in range(50))
+        body = "".join(f"<p>{p}</p>" for p in paragraphs(rng, self.page_bytes))
+        page = f"<html>{head}<body><nav>{nav}</nav><main>{body}</main></body></html>"
+        return page.encode()
+
+    def body(self, path: str) -> Optional[tuple[str, bytes]]:
+        """(content type, body) for a path, or None for a 404"""
+        parts = path.split("?")[0].strip("/").split("/")
+        if len(parts) != 2 or not parts[1].isdigit() or self.broken(path):
+            return None
+        kind, n = parts[0], int(parts[1])
+        if n >= self.feeds or kind not in ("feed", "site"):
+            return None
+        key = f"{kind}/{n}"
+        with self._lock:
+            if key not in self._bodies:
+                if kind == "site":
+                    self._bodies[key] = ("text/html", self.homepage(n))
+                elif n % 2:
+                    self._bodies[key] = ("application/atom+xml", self.atom(n))
+                else:
+                    self._bodies[key] = ("application/rss+xml", self.rss(n))
+            return self._bodies[key]
+
+    def __enter__(self) -> "FeedServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                found = server.body(self.path.split("?")[0])
+                content_type, body = found or ("text/plain", b"not found")
+                self.send_response(200 if found else 404)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                # every run should measure the network path, not the cache
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,82 @@
+"""Real curses on a pseudo-terminal, so render paths run without a terminal.
+
+Inside ``with VirtualScreen() as stdscr:`` the process's stdin and stdout
+are the slave end of a pty of the given size, and a thread drains the
+master end, counting the bytes curses writes. Everything is put back on
+exit; print nothing while the screen is up.
+"""
+
+import curses
+import fcntl
+import os
+import struct
+import sys
+import termios
+import threading
+from typing import Optional
+
+
+class VirtualScreen:
+    def __init__(
+        self, lines: int = 40, columns: int = 120, term: str = "xterm"
+    ) -> None:
+        self.lines = lines
+        self.columns = columns
+        self.term = term
+        self.bytes_written = 0
+        self._saved_fds: list[int] = []
+        self._saved_env: dict[str, Optional[str]] = {}
+        self._drain: Optional[threading.Thread] = None
+
+    def _read(self, master: int) -> None:
+        while True:
+            try:
+                data = os.read(master, 65536)
+            except OSError:
+                return
+            if not data:
+                return
+            self.bytes_written += len(data)
+
+    def __enter__(self) -> "curses._CursesWindow":
+        from src.modules.ui import PaneManager
+
+        self._master, slave = os.openpty()
+        size = struct.pack("HHHH", self.lines, self.columns, 0, 0)
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, size)
+        self._drain = threading.Thread(target=self._read, args=(self._master,))
+        self._drain.daemon = True
+        self._drain.start()
+
+        sys.stdout.flush()
+        self._saved_fds = [os.dup(0), os.dup(1)]
+        os.dup2(slave, 0)
+        os.dup2(slave, 1)
+        os.close(slave)
+        env = {
+            "TERM": self.term,
+            "LINES": str(self.lines),
+            "COLUMNS": str(self.columns),
+        }
+        for name, value in env.items():
+            self._saved_env[name] = os.environ.get(name)
+            os.environ[name] = value
+        self.stdscr = PaneManager.init_display()
+        return self.stdscr
+
+    def __exit__(self, *exc) -> None:
+        from src.modules.ui import PaneManager
+
+        PaneManager.end_display(self.stdscr)
+        sys.stdout.flush()
+        for fd, saved in enumerate(self._saved_fds):
+            os.dup2(saved, fd)
+            os.close(saved)
+        for name, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        # with the slave closed, the drain thread reads what is left and stops
+        self._drain.join(timeout=5)
+        os.close(self._master)
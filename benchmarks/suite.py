@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite: loading, fetching, summarizing and rendering.
+
+Starts a local FeedServer of synthetic RSS/Atom feeds and homepages, then
+times FeedParser.load_feeds_from_file, Feed.get_latest_posts,
+Feed.generate_summary_from_website, and the FeedView and PostView render
+paths on a VirtualScreen. Caches are pointed at a temporary directory and
+every round asks for fresh URLs, so each number is a cold fetch. Results
+are written as JSON and checked against the thresholds file; the exit
+status is 1 if any metric is past its threshold.
+
+    python -m benchmarks.suite [--feeds 40] [--entries 50] [--latency 0.02]
+        [--error-rate 0.05] [--repeat 5] [--output bench_results.json]
+
+Thresholds only apply to the settings recorded in the thresholds file;
+with other settings the check is skipped.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Optional
+
+from benchmarks.feed_server import FeedServer
+from benchmarks.screen import VirtualScreen
+
+THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+SETTINGS = ("feeds", "entries", "entry_bytes", "page_bytes", "latency", "error_rate")
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def timed(run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def bench_load_feeds(server: FeedServer, workdir: str, repeat: int) -> dict:
+    from src.modules.loader import FeedLoader
+    from src.modules.rss import FeedParser
+
+    seconds = []
+    failed = 0
+    for attempt in range(repeat):
+        path = os.path.join(workdir, f"sources-{attempt}.json")
+        server.write_sources(path, query=f"?round={attempt}")
+        # every synthetic feed is on one host; real sources are spread over
+        # many, so the per-host cap is lifted to match
+        loader = FeedLoader(per_host=16)
+
+        def load() -> None:
+            nonlocal failed
+            feeds = FeedParser.load_feeds_from_file(path, loader)
+            for feed in feeds:
+                for value in (feed.posts_value, feed.description_value):
+                    value.wait()
+                    failed += value.exception() is not None
+
+        seconds.append(timed(load))
+        loader.shutdown()
+    median = statistics.median(seconds)
+    return {
+        "load_feeds_from_file.seconds": (median, "s"),
+        "load_feeds_from_file.feeds_per_s": (server.feeds / median, "feeds/s"),
+        "load_feeds_from_file.failures": (failed / repeat, "fetches"),
+    }
+
+
+def healthy_feed(server: FeedServer) -> int:
+    for n in range(server.feeds):
+        feed, site = server.feed_url(n), server.site_url(n)
+        if not server.broken(feed[len(server.url) :]) and not server.broken(
+            site[len(server.url) :]
+        ):
+            return n
+    raise SystemExit("every synthetic feed is broken; lower --error-rate")
+
+
+def bench_fetches(server: FeedServer, repeat: int) -> dict:
+    from src.modules.rss import Feed
+
+    n = healthy_feed(server)
+    posts_ms, summary_ms = [], []
+    for attempt in range(repeat * 4):
+        query = f"?fetch={attempt}"
+        feed = Feed(
+            f"Synthetic {n}",
+            server.site_url(n) + query,
+            server.feed_url(n) + query,
+            "",
+        )
+        posts_ms.append(timed(feed.get_latest_posts) * 1000)
+        summary_ms.append(timed(feed.generate_summary_from_website) * 1000)
+    return {
+        "get_latest_posts.ms": (statistics.median(posts_ms), "ms"),
+        "generate_summary_from_website.ms": (statistics.median(summary_ms), "ms"),
+    }
+
+
+def synthetic_feeds(server: FeedServer) -> list:
+    """Feeds with posts and descriptions already in, so renders never fetch"""
+    from src.modules.rss import Feed, Post
+
+    feeds = []
+    for n in range(server.feeds):
+        entries = server.entries_for(n)
+        feed = Feed(f"Synthetic {n}", server.site_url(n), server.feed_url(n), "")
+        feed.description = entries[0]["description"]
+        feed.posts = [
+            Post(e["title"], e["link"], e["description"], published=e["published"])
+            for e in entries
+        ]
+        feeds.append(feed)
+    return feeds
+
+
+def bench_renders(server: FeedServer, frames: int) -> dict:
+    from src.modules.ui import (
+        FeedManager,
+        FeedView,
+        PaneManager,
+        PostView,
+        Renderer,
+    )
+
+    feeds = synthetic_feeds(server)
+    posts = feeds[0].posts
+    results = {}
+    screen = VirtualScreen()
+
+    def frame(draw: Callable[[int], None], index: int) -> float:
+        start = time.perf_counter()
+        Renderer.begin_frame()
+        draw(index)
+        Renderer.end_frame()
+        return (time.perf_counter() - start) * 1000
+
+    with screen as stdscr:
+        top, middle, bottom = PaneManager.create_panes(stdscr)
+        manager = FeedManager(feeds)
+
+        def feed_frame(index: int) -> None:
+            manager.select(index % len(feeds))
+            FeedView.render(top, middle, manager)
+
+        def post_frame(index: int) -> None:
+            selected = index % len(posts)
+            PostView.display_posts(middle, posts, selected)
+            PostView.display_post_content(bottom, posts[selected])
+
+        for name, draw in (("feed_view", feed_frame), ("post_view", post_frame)):
+            for pane in (top, middle, bottom):
+                pane.invalidate()
+            frame(draw, 0)
+            before = screen.bytes_written
+            times = [frame(draw, index) for index in range(1, frames + 1)]
+            # give the drain thread a moment to catch up with the last frame
+            time.sleep(0.1)
+            results[f"{name}.render_ms"] = (statistics.median(times), "ms")
+            results[f"{name}.render_p95_ms"] = (percentile(times, 0.95), "ms")
+            results[f"{name}.bytes_per_frame"] = (
+                (screen.bytes_written - before) / frames,
+                "bytes",
+            )
+    return results
+
+
+def check(results: dict, settings: dict, path: str) -> Optional[list[str]]:
+    """Metrics past their thresholds, or None if the thresholds do not apply"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        thresholds = json.load(file)
+    if thresholds.get("settings") != settings:
+        return None
+    regressions = []
+    for name, limit in thresholds["metrics"].items():
+        value = results[name]["value"]
+        if "max" in limit and value > limit["max"]:
+            regressions.append(f"{name} = {value:.3f}, above {limit['max']}")
+        if "min" in limit and value < limit["min"]:
+            regressions.append(f"{name} = {value:.3f}, below {limit['min']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=40)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--entry-bytes", type=int, default=600)
+    parser.add_argument("--page-bytes", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--thresholds", default=THRESHOLDS)
+    args = parser.parse_args()
+    settings = {name: getattr(args, name) for name in SETTINGS}
+
+    workdir = tempfile.mkdtemp(prefix="myeditorial-bench-")
+    # keep the HTTP cache, memo and article store away from the user's own
+    os.environ["XDG_CACHE_HOME"] = os.path.join(workdir, "cache")
+    os.environ["XDG_DATA_HOME"] = os.path.join(workdir, "data")
+
+    results = {}
+    with FeedServer(seed=0, **settings) as server:
+        for name, run in (
+            ("load", lambda: bench_load_feeds(server, workdir, args.repeat)),
+            ("fetch", lambda: bench_fetches(server, args.repeat)),
+            ("render", lambda: bench_renders(server, args.frames)),
+        ):
+            for metric, (value, unit) in run().items():
+                results[metric] = {"value": value, "unit": unit}
+
+    regressions = check(results, settings, args.thresholds)
+    report = {
+        "settings": settings,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "results": results,
+        "regressions": regressions,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{'metric':<40} {'value':>12}")
+    for name, result in results.items():
+        print(f"{name:<40} {result['value']:>12,.3f} {result['unit']}")
+    print(f"\nresults written to {args.output}")
+    if regressions is None:
+        print("thresholds skipped: settings differ from the thresholds file")
+    elif regressions:
+        print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    else:
+        print("all metrics within thresholds")
+
+
+if __name__ == "__main__":
+    main()
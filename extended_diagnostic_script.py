@@ -30,9 +30,13 @@ def diagnostic_check():
 
         # Load feeds
         logging.info("Loading feeds from file...")
-        feeds = FeedParser.load_feeds_from_file(
+        result = FeedParser.load_feeds_with_result(
             "data/sources.json"
         )  # <-- Replace with your actual path
+        feeds = result.feeds
+        for failure in result.failures:
+            logging.warning(f"Failed to load {failure}")
+            DebugView.display_debug_message(f"Failed to load {failure}", bottom_pane)
         if not feeds:
             logging.warning("No feeds found.")
             DebugView.display_debug_message("No feeds found.", bottom_pane)
@@ -3,19 +3,19 @@
 # lets you open up the original story to learn more. id use the chatgpt api to generate
 # summaries and provide an overview of what all my rss feeds are saying
 
-import curses
-
-from requests import post
-from src.modules.rss import Feed, FeedParser
-from src.modules.ui import (
-    FeedManager,
-    PaneManager,
-    InputHandler,
-    FeedView,
-    PostView,
-    PostManager,
-    StateManager,
-)
+import os
+import sys
+from typing import TYPE_CHECKING
+
+from src.modules.metrics import Metrics
+from src.utils.helpers import default_data_dir
+from src.utils.log import LEVELS, LogSetup
+
+if TYPE_CHECKING:
+    from src.modules.summarize import SummaryPipeline
+
+# everything else (requests, feedparser, bs4, numpy) is imported where it is
+# first needed, so the last session is on screen before any of it loads
 
 import argparse
 from argparse import Namespace
@@ -24,73 +24,181 @@ from argparse import Namespace
 def parse_args() -> Namespace:
     parser = argparse.ArgumentParser(description="RSS Reader with Feed Discovery")
     parser.add_argument("--find", type=str, help="Discover RSS feeds based on keywords")
+    parser.add_argument(
+        "--summarizer",
+        type=str,
+        help="URL of a summarization service (default: local extractive summaries)",
+    )
+    parser.add_argument("--summary-model", type=str, default="")
+    parser.add_argument(
+        "--summary-rpm", type=float, default=60, help="Summary requests per minute"
+    )
+    parser.add_argument(
+        "--summary-tpm", type=float, default=40000, help="Summary tokens per minute"
+    )
+    parser.add_argument(
+        "--export",
+        choices=("jsonl", "csv", "opml"),
+        help="Fetch every feed and write its posts without starting the UI",
+    )
+    parser.add_argument(
+        "--output", type=str, default="-", help="Where to export to (default: stdout)"
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=os.path.join(default_data_dir(), "metrics.json"),
+        help="Where to write fetch and render timings on exit (.prom for Prometheus)",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=LEVELS,
+        default=os.environ.get("MYEDITORIAL_LOG_LEVEL", "INFO").upper(),
+        help="Starting log level; L cycles it while the reader runs",
+    )
+    parser.add_argument("--log-file", type=str, default="ui.log")
     return parser.parse_args()
 
 
-def main(stdscr):
-    stdscr.keypad(True)
-    args = parse_args()
-    feed_objects = []
+def make_summarizer(args: Namespace) -> "SummaryPipeline":
+    from src.modules.summarize import HTTPBackend, SummaryPipeline
+
+    if not args.summarizer:
+        return SummaryPipeline()
+    backend = HTTPBackend(
+        args.summarizer,
+        model=args.summary_model,
+        api_key=os.environ.get("MYEDITORIAL_SUMMARY_KEY"),
+    )
+    return SummaryPipeline(
+        backend,
+        requests_per_minute=args.summary_rpm,
+        tokens_per_minute=args.summary_tpm,
+    )
+
+
+def export(args: Namespace) -> None:
+    """Stream posts out as each feed arrives, then report throughput to stderr"""
+    from src.modules.export import export_feeds
+    from src.modules.loader import FeedLoader
+    from src.modules.rss import FeedParser
 
     if args.find:
-        # Discover RSS feeds based on keywords
         feed_objects = FeedParser.discover_feeds(args.find)
     else:
-        feed_objects = FeedParser.load_feeds_from_file("data/sources.json")
+        feed_objects = FeedParser.read_sources("data/sources.json")
+    loader = FeedLoader()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        stats = export_feeds(feed_objects, out, args.export, loader)
+    except BrokenPipeError:
+        # the reader went away (e.g. piped into head); that is not an error,
+        # but stop the interpreter failing to flush stdout on the way out
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    finally:
+        loader.shutdown()
+        if out is not sys.stdout:
+            out.close()
+    print(stats, file=sys.stderr)
+
+
+def main(stdscr, args: Namespace):
+    # the UI is only imported when there is a screen
+    from src.modules.rss import FeedParser
+    from src.modules.snapshot import SessionSnapshot
+    from src.modules.ui import DebugView, PaneManager
+
+    stdscr.keypad(True)
+    # file writes happen on a listener thread, never between keypresses
+    log = LogSetup(args.log_file, args.log_level, ring=DebugView.debug_messages)
+    snapshot = SessionSnapshot()
 
-    # Initialize the display and create panes
+    if args.find:
+        # discovered feeds are added to the list as each one validates
+        feed_objects = []
+        selected = None
+    else:
+        feed_objects = FeedParser.read_sources("data/sources.json")
+        # last session's lists, straight from disk, before anything is fetched
+        selected = snapshot.restore(feed_objects)
+
+    # Initialize the display and show the last session while the rest loads
     PaneManager.init_display()
-    top_pane, middle_pane, bottom_pane = PaneManager.create_panes(stdscr)
-
-    input_handler = InputHandler(stdscr)
-    state_manager = StateManager()
-
-    post_manager = None  # Will be initialized when a feed is selected
-    feed_manager = FeedManager(feed_objects)
-
-    while True:
-        current_state = state_manager.get_state()
-
-        if current_state == "feeds":
-            FeedView.display_feeds(
-                feed_objects, stdscr, top_pane, middle_pane, bottom_pane
-            )
-
-            selected_feed_posts = feed_manager.get_selected_feed_posts()
-            post_manager = PostManager(selected_feed_posts)
-        elif current_state == "posts":
-            if post_manager:
-                PostView.display_posts(
-                    top_pane, post_manager.posts, post_manager.selected_post_index
-                )
-                PostView.display_post_content(
-                    middle_pane, post_manager.get_current_post()
-                )
-
-        key = input_handler.get_input()
-
-        # Handle global key commands (like quitting the app)
-        if input_handler.is_quit(key):
-            break
-
-        # Handle navigation in posts view
-        if current_state == "feeds" and key == curses.KEY_ENTER:
-            selected_feed_posts = feed_manager.get_selected_feed_posts()
-            post_manager = PostManager(selected_feed_posts)
-            state_manager.set_state("posts")
-        if current_state == "posts":
-            if post_manager:
-                if input_handler.is_up(key):
-                    post_manager.get_previous_post()
-                elif input_handler.is_down(key):
-                    post_manager.get_next_post()
-
-    # End the display
-    PaneManager.end_display(stdscr)
+    if selected is not None:
+        first_paint(stdscr, feed_objects, selected)
+
+    from src.modules.app import ReaderApp
+    from src.modules.discovery import FeedDiscovery
+    from src.modules.fact_check import FactIndex
+    from src.modules.loader import FeedLoader
+    from src.modules.scheduler import RefreshScheduler
+    from src.modules.sentiment import SentimentScorer
+    from src.modules.similarity import SimilarityIndex
+    from src.modules.store import ArticleStore
+    from src.modules.topics import TopicFilter
+
+    store = ArticleStore()
+    summarizer = make_summarizer(args)
+    loader = FeedLoader(
+        store=store,
+        topics=TopicFilter("data/topics.csv"),
+        sentiment=SentimentScorer(),
+        summarizer=summarizer,
+        similarity=SimilarityIndex(),
+        facts=FactIndex(),
+    )
+    app = None
+    try:
+        # stored history is read and tagged on the workers, each feed ahead of
+        # its fetch, so the UI takes keys straight away; the refresh replaces it
+        loader.restore(feed_objects, background=True)
+        loader.refresh(feed_objects)
+
+        # Keep feeds fresh for as long as the UI is up; the app steps the scheduler
+        scheduler = RefreshScheduler(feed_objects, loader)
+
+        # input, fetches and refreshes share one event loop
+        app = ReaderApp(stdscr, feed_objects, loader, scheduler, log)
+        if selected is not None:
+            app.feed_manager.select(selected)
+        if args.find:
+            app.discover(args.find, FeedDiscovery.default())
+        app.run()
+    finally:
+        # End the display, saving the session even if the UI died
+        loader.shutdown()
+        if app is not None and not args.find:
+            snapshot.save(feed_objects, app.feed_manager.selected_feed_index)
+        summarizer.close()
+        store.close()
+        PaneManager.end_display(stdscr)
+        log.close()
+
+
+def first_paint(stdscr, feeds: list, selected: int) -> None:
+    """Draw the feed list from the snapshot, before the heavy modules load"""
+    from src.modules.ui import FeedManager, FeedView, PaneManager, Renderer
+
+    feed_manager = FeedManager(feeds)
+    feed_manager.select(selected)
+    top_pane, middle_pane, _ = PaneManager.create_panes(stdscr)
+    Renderer.begin_frame()
+    FeedView.render(top_pane, middle_pane, feed_manager)
+    Renderer.end_frame()
 
 
 if __name__ == "__main__":
-    curses.wrapper(main)
+    args = parse_args()
+    try:
+        if args.export:
+            export(args)
+        else:
+            import curses
+
+            curses.wrapper(main, args)
+    finally:
+        Metrics.default().dump(args.metrics)
 
 
 # At some point, I want to have an automatic link-fixing mechanism to find updated links for feeds.
@@ -0,0 +1,526 @@
+import bisect
+import curses
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from src.modules.discovery import FeedCandidate, FeedDiscovery
+from src.modules.events import FETCH, KEY, RESIZE, EventLoop
+from src.modules.fact_check import FactIndex
+from src.modules.loader import FeedLoader
+from src.modules.metrics import Metrics
+from src.modules.rss import Feed, FeedParser
+from src.modules.scheduler import RefreshScheduler
+from src.modules.similarity import SimilarityIndex
+from src.modules.ui import (
+    DebugView,
+    DigestView,
+    FeedManager,
+    FeedView,
+    InputHandler,
+    PaneManager,
+    PostManager,
+    PostView,
+    Renderer,
+    SearchView,
+    StateManager,
+    StoriesView,
+)
+
+if TYPE_CHECKING:
+    from curses import _CursesWindow
+
+    from src.utils.log import LogSetup
+else:
+    _CursesWindow = "Any"
+
+ENTER_KEYS = (curses.KEY_ENTER, 10, 13)
+BACKSPACE_KEYS = (curses.KEY_BACKSPACE, 127, 8)
+ESCAPE = 27
+
+
+class ReaderApp:
+    """The reader's main loop: keys, fetch results and refresh timers.
+
+    Everything runs on one thread through an EventLoop. Keys are read without
+    blocking, FeedLoader workers post FETCH events when a feed or description
+    arrives, and the RefreshScheduler is stepped from a timer. A frame is
+    drawn only after something changed.
+    """
+
+    # longest the scheduler goes unchecked, since refreshes reschedule feeds
+    # from worker threads after the timer was set
+    scheduler_tick = 5.0
+    # how often the topics CSV is checked for edits
+    topics_poll = 2.0
+    # how often the log view checks for new messages
+    log_poll = 0.5
+
+    def __init__(
+        self,
+        stdscr: "_CursesWindow",
+        feeds: list[Feed],
+        loader: FeedLoader,
+        scheduler: Optional[RefreshScheduler] = None,
+        log: Optional["LogSetup"] = None,
+    ) -> None:
+        self.stdscr = stdscr
+        self.feeds = feeds
+        self.loader = loader
+        self.scheduler = scheduler
+        self.input_handler = InputHandler(stdscr)
+        self.state_manager = StateManager()
+        self.feed_manager = FeedManager(feeds, loader)
+        self.post_manager: Optional[PostManager] = None
+        self.open_feed: Optional[Feed] = None
+        # the `/` search mode; Backspace from a result's post returns to it
+        self.search_query = ""
+        self.search_hits: list = []
+        self.search_index = 0
+        self.search_ms = 0.0
+        self.posts_return_state = "feeds"
+        # cross-feed clusters of the same event, for the stories view, and
+        # claims from every post, to show how many other outlets back one up;
+        # the loader's workers fill both in, the UI only reads them
+        if loader.similarity is None:
+            loader.similarity = SimilarityIndex()
+        if loader.facts is None:
+            loader.facts = FactIndex()
+        self.similarity = loader.similarity
+        self.facts = loader.facts
+        self.stories: list = []
+        self.stories_index = 0
+        self._stories_seen = -1
+        self.feeds_by_link = {feed.feed_link: feed for feed in feeds}
+        # with --find, feeds join as discovery validates them, best first
+        self.discovering = False
+        self.feed_scores: list[float] = []
+        # the `d` view: every feed together, then each feed on its own
+        self.digest_index = 0
+        # the digest shown, and the posts it was asked for
+        self.digest: Optional[str] = None
+        self._digest_for: Optional[tuple] = None
+        # the bottom pane shows timings, or recent log messages after `l`
+        self.log = log
+        self.show_log = False
+        self._log_seen = 0
+        # mood and unread counts per topic, shown after each feed's title
+        self.badges: dict[int, str] = {}
+        for feed in feeds:
+            if feed.posts_value.done():
+                self.update_badge(feed)
+        self.dirty = True
+        self.top_pane, self.middle_pane, self.bottom_pane = PaneManager.create_panes(
+            stdscr
+        )
+
+        self.loop = EventLoop(stdscr.getch)
+        self.loop.on(KEY, self.on_key)
+        self.loop.on(RESIZE, self.on_resize)
+        self.loop.on(FETCH, self.on_fetch)
+        self.loop.on_idle = self.render
+        loader.add_listener(
+            lambda feed, stage, error: self.loop.post(FETCH, (feed, stage, error))
+        )
+        if loader.summarizer is not None:
+            loader.summarizer.add_listener(
+                lambda: self.loop.post(FETCH, (None, "summary", None))
+            )
+
+    def run(self) -> None:
+        self.stdscr.nodelay(True)
+        if self.scheduler:
+            self.loop.call_later(0, self._tick)
+        if self.loader.topics:
+            self.loop.call_later(self.topics_poll, self._watch_topics)
+        self.loop.call_later(self.log_poll, self._watch_log)
+        try:
+            self.loop.run()
+        finally:
+            self.stdscr.nodelay(False)
+            self.loop.close()
+
+    def on_key(self, key: int) -> None:
+        logging.debug("Key pressed: %s", key)
+        self.dirty = True
+        state = self.state_manager.get_state()
+        if state == "search":
+            self.on_search_key(key)
+        elif self.input_handler.is_quit(key):
+            self.loop.stop()
+        elif key == ord("l"):
+            self.show_log = not self.show_log
+        elif key == ord("L") and self.log is not None:
+            DebugView.debug_messages.append(f"Log level: {self.log.cycle_level()}")
+            self.show_log = True
+        elif key in (ord("["), ord("]")) and self.show_log:
+            DebugView.offset += 1 if key == ord("[") else -1
+        elif key == ord("/") and self.loader.store is not None:
+            self.state_manager.set_state("search")
+        elif key == ord("s") and state != "posts":
+            self.show_stories()
+        elif key == ord("d") and state != "posts" and self.loader.summarizer:
+            self.state_manager.set_state("digest")
+            self.update_digest()
+        elif state == "stories":
+            self.on_stories_key(key)
+        elif state == "digest":
+            self.on_digest_key(key)
+        elif state == "feeds" and not self.feeds:
+            pass
+        elif state == "feeds":
+            if key in ENTER_KEYS:
+                self.show_posts(self.feed_manager.get_current_feed())
+            else:
+                FeedView.handle_navigation(key, self.feed_manager)
+        elif self.post_manager is None:
+            if key in BACKSPACE_KEYS:
+                self.state_manager.set_state(self.posts_return_state)
+        elif key in BACKSPACE_KEYS:
+            self.post_manager.reset_selection()
+            self.state_manager.set_state(self.posts_return_state)
+        else:
+            PostView.handle_navigation(key, self.post_manager)
+            self.mark_current_read()
+
+    def on_search_key(self, key: int) -> None:
+        if key == ESCAPE:
+            self.state_manager.set_state("feeds")
+        elif key in ENTER_KEYS:
+            if self.search_hits:
+                self.post_manager = PostManager([hit.post for hit in self.search_hits])
+                self.post_manager.select(self.search_index)
+                self.open_feed = None
+                self.posts_return_state = "search"
+                self.state_manager.set_state("posts")
+        elif key in BACKSPACE_KEYS:
+            if not self.search_query:
+                self.state_manager.set_state("feeds")
+            else:
+                self.search(self.search_query[:-1])
+        elif key in (curses.KEY_UP, curses.KEY_DOWN):
+            self.move_search_selection(1 if key == curses.KEY_DOWN else -1)
+        elif key in (curses.KEY_PPAGE, curses.KEY_NPAGE):
+            rows = SearchView.list_view.rows
+            self.move_search_selection(rows if key == curses.KEY_NPAGE else -rows)
+        elif 32 <= key < 127:
+            self.search(self.search_query + chr(key))
+
+    def on_stories_key(self, key: int) -> None:
+        if key in BACKSPACE_KEYS or key == ESCAPE:
+            self.state_manager.set_state("feeds")
+        elif key in ENTER_KEYS:
+            if self.stories:
+                self.post_manager = PostManager(self.stories[self.stories_index].posts)
+                self.open_feed = None
+                self.posts_return_state = "stories"
+                self.state_manager.set_state("posts")
+        elif key in (curses.KEY_UP, curses.KEY_DOWN):
+            self.move_stories_selection(1 if key == curses.KEY_DOWN else -1)
+        elif key in (curses.KEY_PPAGE, curses.KEY_NPAGE):
+            rows = StoriesView.list_view.rows
+            self.move_stories_selection(rows if key == curses.KEY_NPAGE else -rows)
+
+    def on_digest_key(self, key: int) -> None:
+        if key in BACKSPACE_KEYS or key == ESCAPE:
+            self.state_manager.set_state("feeds")
+        elif key in (curses.KEY_UP, curses.KEY_DOWN):
+            step = 1 if key == curses.KEY_DOWN else -1
+            self.digest_index = max(0, min(self.digest_index + step, len(self.feeds)))
+            self.update_digest()
+
+    def digest_posts(self) -> list:
+        """The newest posts of the chosen feed, or a few from every feed"""
+        if self.digest_index > 0:
+            return self.feeds[self.digest_index - 1].posts_value.get([])
+        posts = []
+        for feed in self.feeds:
+            posts.extend(feed.posts_value.get([])[:3])
+        posts.sort(key=lambda post: post.published or 0.0, reverse=True)
+        return posts
+
+    def update_digest(self) -> None:
+        """Ask for the digest again if its posts changed or it is still pending"""
+        posts = self.digest_posts()
+        key = tuple(post.guid for post in posts)
+        if key != self._digest_for or self.digest is None:
+            self._digest_for = key
+            self.digest = self.loader.summarizer.digest(posts)
+
+    def move_stories_selection(self, delta: int) -> None:
+        last = max(0, len(self.stories) - 1)
+        self.stories_index = max(0, min(self.stories_index + delta, last))
+
+    def show_stories(self) -> None:
+        self.state_manager.set_state("stories")
+        self._stories_seen = self.similarity.generation
+        self.stories = self.similarity.stories()
+        self.stories_index = 0
+
+    def move_search_selection(self, delta: int) -> None:
+        last = max(0, len(self.search_hits) - 1)
+        self.search_index = max(0, min(self.search_index + delta, last))
+
+    def search(self, query: str) -> None:
+        """Run the query as typed; results update with every keystroke"""
+        self.search_query = query
+        start = time.perf_counter()
+        self.search_hits = self.loader.store.search(query) if query.strip() else []
+        self.search_ms = (time.perf_counter() - start) * 1000
+        self.search_index = 0
+
+    def on_resize(self, _key: int) -> None:
+        curses.update_lines_cols()
+        self.stdscr.erase()
+        self.stdscr.noutrefresh()
+        self.top_pane, self.middle_pane, self.bottom_pane = PaneManager.create_panes(
+            self.stdscr
+        )
+        self.dirty = True
+
+    def discover(self, query: str, discovery: FeedDiscovery) -> None:
+        """Search for feeds in the background, listing each as it checks out"""
+        self.discovering = True
+
+        def run() -> None:
+            try:
+                for candidate in discovery.discover(query):
+                    self.loop.post(FETCH, (candidate, "discovered", None))
+            except Exception as e:
+                logging.error(f"Error discovering feeds for {query!r}: {e}")
+            self.loop.post(FETCH, (None, "discovered", None))
+
+        threading.Thread(target=run, name="discovery", daemon=True).start()
+
+    def add_discovered(self, candidate: FeedCandidate) -> None:
+        """Insert a feed at its rank, keeping the selected feed selected"""
+        feed = FeedParser.feed_from_candidate(candidate)
+        index = bisect.bisect(self.feed_scores, -candidate.score)
+        self.feed_scores.insert(index, -candidate.score)
+        self.feeds.insert(index, feed)
+        self.feeds_by_link[feed.feed_link] = feed
+        if index <= self.feed_manager.selected_feed_index and len(self.feeds) > 1:
+            self.feed_manager.selected_feed_index += 1
+        if self.scheduler:
+            self.scheduler.add(feed)
+        self.loader.refresh([feed])
+
+    def on_fetch(self, event: tuple) -> None:
+        feed, stage, error = event
+        if stage == "discovered":
+            if feed is None:
+                self.discovering = False
+            else:
+                self.add_discovered(feed)
+            self.dirty = True
+            return
+        if stage == "summary":
+            # PostView reads summaries as it draws; a pending digest may be done
+            if self.state_manager.get_state() == "digest":
+                self.update_digest()
+            self.dirty = True
+            return
+        if error is not None:
+            logging.error(f"Error loading {stage} for {feed.title}: {error}")
+        if stage == "topics":
+            self.update_badge(feed)
+        if stage in ("posts", "restore") and error is None:
+            # already indexed on the worker; only recluster if posts went in
+            if (
+                self.state_manager.get_state() == "stories"
+                and self.similarity.generation != self._stories_seen
+            ):
+                self.refresh_stories()
+            self.update_badge(feed)
+            if feed is self.open_feed:
+                self.update_posts(feed)
+            if self.state_manager.get_state() == "digest":
+                self.update_digest()
+        self.dirty = True
+
+    def refresh_stories(self) -> None:
+        """Recluster the list in place, keeping the selected story selected"""
+        selected = self.stories[self.stories_index] if self.stories else None
+        self._stories_seen = self.similarity.generation
+        self.stories = self.similarity.stories()
+        self.stories_index = 0
+        if selected is not None:
+            for index, story in enumerate(self.stories):
+                if story.rows[0] == selected.rows[0]:
+                    self.stories_index = index
+                    break
+
+    def show_posts(self, feed: Feed) -> None:
+        """Switch to a feed's posts, showing a placeholder until they load"""
+        self.state_manager.set_state("posts")
+        self.posts_return_state = "feeds"
+        self.open_feed = feed
+        self.post_manager = None
+        if feed.posts_value.done():
+            self.update_posts(feed)
+        else:
+            self.loader.prioritize(feed)
+
+    def update_badge(self, feed: Feed) -> None:
+        parts = []
+        if feed.mood is not None:
+            parts.append(str(feed.mood))
+        if self.loader.topics is not None:
+            counts = self.loader.topics.unread_counts(feed.posts_value.get([]))
+            if counts:
+                top = counts.most_common(3)
+                parts.append(
+                    "[" + ", ".join(f"{name} {count}" for name, count in top) + "]"
+                )
+        if parts:
+            self.badges[id(feed)] = " ".join(parts)
+        else:
+            self.badges.pop(id(feed), None)
+
+    def mark_current_read(self) -> None:
+        """Mark the post on screen as read, in the store and in topic counts"""
+        if self.post_manager is None or self.open_feed is None:
+            return
+        post = self.post_manager.get_current_post()
+        if post.read:
+            return
+        if self.loader.store is not None:
+            self.loader.store.mark_read(self.open_feed, post)
+        else:
+            post.read = True
+        self.update_badge(self.open_feed)
+
+    def update_posts(self, feed: Feed) -> None:
+        posts = feed.posts
+        if not posts:
+            self.post_manager = None
+        elif self.post_manager is None:
+            self.post_manager = PostManager(posts)
+            self.mark_current_read()
+        else:
+            # a refresh replaced the list; stay on the same post if it survived
+            guid = self.post_manager.get_current_post().guid
+            self.post_manager.posts = posts
+            index = next((i for i, p in enumerate(posts) if p.guid == guid), 0)
+            self.post_manager.select(index)
+
+    def render(self) -> None:
+        if not self.dirty:
+            return
+        self.dirty = False
+        try:
+            Renderer.begin_frame()
+            state = self.state_manager.get_state()
+            if state == "feeds":
+                FeedView.render(
+                    self.top_pane,
+                    self.middle_pane,
+                    self.feed_manager,
+                    self.badges,
+                    "Searching for feeds..." if self.discovering else "No feeds",
+                )
+            elif state == "search":
+                self.render_search()
+            elif state == "stories":
+                self.render_stories()
+            elif state == "digest":
+                DigestView.display_choices(
+                    self.top_pane,
+                    ["All feeds", *(feed.title for feed in self.feeds)],
+                    self.digest_index,
+                )
+                DigestView.display_digest(self.middle_pane, self.digest)
+            elif self.post_manager is None:
+                self.render_placeholder()
+            else:
+                PostView.display_posts(
+                    self.top_pane,
+                    self.post_manager.posts,
+                    self.post_manager.selected_post_index,
+                    self.corroboration(),
+                )
+                PostView.display_post_content(
+                    self.middle_pane, self.post_manager.get_current_post()
+                )
+            if self.show_log:
+                DebugView.display_log(self.bottom_pane)
+            else:
+                DebugView.display_metrics(Metrics.default(), self.bottom_pane)
+            Renderer.end_frame()
+        except curses.error:
+            DebugView.display_debug_message(
+                "Window size error. Please resize.", self.bottom_pane
+            )
+            logging.error("Window size error. Please resize the terminal.")
+
+    def feed_of_current_post(self) -> Optional[Feed]:
+        if self.open_feed is not None:
+            return self.open_feed
+        index = self.post_manager.selected_post_index
+        if self.posts_return_state == "stories" and self.stories:
+            return self.stories[self.stories_index].feeds[index]
+        if self.posts_return_state == "search" and self.search_hits:
+            return self.feeds_by_link.get(self.search_hits[index].feed_link)
+        return None
+
+    def corroboration(self) -> str:
+        feed = self.feed_of_current_post()
+        if feed is None:
+            return ""
+        return str(self.facts.check(feed, self.post_manager.get_current_post()))
+
+    def render_search(self) -> None:
+        SearchView.display_results(
+            self.top_pane,
+            self.search_query,
+            self.search_hits,
+            self.search_index,
+            self.search_ms,
+        )
+        if self.search_hits:
+            PostView.display_post_content(
+                self.middle_pane, self.search_hits[self.search_index].post
+            )
+        else:
+            self.middle_pane.clear()
+            self.middle_pane.refresh()
+
+    def render_stories(self) -> None:
+        StoriesView.display_stories(self.top_pane, self.stories, self.stories_index)
+        if self.stories:
+            StoriesView.display_sources(
+                self.middle_pane, self.stories[self.stories_index]
+            )
+        else:
+            self.middle_pane.clear()
+            self.middle_pane.refresh()
+
+    def render_placeholder(self) -> None:
+        loading = self.open_feed is not None and not self.open_feed.posts_value.done()
+        self.top_pane.clear()
+        self.top_pane.add_text(1, 1, "Posts:", curses.color_pair(1))
+        self.top_pane.add_text(
+            2, 1, "Loading..." if loading else "No posts", curses.color_pair(1)
+        )
+        self.top_pane.refresh()
+        self.middle_pane.clear()
+        self.middle_pane.refresh()
+
+    def _watch_topics(self) -> None:
+        if self.loader.topics.reload_if_changed():
+            self.loader.retag(self.feeds)
+        self.loop.call_later(self.topics_poll, self._watch_topics)
+
+    def _watch_log(self) -> None:
+        appended = DebugView.debug_messages.appended
+        if self.show_log and appended != self._log_seen:
+            self.dirty = True
+        self._log_seen = appended
+        self.loop.call_later(self.log_poll, self._watch_log)
+
+    def _tick(self) -> None:
+        delay = self.scheduler.run_due()
+        if delay is None:
+            delay = self.scheduler_tick
+        self.loop.call_later(min(delay, self.scheduler_tick), self._tick)
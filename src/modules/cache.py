@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.utils.helpers import default_cache_dir, shared_default
+
+
+def parse_cache_control(value: str) -> dict[str, Optional[str]]:
+    """Split a Cache-Control header into a directive -> argument mapping"""
+    directives: dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds a response may be reused without revalidation, if the server said"""
+    directives = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-cache" in directives or "no-store" in directives:
+        return 0
+    if directives.get("max-age"):
+        try:
+            return max(0, int(directives["max-age"] or 0))
+        except ValueError:
+            return 0
+    if headers.get("Expires"):
+        try:
+            expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0
+        return max(0, expires - time.time())
+    return None
+
+
+class CachedResponse:
+    """The subset of a requests.Response the feed code needs, possibly from disk"""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        content: bytes,
+        headers: Mapping[str, str],
+        from_cache: bool = False,
+    ) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.from_cache = from_cache
+        # filled in by the Fetcher, see FetchTiming
+        self.timing = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        # the body is already in memory, so it comes in one piece
+        yield self.content
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "CachedResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HTTPCache:
+    """On-disk cache of response bodies and their validators, keyed by URL.
+
+    The Fetcher serves fresh entries (per Cache-Control max-age or Expires)
+    without touching the network, revalidates stale ones with If-None-Match /
+    If-Modified-Since, and answers a 304 from disk. When the bodies exceed
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    # response headers kept alongside the body so cached responses stay useful
+    kept_headers = (
+        "Content-Type",
+        "ETag",
+        "Last-Modified",
+        "Cache-Control",
+        "Expires",
+    )
+
+    _default: Optional["HTTPCache"] = None
+
+    def __init__(
+        self, directory: Optional[str] = None, max_bytes: int = 64 * 1024 * 1024
+    ) -> None:
+        self.directory = directory or os.path.join(default_cache_dir(), "http")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._index: dict[str, dict] = self._load_index()
+
+    @classmethod
+    def default(cls) -> "HTTPCache":
+        return shared_default(cls, cls)
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            with open(self._index_path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        # called with the lock held; the temporary file is unique so another
+        # process sharing the directory never renames ours away
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(self._index, file)
+            os.replace(tmp_path, self._index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest())
+
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._index.values())
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Return the stored response for a URL, fresh or not"""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            try:
+                with open(self._body_path(url), "rb") as file:
+                    content = file.read()
+            except OSError:
+                del self._index[url]
+                return None
+            entry["last_used"] = time.time()
+        return CachedResponse(url, 200, content, entry["headers"], from_cache=True)
+
+    def is_fresh(self, url: str) -> bool:
+        entry = self._index.get(url)
+        if entry is None or entry["max_age"] is None:
+            return False
+        return time.time() - entry["stored_at"] < entry["max_age"]
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        entry = self._index.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def store(self, url: str, headers: Mapping[str, str], content: bytes) -> None:
+        if "no-store" in parse_cache_control(headers.get("Cache-Control", "")):
+            return
+        if len(content) > self.max_bytes:
+            return
+        kept = {name: headers[name] for name in self.kept_headers if name in headers}
+        now = time.time()
+        with self._lock:
+            with open(self._body_path(url), "wb") as file:
+                file.write(content)
+            self._index[url] = {
+                "headers": kept,
+                "stored_at": now,
+                "last_used": now,
+                "max_age": freshness_lifetime(kept),
+                "size": len(content),
+            }
+            self._evict()
+            self._save_index()
+
+    def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        """Record a 304: the stored body is good for another freshness lifetime"""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return
+            for name in self.kept_headers:
+                if name in headers:
+                    entry["headers"][name] = headers[name]
+            entry["stored_at"] = time.time()
+            entry["max_age"] = freshness_lifetime(entry["headers"])
+            self._save_index()
+
+    def _evict(self) -> None:
+        total = self.total_bytes()
+        by_age = sorted(self._index.items(), key=lambda item: item[1]["last_used"])
+        for url, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(url))
+            except OSError:
+                pass
+            del self._index[url]
+            total -= entry["size"]
@@ -0,0 +1,122 @@
+import heapq
+import zlib
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from src.modules.rss import Post
+
+if TYPE_CHECKING:
+    from src.modules.rss import Feed
+
+
+class _Blob:
+    """Many strings packed end to end in one buffer, found by offset"""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.ends = array("Q")
+
+    def append(self, value: bytes) -> None:
+        self.data += value
+        self.ends.append(len(self.data))
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self.ends[index - 1] if index else 0
+        return bytes(self.data[start : self.ends[index]])
+
+    def nbytes(self) -> int:
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+
+class PostColumns:
+    """Posts from many feeds as parallel arrays, for bulk views.
+
+    A Post object costs a few hundred bytes even with slots, mostly in
+    per-object and per-string headers. Here each field is one array or one
+    buffer for every row: titles and link tails are packed UTF-8, link
+    fronts and feeds are small integer references into shared tables, and
+    descriptions are compressed one row at a time so any row can be read
+    alone. Bodies are left out, since list views never show them. Rows are
+    append-only; ``post(i)`` rebuilds a Post when a view needs one.
+    """
+
+    def __init__(self) -> None:
+        self.feeds: list["Feed"] = []
+        self._feed_rows: dict[str, int] = {}
+        self.prefixes: list[str] = []
+        self._prefix_rows: dict[str, int] = {}
+        self.feed = array("I")
+        self.prefix = array("I")
+        self.published = array("d")
+        self.read = bytearray()
+        self.titles = _Blob()
+        self.links = _Blob()
+        self.guids = _Blob()
+        self.descriptions = _Blob()
+
+    def __len__(self) -> int:
+        return len(self.published)
+
+    def _intern(self, table: list, rows: dict, key, value) -> int:
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = len(table)
+            table.append(value)
+        return row
+
+    def append(self, feed: "Feed", post: Post) -> None:
+        link = post.link
+        cut = link.rfind("/") + 1
+        prefix = link[:cut]
+        self.feed.append(
+            self._intern(self.feeds, self._feed_rows, feed.feed_link, feed)
+        )
+        self.prefix.append(
+            self._intern(self.prefixes, self._prefix_rows, prefix, prefix)
+        )
+        self.published.append(post.published or 0.0)
+        self.read.append(post.read)
+        self.titles.append((post.title or "").encode())
+        self.links.append(link[cut:].encode())
+        # an empty guid means "same as the link", as on Post
+        self.guids.append(b"" if post.guid == link else post.guid.encode())
+        self.descriptions.append(zlib.compress((post.description or "").encode(), 1))
+
+    def extend(self, feed: "Feed", posts: Iterable[Post]) -> None:
+        for post in posts:
+            self.append(feed, post)
+
+    def title(self, row: int) -> str:
+        return self.titles[row].decode()
+
+    def link(self, row: int) -> str:
+        return self.prefixes[self.prefix[row]] + self.links[row].decode()
+
+    def post(self, row: int) -> Post:
+        link = self.link(row)
+        return Post(
+            self.title(row),
+            link,
+            zlib.decompress(self.descriptions[row]).decode(),
+            guid=self.guids[row].decode() or link,
+            published=self.published[row] or None,
+            read=bool(self.read[row]),
+        )
+
+    def newest(self, count: int) -> list[int]:
+        """Rows of the ``count`` most recently published posts, newest first"""
+        published = self.published
+        return heapq.nlargest(count, range(len(published)), key=published.__getitem__)
+
+    def unread(self) -> Iterator[int]:
+        return (row for row, read in enumerate(self.read) if not read)
+
+    def nbytes(self) -> int:
+        """Memory held by the columns, not counting the shared tables"""
+        arrays = (self.feed, self.prefix, self.published)
+        blobs = (self.titles, self.links, self.guids, self.descriptions)
+        return (
+            sum(column.itemsize * len(column) for column in arrays)
+            + len(self.read)
+            + sum(blob.nbytes() for blob in blobs)
+        )
@@ -0,0 +1,292 @@
+import bisect
+import calendar
+import json
+import logging
+import math
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Iterator, Optional
+from urllib.parse import urljoin, urlparse
+
+import feedparser
+import requests
+
+from src.modules.fetch import Fetcher, Timeout
+from src.modules.memo import SummaryMemo
+from src.utils.helpers import default_cache_dir, shared_default
+
+SEARCH_URL = "https://cloud.feedly.com/v3/search/feeds"
+# <link rel="alternate"> types that announce a feed
+FEED_TYPES = frozenset(
+    {
+        "application/rss+xml",
+        "application/atom+xml",
+        "application/rdf+xml",
+        "application/feed+json",
+        "application/json",
+    }
+)
+# where sites that do not announce their feed usually keep it
+COMMON_PATHS = (
+    "/feed",
+    "/rss",
+    "/feed.xml",
+    "/rss.xml",
+    "/atom.xml",
+    "/index.xml",
+    "/feed.json",
+)
+HEAD_END = re.compile(rb"</head\s*>", re.IGNORECASE)
+LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+ATTRIBUTE = re.compile(r"""([\w-]+)\s*=\s*("[^"]*"|'[^']*'|[^\s>]+)""")
+# stop looking for </head> after this much, whatever the page
+MAX_HEAD = 512 * 1024
+
+
+def read_head(chunks: Iterator[bytes]) -> bytes:
+    """Read an HTML page only as far as the end of its <head>"""
+    head = b""
+    for chunk in chunks:
+        # the closing tag may straddle two chunks
+        start = max(0, len(head) - 8)
+        head += chunk
+        match = HEAD_END.search(head, start)
+        if match:
+            return head[: match.end()]
+        if len(head) >= MAX_HEAD:
+            break
+    return head
+
+
+def feed_links(head: str, base_url: str) -> list[str]:
+    """Absolute URLs of the feeds a page's <link> tags announce"""
+    links = []
+    for tag in LINK_TAG.findall(head):
+        attributes = {
+            name.lower(): value.strip("\"'") for name, value in ATTRIBUTE.findall(tag)
+        }
+        rel = attributes.get("rel", "").lower().split()
+        kind = attributes.get("type", "").lower().split(";")[0].strip()
+        href = attributes.get("href")
+        if href and "alternate" in rel and kind in FEED_TYPES:
+            link = urljoin(base_url, href)
+            if link not in links:
+                links.append(link)
+    return links
+
+
+def sniff(content: bytes) -> Optional[str]:
+    """Which kind of feed a body is ("rss", "atom", "rdf", "json"), if any"""
+    start = content[:2048].lstrip(b"\xef\xbb\xbf \t\r\n")
+    if start.startswith(b"{"):
+        try:
+            version = json.loads(content).get("version", "")
+        except (ValueError, AttributeError):
+            return None
+        return "json" if "jsonfeed.org" in str(version) else None
+    for marker, kind in ((b"<rss", "rss"), (b"<feed", "atom"), (b"<rdf:RDF", "rdf")):
+        if marker in start:
+            return kind
+    return None
+
+
+class FeedCandidate:
+    """A feed found for a search, with what validating it showed"""
+
+    def __init__(
+        self,
+        title: str,
+        website_link: str,
+        feed_link: str,
+        description: str = "",
+        entries: int = 0,
+        newest: Optional[float] = None,
+        subscribers: int = 0,
+    ) -> None:
+        self.title = title
+        self.website_link = website_link
+        self.feed_link = feed_link
+        self.description = description
+        self.entries = entries
+        self.newest = newest
+        self.subscribers = subscribers
+
+    @property
+    def score(self) -> float:
+        """Popular, well-stocked and recently updated feeds rank first"""
+        score = math.log10(1 + self.subscribers) + min(self.entries, 20) / 20
+        if self.newest is not None:
+            age = time.time() - self.newest
+            if age < 7 * 86400:
+                score += 1.0
+            elif age < 30 * 86400:
+                score += 0.5
+        return score
+
+    def __repr__(self) -> str:
+        return f"FeedCandidate({self.title!r}, {self.feed_link!r}, {self.score:.2f})"
+
+
+class FeedDiscovery:
+    """Find and validate feeds for a search, reporting them as they check out.
+
+    Every search result is resolved on a bounded pool: its feed URL is
+    fetched and checked to really be RSS, Atom, RDF or a JSON Feed, and if it
+    is not, the site's homepage is read up to ``</head>`` for announced feeds
+    and then the usual ``/feed``-style paths are tried. Search results and
+    probe outcomes, failures included, are cached for ``ttl`` seconds, so
+    repeating a search costs no network at all.
+    """
+
+    _default: Optional["FeedDiscovery"] = None
+
+    def __init__(
+        self,
+        fetcher: Optional[Fetcher] = None,
+        memo: Optional[SummaryMemo] = None,
+        max_workers: int = 8,
+        ttl: float = 6 * 3600,
+        timeout: Timeout = (3.05, 10.0),
+    ) -> None:
+        self.fetcher = fetcher or Fetcher.default()
+        self.memo = memo or SummaryMemo(
+            os.path.join(default_cache_dir(), "discovery.db"), ttl=ttl
+        )
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    @classmethod
+    def default(cls) -> "FeedDiscovery":
+        return shared_default(cls, cls)
+
+    def _cached(self, key: str, compute) -> Any:
+        return json.loads(self.memo.get_or_compute(key, lambda: json.dumps(compute())))
+
+    def search(self, query: str) -> list[dict]:
+        """Feedly's results for a query, or the query itself if it is a URL"""
+        if urlparse(query).scheme in ("http", "https"):
+            return [{"website": query}]
+
+        def run() -> list[dict]:
+            data = self.fetcher.get_json(
+                SEARCH_URL, params={"query": query}, timeout=self.timeout
+            )
+            return data.get("results", [])
+
+        return self._cached(f"search:{query.strip().lower()}", run)
+
+    def probe(self, url: str) -> Optional[dict]:
+        """What a URL holds if it is a feed: title, description, entries, newest"""
+
+        def run() -> Optional[dict]:
+            try:
+                response = self.fetcher.get(url, timeout=self.timeout)
+            except requests.RequestException:
+                return None
+            if response.status_code != 200:
+                return None
+            kind = sniff(response.content)
+            if kind == "json":
+                return self._describe_json(json.loads(response.content))
+            if kind is None:
+                return None
+            parsed = feedparser.parse(response.content)
+            dates = [
+                calendar.timegm(entry[key])
+                for entry in parsed.entries
+                for key in ("published_parsed", "updated_parsed")
+                if entry.get(key)
+            ]
+            return {
+                "title": parsed.feed.get("title", ""),
+                "description": parsed.feed.get("subtitle", ""),
+                "website": parsed.feed.get("link", ""),
+                "entries": len(parsed.entries),
+                "newest": max(dates) if dates else None,
+            }
+
+        return self._cached(f"probe:{url}", run)
+
+    @staticmethod
+    def _describe_json(feed: dict) -> dict:
+        items = feed.get("items") or []
+        dates = []
+        for item in items:
+            try:
+                date = datetime.fromisoformat(item["date_published"])
+                dates.append(date.timestamp())
+            except (KeyError, TypeError, ValueError):
+                pass
+        newest = max(dates) if dates else None
+        return {
+            "title": feed.get("title", ""),
+            "description": feed.get("description", ""),
+            "website": feed.get("home_page_url", ""),
+            "entries": len(items),
+            "newest": newest,
+        }
+
+    def homepage_feeds(self, website: str) -> list[str]:
+        """Feeds a homepage announces, read no further than its </head>"""
+
+        def run() -> list[str]:
+            try:
+                head = read_head(self.fetcher.iter_content(website, self.timeout))
+            except requests.RequestException:
+                return []
+            return feed_links(head.decode("utf-8", "replace"), website)
+
+        return self._cached(f"links:{website}", run)
+
+    def resolve(self, result: dict) -> Optional[FeedCandidate]:
+        """The first URL that validates for one search result"""
+        website = result.get("website") or ""
+        urls = []
+        if result.get("feedId"):
+            urls.append(result["feedId"].removeprefix("feed/"))
+        if website:
+            urls.extend(self.homepage_feeds(website))
+            urls.extend(urljoin(website, path) for path in COMMON_PATHS)
+        for url in dict.fromkeys(urls):
+            found = self.probe(url)
+            if found is None:
+                continue
+            return FeedCandidate(
+                title=result.get("title") or found["title"] or url,
+                website_link=website or found["website"],
+                feed_link=url,
+                description=result.get("description") or found["description"],
+                entries=found["entries"],
+                newest=found["newest"],
+                subscribers=result.get("subscribers") or 0,
+            )
+        return None
+
+    def discover(self, query: str) -> Iterator[FeedCandidate]:
+        """Valid feeds for a query, each yielded as soon as it checks out"""
+        pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="discovery")
+        try:
+            futures = [pool.submit(self.resolve, r) for r in self.search(query)]
+            seen = set()
+            for future in as_completed(futures):
+                try:
+                    candidate = future.result()
+                except Exception as e:
+                    logging.error(f"Error checking a result for {query!r}: {e}")
+                    continue
+                if candidate is not None and candidate.feed_link not in seen:
+                    seen.add(candidate.feed_link)
+                    yield candidate
+        finally:
+            # a caller that stops early should not wait for the slow sites
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def ranked(self, query: str) -> Iterator[list[FeedCandidate]]:
+        """The ranking so far, again after every feed that checks out"""
+        found: list[FeedCandidate] = []
+        for candidate in self.discover(query):
+            bisect.insort(found, candidate, key=lambda c: -c.score)
+            yield list(found)
@@ -0,0 +1,166 @@
+import curses
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+# event kinds dispatched by EventLoop
+KEY = "key"
+RESIZE = "resize"
+FETCH = "fetch"
+
+
+class EventLoop:
+    """Single-threaded dispatcher for keys, background results and timers.
+
+    The loop sleeps in ``select`` on stdin and on a self-pipe. Worker threads
+    call ``post`` (which writes to the pipe) to hand results back, timers wake
+    it through the select timeout, and each readable stdin is drained with a
+    non-blocking ``getch``. Handlers run on the loop thread in arrival order,
+    and ``on_idle`` (usually the renderer) runs once per batch, so a keypress
+    is answered within one frame however busy the workers are.
+
+    A terminal resize wakes the loop too: while it runs on the main thread,
+    SIGWINCH writes to the self-pipe, and the loop resizes curses to the new
+    terminal size and dispatches RESIZE without waiting for a keypress.
+    """
+
+    def __init__(self, read_key: Callable[[], int], input_fd: int = 0) -> None:
+        self.read_key = read_key
+        self.on_idle: Optional[Callable[[], None]] = None
+        self._handlers: dict[str, list[Callable[[Any], None]]] = {}
+        self._posted: deque[tuple[str, Any]] = deque()
+        self._timers: list[tuple[float, int, Callable[[], None]]] = []
+        self._timers_lock = threading.Lock()
+        self._counter = itertools.count()
+        self._running = False
+        self._resized = False
+        self._input_fd = input_fd
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        os.set_blocking(self._wake_write, False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(input_fd, selectors.EVENT_READ, "input")
+        self._selector.register(self._wake_read, selectors.EVENT_READ, "wake")
+        self._loop_thread: Optional[threading.Thread] = None
+
+    def on(self, kind: str, handler: Callable[[Any], None]) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def post(self, kind: str, payload: Any = None) -> None:
+        """Queue an event from any thread and wake the loop"""
+        self._posted.append((kind, payload))
+        if threading.current_thread() is not self._loop_thread:
+            try:
+                os.write(self._wake_write, b"\0")
+            except BlockingIOError:
+                pass  # the pipe is full, so a wakeup is already pending
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Run a callback on the loop thread after ``delay`` seconds"""
+        with self._timers_lock:
+            heapq.heappush(
+                self._timers,
+                (time.monotonic() + delay, next(self._counter), callback),
+            )
+        if threading.current_thread() is not self._loop_thread:
+            # wake the loop so it recomputes its select timeout
+            self.post("timer")
+
+    def stop(self) -> None:
+        self._running = False
+
+    def close(self) -> None:
+        self._selector.close()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+    def dispatch(self, kind: str, payload: Any = None) -> None:
+        for handler in self._handlers.get(kind, []):
+            handler(payload)
+
+    def run(self) -> None:
+        self._running = True
+        self._loop_thread = threading.current_thread()
+        # signal handlers can only be set from the main thread
+        winch = getattr(signal, "SIGWINCH", None)
+        if winch is None or self._loop_thread is not threading.main_thread():
+            winch = None
+        else:
+            previous = signal.signal(winch, self._on_winch)
+        try:
+            self._run()
+        finally:
+            if winch is not None:
+                signal.signal(winch, signal.SIG_DFL if previous is None else previous)
+
+    def _run(self) -> None:
+        if self.on_idle:
+            self.on_idle()
+        while self._running:
+            timeout = None
+            with self._timers_lock:
+                if self._timers:
+                    timeout = max(0.0, self._timers[0][0] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.data == "input":
+                    self._read_input()
+                else:
+                    self._drain_wakeups()
+            if self._resized:
+                self._resize()
+            while self._posted:
+                self.dispatch(*self._posted.popleft())
+            self._run_timers()
+            if self._running and self.on_idle:
+                self.on_idle()
+
+    def _on_winch(self, signum: int, frame: Any) -> None:
+        self._resized = True
+        try:
+            os.write(self._wake_write, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _resize(self) -> None:
+        """Tell curses the new size; it queues KEY_RESIZE for the next getch"""
+        self._resized = False
+        try:
+            size = os.get_terminal_size(self._input_fd)
+            curses.resizeterm(size.lines, size.columns)
+        except (OSError, curses.error):
+            pass  # not a terminal, or curses is not running
+        if not self._read_input():
+            self.dispatch(RESIZE, curses.KEY_RESIZE)
+
+    def _read_input(self) -> bool:
+        """Dispatch every pending key; True if one of them was a resize"""
+        resized = False
+        while self._running:
+            key = self.read_key()
+            if key == -1:
+                break
+            resized = resized or key == curses.KEY_RESIZE
+            self.dispatch(RESIZE if key == curses.KEY_RESIZE else KEY, key)
+        return resized
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while os.read(self._wake_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _run_timers(self) -> None:
+        now = time.monotonic()
+        while True:
+            with self._timers_lock:
+                if not self._timers or self._timers[0][0] > now:
+                    return
+                _, _, callback = heapq.heappop(self._timers)
+            callback()
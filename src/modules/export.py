@@ -0,0 +1,151 @@
+import csv
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate
+from typing import IO, TYPE_CHECKING, Iterable, Optional
+from xml.sax.saxutils import quoteattr
+
+from src.modules.layout import plain_text
+from src.modules.loader import FeedFailure, FeedLoader
+
+if TYPE_CHECKING:
+    from src.modules.rss import Feed, Post
+
+FIELDS = ("feed", "feed_link", "title", "link", "guid", "published", "description")
+
+
+def post_record(feed: "Feed", post: "Post") -> dict:
+    """One post as plain fields, the same for every export format"""
+    published = None
+    if post.published is not None:
+        published = datetime.fromtimestamp(post.published, timezone.utc).isoformat()
+    return {
+        "feed": feed.title,
+        "feed_link": feed.feed_link,
+        "title": post.title,
+        "link": post.link,
+        "guid": post.guid,
+        "published": published,
+        "description": plain_text(post.description),
+    }
+
+
+class JSONLWriter:
+    """One JSON object per post per line"""
+
+    def __init__(self, out: IO[str]) -> None:
+        self.out = out
+
+    def write(self, feed: "Feed", posts: list["Post"]) -> None:
+        for post in posts:
+            self.out.write(json.dumps(post_record(feed, post), ensure_ascii=False))
+            self.out.write("\n")
+
+    def close(self) -> None:
+        pass
+
+
+class CSVWriter:
+    """A header row, then one row per post"""
+
+    def __init__(self, out: IO[str]) -> None:
+        self.writer = csv.DictWriter(out, FIELDS)
+        self.writer.writeheader()
+
+    def write(self, feed: "Feed", posts: list["Post"]) -> None:
+        self.writer.writerows(post_record(feed, post) for post in posts)
+
+    def close(self) -> None:
+        pass
+
+
+class OPMLWriter:
+    """An OPML 2.0 subscription list, each feed's posts as link outlines"""
+
+    def __init__(self, out: IO[str]) -> None:
+        self.out = out
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n<opml version="2.0">\n')
+        out.write("<head><title>myeditorial feeds</title>")
+        out.write(f"<dateCreated>{formatdate(usegmt=True)}</dateCreated></head>\n")
+        out.write("<body>\n")
+
+    def write(self, feed: "Feed", posts: list["Post"]) -> None:
+        attributes = (
+            f'type="rss" text={quoteattr(feed.title or "")} '
+            f"xmlUrl={quoteattr(feed.feed_link)} htmlUrl={quoteattr(feed.website_link)}"
+        )
+        if not posts:
+            self.out.write(f"<outline {attributes}/>\n")
+            return
+        self.out.write(f"<outline {attributes}>\n")
+        for post in posts:
+            created = ""
+            if post.published is not None:
+                created = (
+                    f" created={quoteattr(formatdate(post.published, usegmt=True))}"
+                )
+            self.out.write(
+                f'  <outline type="link" text={quoteattr(post.title or "")} '
+                f"url={quoteattr(post.link)}{created}/>\n"
+            )
+        self.out.write("</outline>\n")
+
+    def close(self) -> None:
+        self.out.write("</body>\n</opml>\n")
+
+
+WRITERS = {"jsonl": JSONLWriter, "csv": CSVWriter, "opml": OPMLWriter}
+
+
+class ExportStats:
+    """How much an export wrote and how fast"""
+
+    def __init__(self) -> None:
+        self.feeds = 0
+        self.posts = 0
+        self.failures: list[FeedFailure] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        failed = f" ({len(self.failures)} failed)" if self.failures else ""
+        return (
+            f"{self.feeds} feeds{failed}, {self.posts} posts in {self.elapsed:.2f}s: "
+            f"{self.feeds / elapsed:.1f} feeds/s, {self.posts / elapsed:.1f} posts/s"
+        )
+
+
+def export_feeds(
+    feeds: Iterable["Feed"],
+    out: IO[str],
+    kind: str,
+    loader: Optional[FeedLoader] = None,
+    window: Optional[int] = None,
+) -> ExportStats:
+    """Fetch feeds concurrently, writing each one's posts as ``kind`` when in.
+
+    Posts are dropped from their feed once written, so memory stays bounded
+    by the loader's window rather than by the number of feeds.
+    """
+    loader = loader or FeedLoader()
+    writer = WRITERS[kind](out)
+    stats = ExportStats()
+    for feed, error in loader.completed(feeds, window):
+        stats.feeds += 1
+        posts = []
+        if error is None:
+            posts = feed.posts
+        else:
+            logging.error(f"Error fetching posts for feed {feed.feed_link}: {error}")
+            stats.failures.append(FeedFailure(feed, "posts", error))
+        writer.write(feed, posts)
+        out.flush()
+        stats.posts += len(posts)
+        feed.posts = []
+    writer.close()
+    out.flush()
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
@@ -0,0 +1,247 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from src.modules.fetch import Fetcher
+from src.utils.helpers import shared_default
+
+if TYPE_CHECKING:
+    from src.modules.memo import SummaryMemo
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the stdlib parser works everywhere
+    etree = None
+
+# tags whose text never belongs in a summary
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+# how far into a page to look for a <meta charset>, as browsers do
+SNIFF_BYTES = 1024
+# the name must be followed by something, or it may be cut off by a chunk
+META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)(?=[\s"'/;>])""", re.I
+)
+HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+BODY = re.compile(rb"<body", re.I)
+
+
+def charset_of(content_type: str) -> Optional[str]:
+    """The charset a Content-Type header names, if any"""
+    match = HEADER_CHARSET.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def _codec(charset: Optional[str]) -> str:
+    # a name both codecs and libxml2 know, falling back to UTF-8
+    try:
+        return codecs.lookup(charset or "utf-8").name
+    except LookupError:
+        return "utf-8"
+
+
+class _ParagraphCollector:
+    """Parser-agnostic state: gathers text inside <p> until enough is found"""
+
+    def __init__(self, paragraphs: int, min_chars: int) -> None:
+        self.wanted = paragraphs
+        self.min_chars = min_chars
+        self.paragraphs: list[str] = []
+        self._current: Optional[list[str]] = None
+        self._skip_depth = 0
+
+    @property
+    def done(self) -> bool:
+        return len(self.paragraphs) >= self.wanted
+
+    def start(self, tag: str) -> None:
+        tag = tag.lower()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "p":
+            # an unclosed <p> ends where the next one starts
+            self.end("p")
+            self._current = []
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "p" and self._current is not None:
+            text = re.sub(r"\s+", " ", "".join(self._current)).strip()
+            self._current = None
+            if len(text) >= self.min_chars and not self.done:
+                self.paragraphs.append(text)
+
+    def data(self, text: str) -> None:
+        if self._current is not None and not self._skip_depth:
+            self._current.append(text)
+
+
+class _StdlibBackend(HTMLParser):
+    def __init__(self, collector: _ParagraphCollector, encoding: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def handle_starttag(self, tag, attrs) -> None:
+        self.collector.start(tag)
+
+    def handle_endtag(self, tag) -> None:
+        self.collector.end(tag)
+
+    def handle_data(self, data) -> None:
+        self.collector.data(data)
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        self.feed(self._decoder.decode(chunk))
+
+    def close(self) -> None:
+        # text after the last tag is only handed over once the parser closes
+        self.feed(self._decoder.decode(b"", final=True))
+        super().close()
+
+
+class _LxmlTarget:
+    def __init__(self, collector: _ParagraphCollector) -> None:
+        self.collector = collector
+
+    def start(self, tag, attrib) -> None:
+        self.collector.start(tag)
+
+    def end(self, tag) -> None:
+        self.collector.end(tag)
+
+    def data(self, data) -> None:
+        self.collector.data(data)
+
+    def close(self) -> None:
+        pass
+
+
+class _LxmlBackend:
+    def __init__(self, collector: _ParagraphCollector, encoding: str) -> None:
+        self._parser = etree.HTMLParser(
+            target=_LxmlTarget(collector), encoding=encoding
+        )
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        self._parser.feed(chunk)
+
+    def close(self) -> None:
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            pass  # nothing was fed
+
+
+class SummaryExtractor:
+    """Summarize a page from its first paragraphs without reading all of it.
+
+    The body is fed chunk by chunk to an incremental HTML parser, and reading
+    stops as soon as ``paragraphs`` paragraphs of at least ``min_chars``
+    characters have been seen or ``max_bytes`` have been read. ``backend`` is
+    "lxml" (libxml2, much faster), "html.parser" (stdlib) or "auto" to use
+    lxml when it is installed.
+    """
+
+    _default: Optional["SummaryExtractor"] = None
+
+    def __init__(
+        self,
+        paragraphs: int = 3,
+        min_chars: int = 20,
+        max_bytes: int = 512 * 1024,
+        chunk_size: int = 16 * 1024,
+        backend: str = "auto",
+    ) -> None:
+        if backend == "auto":
+            backend = "lxml" if etree is not None else "html.parser"
+        if backend == "lxml" and etree is None:
+            raise ValueError("the lxml backend needs lxml installed")
+        if backend not in ("lxml", "html.parser"):
+            raise ValueError(f"unknown HTML parser backend: {backend}")
+        self.paragraphs = paragraphs
+        self.min_chars = min_chars
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.backend = backend
+
+    @classmethod
+    def default(cls) -> "SummaryExtractor":
+        return shared_default(cls, cls)
+
+    def extract(self, chunks: Iterable[bytes], charset: Optional[str] = None) -> str:
+        """Summarize an HTML body given as an iterable of byte chunks.
+
+        ``charset`` is the one the response declared; without it the page's
+        own <meta charset> is used, and then UTF-8.
+        """
+        return self.extract_counting(chunks, charset)[0]
+
+    def extract_counting(
+        self, chunks: Iterable[bytes], charset: Optional[str] = None
+    ) -> tuple[str, int]:
+        """Like extract, but also report how many bytes were consumed"""
+        collector = _ParagraphCollector(self.paragraphs, self.min_chars)
+        parser = None
+        head = b""
+        bytes_read = 0
+        for chunk in chunks:
+            chunk = chunk[: self.max_bytes - bytes_read]
+            bytes_read += len(chunk)
+            if parser is None:
+                # nothing is decoded until the charset is settled
+                head += chunk
+                match = META_CHARSET.search(head, 0, SNIFF_BYTES)
+                charset = charset or (match and match.group(1).decode("ascii"))
+                if not charset and len(head) < SNIFF_BYTES and not BODY.search(head):
+                    continue
+                parser = self._parser(collector, charset)
+                chunk, head = head, b""
+            parser.feed_bytes(chunk)
+            if collector.done or bytes_read >= self.max_bytes:
+                break
+        if parser is None:
+            parser = self._parser(collector, charset)
+            parser.feed_bytes(head)
+        if not collector.done:
+            # a last paragraph may still be open when the page or budget ends
+            parser.close()
+            collector.end("p")
+        return " ".join(collector.paragraphs), bytes_read
+
+    def _parser(self, collector: _ParagraphCollector, charset: Optional[str]):
+        if self.backend == "lxml":
+            return _LxmlBackend(collector, _codec(charset))
+        return _StdlibBackend(collector, _codec(charset))
+
+    def extract_url(
+        self,
+        url: str,
+        fetcher: Optional[Fetcher] = None,
+        timeout=None,
+        memo: Optional["SummaryMemo"] = None,
+    ) -> str:
+        """Summarize a page, closing the connection once enough has been read.
+
+        With a ``memo``, a page that sends an ETag or Last-Modified is
+        summarized once per version of it: the summary is keyed by that
+        validator, so an unchanged page is not read past its headers. Pages
+        without one are summarized afresh, as they had to be fetched anyway.
+        """
+        fetcher = fetcher or Fetcher.default()
+        with fetcher.stream(url, timeout) as response:
+
+            def extract() -> str:
+                return self.extract(
+                    response.iter_content(self.chunk_size),
+                    charset_of(response.headers.get("Content-Type")),
+                )
+
+            validator = response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
+            if memo is None or not validator:
+                return extract()
+            return memo.get_or_compute(url, extract, validator)
@@ -0,0 +1,311 @@
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlparse
+
+from src.modules.layout import plain_text
+
+if TYPE_CHECKING:
+    from src.modules.rss import Feed, Post
+
+SENTENCE = re.compile(r"(?<=[.!?])\s+")
+QUOTE = re.compile(r"[\"“”]([^\"“”]{10,300})[\"“”]")
+ENTITY = re.compile(
+    r"[A-Z][\w'’&.-]*[\w](?:\s+(?:of\s+|de\s+|the\s+)?[A-Z][\w'’&.-]*\w)*"
+)
+FIGURE = re.compile(
+    r"(?<![\w.])([$£€])?(\d[\d,]*(?:\.\d+)?)\s*"
+    r"(%|percent\b|per cent\b|k\b|m\b|bn\b|thousand\b|million\b|billion\b)?"
+    r"\s*([a-z][a-z-]+)?",
+    re.IGNORECASE,
+)
+MULTIPLIERS = {
+    "k": 1e3,
+    "thousand": 1e3,
+    "m": 1e6,
+    "million": 1e6,
+    "bn": 1e9,
+    "billion": 1e9,
+}
+# capitalised only because they start a sentence, never entities on their own
+NOT_ENTITIES = frozenset("""
+    a an and as at but by for from he her his how i if in it its many more
+    most new no not of on or our she some than that the their there these
+    they this those to was we what when where which while who why will with
+    you after about also before breaking live monday tuesday wednesday
+    thursday friday saturday sunday watch
+    """.split())
+UNIT_STOPWORDS = frozenset("""
+    a an and are as at by for from in into is of on or over than that the to
+    was were with per up down after before since until
+    """.split())
+# figures within this fraction of each other say the same thing
+TOLERANCE = 0.02
+# how much of a post's text claims are drawn from
+MAX_TEXT = 4000
+MAX_ENTITIES = 6
+
+
+def source_of(feed: "Feed") -> str:
+    """The outlet behind a feed, so two feeds from one site count once"""
+    host = urlparse(feed.website_link or feed.feed_link).netloc.lower()
+    return host.removeprefix("www.") or feed.feed_link
+
+
+class Claim:
+    """Something a post asserts that other posts can agree with.
+
+    ``kind`` is "quote", "figure" or "pair" (two entities named together).
+    Claims with the same ``key`` are about the same thing; figures also carry
+    a ``value``, and two figures under one key with different values
+    contradict each other.
+    """
+
+    def __init__(self, kind: str, key: tuple, value: Optional[float], text: str):
+        self.kind = kind
+        self.key = key
+        self.value = value
+        self.text = text
+
+    def agrees(self, value: Optional[float]) -> bool:
+        if self.value is None or value is None:
+            return True
+        scale = max(abs(self.value), abs(value), 1e-9)
+        return abs(self.value - value) / scale <= TOLERANCE
+
+    def __repr__(self) -> str:
+        return f"Claim({self.kind}, {self.text!r})"
+
+
+def entities(sentence: str) -> list[str]:
+    found = []
+    sentence = sentence.strip()
+    for match in ENTITY.finditer(sentence):
+        words = match.group().split()
+        # drop sentence-starting words like "The" or "After"
+        while words and words[0].lower() in NOT_ENTITIES:
+            words.pop(0)
+        # a lone capitalised first word is usually just the start of the
+        # sentence ("Flood kills..."), unless it is an acronym
+        if match.start() == 0 and len(words) == 1 and not words[0].isupper():
+            continue
+        name = " ".join(words).rstrip(".").casefold()
+        name = re.sub(r"['’]s$", "", name)
+        if name and name not in NOT_ENTITIES and name not in found:
+            found.append(name)
+    return found[:MAX_ENTITIES]
+
+
+def figures(sentence: str) -> list[tuple[float, str]]:
+    """(value, unit) for each number with something to say what it counts"""
+    found = []
+    for match in FIGURE.finditer(sentence):
+        currency, digits, scale, unit = match.groups()
+        value = float(digits.replace(",", ""))
+        scale = (scale or "").lower()
+        if scale in ("%", "percent", "per cent"):
+            unit = "%"
+        elif currency:
+            unit = currency
+        elif unit is None or unit.lower() in UNIT_STOPWORDS:
+            continue
+        else:
+            unit = unit.lower()
+            # "12 people" and "1 person" are not worth telling apart, but
+            # "killed 12" and "12 killed" would be; keep it crude
+            if unit.endswith("s") and len(unit) > 3:
+                unit = unit[:-1]
+        if not currency and not scale and value.is_integer() and 1900 <= value < 2100:
+            continue  # a year, not a figure
+        found.append((value * MULTIPLIERS.get(scale, 1.0), unit))
+    return found
+
+
+def extract_claims(title: str, text: str) -> list[Claim]:
+    """Quotes, figures tied to the entities beside them, and entity pairs"""
+    claims: dict[tuple, Claim] = {}
+    for quote in QUOTE.findall(text):
+        words = re.findall(r"\w+", quote.casefold())
+        if len(words) >= 4:
+            key = ("quote", " ".join(words))
+            claims.setdefault(key, Claim("quote", key, None, quote.strip()))
+    for sentence in [title, *SENTENCE.split(text[:MAX_TEXT])]:
+        names = entities(sentence)
+        for value, unit in figures(sentence):
+            for name in names:
+                key = ("figure", name, unit)
+                if key not in claims:
+                    claims[key] = Claim(
+                        "figure", key, value, f"{name}: {value:g} {unit}"
+                    )
+        for i, first in enumerate(names):
+            for second in names[i + 1 :]:
+                pair = tuple(sorted((first, second)))
+                key = ("pair", *pair)
+                claims.setdefault(key, Claim("pair", key, None, " & ".join(pair)))
+    return list(claims.values())
+
+
+class Corroboration:
+    """What other sources say about a post's claims"""
+
+    def __init__(self) -> None:
+        # source -> [(claim, the other post's matching claim, that post)]
+        self.agreeing: dict[str, list[tuple[Claim, Claim, "Post"]]] = {}
+        self.contradicting: dict[str, list[tuple[Claim, Claim, "Post"]]] = {}
+
+    @property
+    def sources(self) -> int:
+        return len(self.agreeing)
+
+    def __str__(self) -> str:
+        if not self.agreeing and not self.contradicting:
+            return "no other source yet"
+        if self.sources == 1:
+            text = "1 other source agrees"
+        else:
+            text = f"{self.sources} other sources agree"
+        if len(self.contradicting) == 1:
+            text += ", 1 disagrees"
+        elif self.contradicting:
+            text += f", {len(self.contradicting)} disagree"
+        return text
+
+
+class FactIndex:
+    """An inverted index from claim keys to the posts that make them.
+
+    Posts are added as feeds refresh. ``check`` extracts a post's claims and
+    reads only the postings under those keys, so its cost grows with how
+    often the post's claims are repeated, never with the size of the
+    archive. Sources are counted by outlet (see ``source_of``) and the post's
+    own outlet is left out, so a feed repeating itself is not corroboration.
+    Posts published more than ``max_age`` seconds ago are dropped from the
+    index as newer ones arrive, and when it holds more than ``max_posts``
+    the oldest go too, their postings with them.
+    """
+
+    def __init__(
+        self, max_age: Optional[float] = 7 * 86400, max_posts: int = 4096
+    ) -> None:
+        self.max_age = max_age
+        self.max_posts = max_posts
+        self._lock = threading.Lock()
+        # claim key -> source -> value -> [(claim, post)]; grouping by source
+        # and value means a check walks each distinct figure an outlet gave,
+        # not every post that repeated it
+        self._postings: dict[tuple, dict[str, dict]] = {}
+        # None once evicted, so a refresh does not add the post back
+        self._claims: dict[tuple[str, str], Optional[list[Claim]]] = {}
+        self._posts: dict[tuple[str, str], tuple["Post", str]] = {}
+        self._oldest: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def add(self, feed: "Feed", posts: list["Post"]) -> int:
+        """Index the posts not seen before; returns how many were added"""
+        cutoff = time.time() - self.max_age if self.max_age else None
+        source = source_of(feed)
+        fresh = []
+        for post in posts:
+            if cutoff and post.published is not None and post.published < cutoff:
+                continue
+            if (feed.feed_link, post.guid) not in self._claims:
+                fresh.append((post, self._extract(post)))
+        with self._lock:
+            for post, claims in fresh:
+                key = (feed.feed_link, post.guid)
+                if key in self._claims:
+                    continue
+                self._claims[key] = claims
+                self._posts[key] = (post, source)
+                published = post.published
+                if published is not None and (
+                    self._oldest is None or published < self._oldest
+                ):
+                    self._oldest = published
+                for claim in claims:
+                    by_value = self._postings.setdefault(claim.key, {}).setdefault(
+                        source, {}
+                    )
+                    by_value.setdefault(claim.value, []).append((claim, post))
+            aged = cutoff and self._oldest is not None and self._oldest < cutoff
+            if aged or len(self._posts) > self.max_posts:
+                self._evict(cutoff)
+        return len(fresh)
+
+    def _evict(self, cutoff: Optional[float]) -> None:
+        """Drop aged-out posts, then the oldest if still over ``max_posts``.
+
+        Past the cap a quarter of the index is freed so this runs rarely.
+        """
+        newest = sorted(
+            self._posts,
+            key=lambda key: self._posts[key][0].published or 0.0,
+            reverse=True,
+        )
+        keep = [
+            key
+            for key in newest
+            if not (cutoff and (self._posts[key][0].published or cutoff) < cutoff)
+        ]
+        if len(keep) > self.max_posts:
+            keep = keep[: self.max_posts * 3 // 4]
+        for key in set(self._posts) - set(keep):
+            self._forget(key)
+        self._oldest = min(
+            (
+                post.published
+                for post, _ in self._posts.values()
+                if post.published is not None
+            ),
+            default=None,
+        )
+
+    def _forget(self, key: tuple[str, str]) -> None:
+        post, source = self._posts.pop(key)
+        for claim in self._claims[key]:
+            by_source = self._postings[claim.key]
+            by_value = by_source[source]
+            made = [entry for entry in by_value[claim.value] if entry[1] is not post]
+            if made:
+                by_value[claim.value] = made
+                continue
+            del by_value[claim.value]
+            if not by_value:
+                del by_source[source]
+            if not by_source:
+                del self._postings[claim.key]
+        self._claims[key] = None
+
+    @staticmethod
+    def _extract(post: "Post") -> list[Claim]:
+        text = f"{plain_text(post.description or '')}\n{plain_text(post.body or '')}"
+        return extract_claims(post.title or "", text)
+
+    def claims(self, feed: "Feed", post: "Post") -> list[Claim]:
+        cached = self._claims.get((feed.feed_link, post.guid))
+        return cached if cached is not None else self._extract(post)
+
+    def check(self, feed: "Feed", post: "Post") -> Corroboration:
+        """Which other sources back up or contradict this post's claims"""
+        own = source_of(feed)
+        result = Corroboration()
+        claims = self.claims(feed, post)
+        with self._lock:
+            for claim in claims:
+                for source, by_value in self._postings.get(claim.key, {}).items():
+                    if source == own:
+                        continue
+                    for value, made in by_value.items():
+                        side = (
+                            result.agreeing
+                            if claim.agrees(value)
+                            else result.contradicting
+                        )
+                        # the newest post making the claim stands for the rest
+                        other, other_post = made[-1]
+                        side.setdefault(source, []).append((claim, other, other_post))
+        return result
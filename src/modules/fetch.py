@@ -0,0 +1,273 @@
+import threading
+import time
+from typing import Any, Iterator, Mapping, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from src.modules.cache import CachedResponse, HTTPCache
+from src.utils.helpers import shared_default
+
+Timeout = Union[float, tuple[float, float]]
+
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After, but never sleeps longer than max_retry_after"""
+
+    max_retry_after = 60.0
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+# seconds spent opening connections (DNS, TCP and TLS) by the current thread
+_connecting = threading.local()
+
+
+class _TimedConnect:
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            elapsed = time.perf_counter() - start
+            _connecting.seconds = getattr(_connecting, "seconds", 0.0) + elapsed
+
+
+class _TimedHTTPConnection(_TimedConnect, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connections note how long they took to open"""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class FetchTiming:
+    """Where the time for one GET went, in seconds.
+
+    ``connect`` is zero when a pooled connection was reused, and ``ttfb``
+    (which includes it) runs until the response headers were in.
+    """
+
+    def __init__(
+        self,
+        connect: float = 0.0,
+        ttfb: float = 0.0,
+        download: float = 0.0,
+        nbytes: int = 0,
+        from_cache: bool = False,
+    ) -> None:
+        self.connect = connect
+        self.ttfb = ttfb
+        self.download = download
+        self.nbytes = nbytes
+        self.from_cache = from_cache
+
+    @property
+    def total(self) -> float:
+        return self.ttfb + self.download
+
+
+class Fetcher:
+    """The one place network I/O happens.
+
+    A single requests.Session gives every caller pooled keep-alive connections
+    per host, so sources that share a host share TLS handshakes. Requests
+    negotiate gzip (and brotli/zstd when their decoders are installed), carry
+    a timeout, and retry transient failures with exponential backoff that
+    respects Retry-After. GETs go through the HTTPCache unless told otherwise.
+    """
+
+    user_agent = "myeditorial/0.1 (+https://github.com/voidfemme/myeditorial)"
+
+    _default: Optional["Fetcher"] = None
+
+    def __init__(
+        self,
+        cache: Optional[HTTPCache] = None,
+        timeout: Timeout = (5.0, 15.0),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_maxsize: int = 8,
+        max_retry_after: float = 60.0,
+    ) -> None:
+        self.cache = cache
+        self.timeout = timeout
+        retry = _CappedRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        retry.max_retry_after = max_retry_after
+        adapter = _TimedAdapter(
+            pool_connections=32, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {"User-Agent": self.user_agent, "Accept-Encoding": ACCEPT_ENCODING}
+        )
+
+    @classmethod
+    def default(cls) -> "Fetcher":
+        return shared_default(cls, lambda: cls(cache=HTTPCache.default()))
+
+    def request(
+        self,
+        url: str,
+        timeout: Optional[Timeout] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Plain GET through the shared session, bypassing the cache"""
+        return self.session.get(
+            url, headers=headers, timeout=timeout or self.timeout, **kwargs
+        )
+
+    def timed_request(
+        self,
+        url: str,
+        timeout: Optional[Timeout] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> tuple[requests.Response, FetchTiming]:
+        """Like request, with the body read and the time it all took"""
+        _connecting.seconds = 0.0
+        start = time.perf_counter()
+        response = self.request(url, timeout, headers, stream=True)
+        ttfb = time.perf_counter() - start
+        content = response.content
+        timing = FetchTiming(
+            connect=_connecting.seconds,
+            ttfb=ttfb,
+            download=time.perf_counter() - start - ttfb,
+            nbytes=len(content),
+        )
+        return response, timing
+
+    def get(
+        self, url: str, timeout: Optional[Timeout] = None, use_cache: bool = True
+    ) -> CachedResponse:
+        """GET a URL, answering from the cache when it is fresh or unchanged.
+
+        The response's ``timing`` says where the time went.
+        """
+        cache = self.cache if use_cache else None
+        if cache and cache.is_fresh(url):
+            cached = cache.lookup(url)
+            if cached is not None:
+                cached.timing = FetchTiming(nbytes=len(cached.content), from_cache=True)
+                return cached
+
+        headers = cache.conditional_headers(url) if cache else {}
+        response, timing = self.timed_request(url, timeout, headers)
+        if cache and response.status_code == 304:
+            cached = cache.lookup(url)
+            if cached is not None:
+                cache.revalidated(url, response.headers)
+                timing.nbytes = len(cached.content)
+                timing.from_cache = True
+                cached.timing = timing
+                return cached
+            # the body went missing; fetch it again unconditionally
+            response, timing = self.timed_request(url, timeout)
+
+        if cache and response.status_code == 200:
+            cache.store(url, response.headers, response.content)
+        result = CachedResponse(
+            url, response.status_code, response.content, response.headers
+        )
+        result.timing = timing
+        return result
+
+    def stream(
+        self, url: str, timeout: Optional[Timeout] = None
+    ) -> Union[CachedResponse, requests.Response]:
+        """Start a GET whose body is read as the caller goes, raising on failure.
+
+        Fresh and revalidated cache entries are replayed from disk. Bodies
+        read from the network are not cached, since callers rarely read them
+        to the end. Close the response, or use it as a context manager.
+        """
+        cache = self.cache
+        if cache and cache.is_fresh(url):
+            cached = cache.lookup(url)
+            if cached is not None:
+                return cached
+
+        headers = cache.conditional_headers(url) if cache else {}
+        response = self.request(url, timeout, headers, stream=True)
+        if cache and response.status_code == 304:
+            response.close()
+            cached = cache.lookup(url)
+            if cached is not None:
+                cache.revalidated(url, response.headers)
+                return cached
+            response = self.request(url, timeout, stream=True)
+        if not response.ok:
+            response.close()
+            response.raise_for_status()
+        return response
+
+    def iter_content(
+        self, url: str, timeout: Optional[Timeout] = None, chunk_size: int = 16384
+    ) -> Iterator[bytes]:
+        """Stream a body in chunks so callers can stop reading early"""
+        with self.stream(url, timeout) as response:
+            yield from response.iter_content(chunk_size)
+
+    def get_json(
+        self,
+        url: str,
+        params: Optional[Mapping[str, str]] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Any:
+        response = self.request(url, timeout, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def post_json(
+        self,
+        url: str,
+        payload: Any,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[Timeout] = None,
+    ) -> Any:
+        """POST a JSON body and decode the JSON reply; never cached or retried"""
+        response = self.session.post(
+            url, json=payload, headers=headers, timeout=timeout or self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,123 @@
+import html
+import re
+from collections import OrderedDict
+from typing import Iterator
+
+PARAGRAPH_BREAK = re.compile(r" {2,}|\n\s*\n")
+TAG = re.compile(r"<[^>]+>")
+WORD = re.compile(r"\S+")
+
+
+def plain_text(markup: str) -> str:
+    """Strip tags and entities from a feed's HTML description"""
+    # block-level closers become paragraph breaks so the layout keeps them
+    text = re.sub(r"(?i)</(p|div|li|h[1-6])>|<br\s*/?>", "  ", markup)
+    return html.unescape(TAG.sub("", text)).strip()
+
+
+def _paragraphs(text: str) -> Iterator[str]:
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        yield text[start : match.start()]
+        start = match.end()
+    yield text[start:]
+
+
+def wrap_lazily(text: str, width: int) -> Iterator[str]:
+    """Greedy word wrap that yields lines as it goes.
+
+    Paragraphs (runs of two or more spaces, or blank lines) are separated by
+    an empty line, and words longer than the width are split, much like
+    textwrap.wrap applied paragraph by paragraph.
+    """
+    width = max(1, width)
+    seen_paragraph = False
+    for paragraph in _paragraphs(text):
+        line = ""
+        started = False
+        for match in WORD.finditer(paragraph):
+            word = match.group()
+            if not started:
+                if seen_paragraph:
+                    yield ""
+                started = seen_paragraph = True
+            while len(word) > width:
+                if line:
+                    yield line
+                    line = ""
+                yield word[:width]
+                word = word[width:]
+            if not line:
+                line = word
+            elif len(line) + 1 + len(word) <= width:
+                line = f"{line} {word}"
+            else:
+                yield line
+                line = word
+        if line:
+            yield line
+
+
+class TextLayout:
+    """Wrapped lines of one text at one width, laid out only as far as asked"""
+
+    def __init__(self, text: str, width: int) -> None:
+        self.text = text
+        self.width = width
+        self._source = wrap_lazily(text, width)
+        self._lines: list[str] = []
+        self._complete = False
+
+    def _extend_to(self, count: int) -> None:
+        while not self._complete and len(self._lines) < count:
+            try:
+                self._lines.append(next(self._source))
+            except StopIteration:
+                self._complete = True
+
+    def lines(self, start: int, count: int) -> list[str]:
+        self._extend_to(start + count)
+        return self._lines[start : start + count]
+
+    def has_line(self, index: int) -> bool:
+        self._extend_to(index + 1)
+        return index < len(self._lines)
+
+    def laid_out(self) -> int:
+        """How many lines have been wrapped so far"""
+        return len(self._lines)
+
+
+class LayoutCache:
+    """LRU of TextLayouts keyed by (content hash, width).
+
+    A different width means the terminal was resized, so every cached layout
+    is dropped at once instead of waiting to age out.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self.width = None
+        self._layouts: OrderedDict[tuple[int, int], TextLayout] = OrderedDict()
+
+    def invalidate(self) -> None:
+        self._layouts.clear()
+
+    def get(self, text: str, width: int) -> TextLayout:
+        if width != self.width:
+            self.invalidate()
+            self.width = width
+        # str caches its hash, so repeat lookups for the same text are O(1)
+        key = (hash(text), len(text))
+        layout = self._layouts.get(key)
+        if layout is not None and layout.text == text:
+            self._layouts.move_to_end(key)
+            return layout
+        layout = TextLayout(text, width)
+        self._layouts[key] = layout
+        if len(self._layouts) > self.max_entries:
+            self._layouts.popitem(last=False)
+        return layout
+
+    def __len__(self) -> int:
+        return len(self._layouts)
@@ -0,0 +1,432 @@
+import heapq
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from src.modules.fact_check import FactIndex
+    from src.modules.rss import Feed, Post
+    from src.modules.sentiment import SentimentScorer
+    from src.modules.similarity import SimilarityIndex
+    from src.modules.store import ArticleStore
+    from src.modules.summarize import SummaryPipeline
+    from src.modules.topics import TopicFilter
+
+
+class FeedFailure:
+    """A feed (or its homepage) that could not be loaded"""
+
+    def __init__(self, feed: "Feed", stage: str, error: BaseException) -> None:
+        self.feed = feed
+        self.stage = stage
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"{self.feed.title} ({self.stage}): {type(self.error).__name__}: {self.error}"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+class LoadResult:
+    def __init__(self, feeds: list["Feed"]) -> None:
+        self.feeds = feeds
+        self.failures: list[FeedFailure] = []
+
+    @property
+    def failed_feeds(self) -> list["Feed"]:
+        failed = []
+        for failure in self.failures:
+            if failure.feed not in failed:
+                failed.append(failure.feed)
+        return failed
+
+    def ok(self) -> bool:
+        return not self.failures
+
+
+class _Task:
+    def __init__(
+        self,
+        feed: "Feed",
+        stage: str,
+        url: str,
+        run: Callable[[], Optional[BaseException]],
+    ) -> None:
+        self.feed = feed
+        self.stage = stage
+        self.url = url
+        self.host = urlparse(url).netloc.lower()
+        self.run = run
+        self.started = False
+
+
+class FeedLoader:
+    """Fetch feeds and their homepages in parallel.
+
+    At most ``max_workers`` requests run at once, and at most ``per_host`` of
+    those go to the same host. Tasks for a saturated host wait in the queue
+    instead of tying up a worker thread, and a queued feed can be moved to the
+    front with ``prioritize``.
+
+    With a ``store``, fetched entries are merged into the article history and
+    each feed shows the newest ``history_limit`` posts from it. With
+    ``topics``, every post is tagged before its feed's posts are published,
+    and with ``sentiment`` every post is scored and the feed's mood updated.
+    Posts that are unchanged from the ones already showing keep their tags,
+    scores and summaries, so a refresh only works on what is new. With
+    ``similarity`` and ``facts``, posts are indexed for the stories view and
+    fact checks on the worker too, before listeners hear about the feed.
+    With a ``summarizer``, summaries for the newest posts are filled in from
+    its memo or queued for it to write.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        per_host: int = 2,
+        timeout: float = 10.0,
+        store: Optional["ArticleStore"] = None,
+        history_limit: int = 500,
+        topics: Optional["TopicFilter"] = None,
+        sentiment: Optional["SentimentScorer"] = None,
+        summarizer: Optional["SummaryPipeline"] = None,
+        similarity: Optional["SimilarityIndex"] = None,
+        facts: Optional["FactIndex"] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.store = store
+        self.history_limit = history_limit
+        self.topics = topics
+        self.sentiment = sentiment
+        self.summarizer = summarizer
+        self.similarity = similarity
+        self.facts = facts
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="feed-loader"
+        )
+        self._lock = threading.Lock()
+        self._queue: list[tuple[int, int, _Task]] = []
+        self._counter = itertools.count()
+        self._active = 0
+        self._active_per_host: dict[str, int] = {}
+        self._tasks_by_feed: dict[int, list[_Task]] = {}
+        self._listeners: list[Callable] = []
+        # the topic matcher each feed's showing posts were tagged with, by link
+        self._tagged_with: dict[str, object] = {}
+
+    def add_listener(
+        self, listener: Callable[["Feed", str, Optional[BaseException]], None]
+    ) -> None:
+        """Call ``listener(feed, stage, error)`` from a worker after each fetch"""
+        self._listeners.append(listener)
+
+    def prefetch(self, feeds: list["Feed"]) -> None:
+        """Queue posts and missing descriptions for every feed without waiting"""
+        for feed in feeds:
+            for task in self._tasks_for(feed, refresh=False):
+                self._enqueue(task)
+        self._pump()
+
+    def refresh(
+        self,
+        feeds: list["Feed"],
+        on_done: Optional[Callable[["Feed", Optional[Exception]], None]] = None,
+    ) -> None:
+        """Like prefetch, but also re-fetch feeds whose posts are already loaded.
+
+        ``on_done`` is called from a worker thread with each feed and the
+        error its refresh raised, if any.
+        """
+        for feed in feeds:
+            for task in self._tasks_for(feed, refresh=True, on_done=on_done):
+                self._enqueue(task)
+        self._pump()
+
+    def restore(self, feeds: list["Feed"], background: bool = False) -> None:
+        """Fill feeds from the article store so they render before any fetch.
+
+        With ``background`` the work is queued for the workers instead of
+        done here: each feed is restored ahead of any fetch for it, and
+        listeners hear about it with the "restore" stage.
+        """
+        if self.store is None:
+            return
+        if not background:
+            for feed in feeds:
+                self._restore(feed)
+            return
+        for feed in feeds:
+            task = _Task(feed, "restore", "", lambda feed=feed: self._restore(feed))
+            self._enqueue(task, priority=0)
+        self._pump()
+
+    def _restore(self, feed: "Feed") -> None:
+        posts = self.store.posts_for_feed(feed, limit=self.history_limit)
+        if posts:
+            self._annotate(feed, posts)
+            feed.posts = posts
+        elif feed.posts_value.done():
+            # only the session snapshot knew this feed; badge its posts too, but
+            # leave summaries to the refresh, as the snapshot keeps a preview
+            self._annotate(feed, feed.posts, summarize=False)
+        if feed.needs_description():
+            description = self.store.feed_description(feed)
+            if description:
+                feed.description = description
+
+    def retag(self, feeds: list["Feed"]) -> None:
+        """Re-tag the posts showing in each feed after the topics change.
+
+        The work is queued for the workers, and listeners hear about each
+        feed with the "topics" stage. A feed already tagged with the current
+        topics, say by a refresh that got there first, is left alone.
+        """
+        if self.topics is None:
+            return
+        for feed in feeds:
+            if feed.posts_value.done():
+                task = _Task(feed, "topics", "", lambda feed=feed: self._retag(feed))
+                self._enqueue(task)
+        self._pump()
+
+    def _retag(self, feed: "Feed") -> None:
+        self._tag(feed, feed.posts, fresh=[])
+
+    def forget(self, feed: "Feed") -> None:
+        """Drop what the loader remembers about a feed that is going away"""
+        with self._lock:
+            self._tagged_with.pop(feed.feed_link, None)
+            for task in self._tasks_by_feed.pop(id(feed), []):
+                # its heap entry is skipped once the task is marked started
+                task.started = True
+
+    def prioritize(self, feed: "Feed") -> None:
+        """Move a feed's queued work ahead of everything else"""
+        with self._lock:
+            for task in self._tasks_by_feed.get(id(feed), []):
+                if not task.started:
+                    # the old heap entry is skipped once the task has started
+                    heapq.heappush(self._queue, (0, next(self._counter), task))
+        self._pump()
+
+    def load(self, feeds: list["Feed"]) -> LoadResult:
+        """Fetch posts and any missing descriptions for every feed, then wait"""
+        self.prefetch(feeds)
+        result = LoadResult(feeds)
+        for feed in feeds:
+            for stage, value in (
+                ("posts", feed.posts_value),
+                ("description", feed.description_value),
+            ):
+                value.wait()
+                error = value.exception()
+                if error is not None:
+                    result.failures.append(FeedFailure(feed, stage, error))
+        return result
+
+    def completed(
+        self, feeds: Iterable["Feed"], window: Optional[int] = None
+    ) -> Iterator[tuple["Feed", Optional[BaseException]]]:
+        """Fetch posts for every feed, yielding each feed as its fetch ends.
+
+        Only ``window`` feeds (twice ``max_workers`` by default) are fetched
+        ahead of the caller, so a slow consumer holds at most that many feeds'
+        posts at once. Descriptions are not fetched.
+        """
+        done: queue.SimpleQueue = queue.SimpleQueue()
+        pending = iter(feeds)
+        in_flight = 0
+        for feed in itertools.islice(pending, window or 2 * self.max_workers):
+            self._fetch_posts(feed, done)
+            in_flight += 1
+        self._pump()
+        while in_flight:
+            feed, error = done.get()
+            in_flight -= 1
+            # top the window back up before handing the finished feed over
+            for next_feed in itertools.islice(pending, 1):
+                self._fetch_posts(next_feed, done)
+                in_flight += 1
+                self._pump()
+            yield feed, error
+
+    def _fetch_posts(self, feed: "Feed", done: queue.SimpleQueue) -> None:
+        def on_done(feed: "Feed", error: Optional[BaseException]) -> None:
+            done.put((feed, error))
+
+        self._enqueue(
+            _Task(feed, "posts", feed.feed_link, lambda: self._posts_job(feed, on_done))
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _tasks_for(
+        self, feed: "Feed", refresh: bool, on_done: Optional[Callable] = None
+    ) -> list[_Task]:
+        tasks = []
+        if refresh or not feed.posts_value.started():
+            tasks.append(
+                _Task(
+                    feed,
+                    "posts",
+                    feed.feed_link,
+                    lambda: self._posts_job(feed, on_done),
+                )
+            )
+        if feed.needs_description():
+            tasks.append(
+                _Task(
+                    feed,
+                    "description",
+                    feed.website_link,
+                    lambda: self._description_job(feed),
+                )
+            )
+        return tasks
+
+    def _description_job(self, feed: "Feed") -> Optional[BaseException]:
+        feed.description_value.run(lambda: self._load_description(feed))
+        return feed.description_value.exception()
+
+    def _posts_job(
+        self, feed: "Feed", on_done: Optional[Callable] = None
+    ) -> Optional[BaseException]:
+        error = None
+        if not feed.posts_value.started():
+            feed.posts_value.run(lambda: self._load_posts(feed))
+            error = feed.posts_value.exception()
+        else:
+            # already showing posts; keep them if the refresh fails
+            try:
+                feed.posts = self._load_posts(feed)
+            except Exception as e:
+                logging.error(f"Error refreshing feed {feed.feed_link}: {e}")
+                error = e
+        if on_done:
+            on_done(feed, error)
+        return error
+
+    def _load_posts(self, feed: "Feed") -> list["Post"]:
+        if self.store is None:
+            posts = feed.fetch_posts(timeout=self.timeout)
+        else:
+            fetched = feed.fetch_posts(num_posts=None, timeout=self.timeout)
+            self.store.upsert_posts(feed, fetched)
+            posts = self.store.posts_for_feed(feed, limit=self.history_limit)
+        self._annotate(feed, posts)
+        return posts
+
+    def _annotate(
+        self, feed: "Feed", posts: list["Post"], summarize: bool = True
+    ) -> None:
+        fresh = self._carry_over(feed, posts)
+        if self.topics is not None:
+            self._tag(feed, posts, fresh)
+        if self.sentiment is not None:
+            self.sentiment.score(posts)
+            feed.mood = self.sentiment.mood(posts)
+        if self.summarizer is not None and summarize:
+            self.summarizer.summarize_posts(posts)
+        # both skip posts they have already indexed
+        if self.similarity is not None:
+            self.similarity.add(feed, posts)
+        if self.facts is not None:
+            self.facts.add(feed, posts)
+
+    def _tag(self, feed: "Feed", posts: list["Post"], fresh: list["Post"]) -> None:
+        matcher = self.topics.matcher
+        if self._tagged_with.get(feed.feed_link) is not matcher:
+            # the topics changed since this feed was last tagged
+            fresh = posts
+        self.topics.tag(fresh, matcher)
+        self._tagged_with[feed.feed_link] = matcher
+
+    @staticmethod
+    def _carry_over(feed: "Feed", posts: list["Post"]) -> list["Post"]:
+        """Copy topics, sentiment and summaries from the posts already showing.
+
+        Returns the posts that still need working out: new ones, edited ones,
+        and any that are themselves the posts showing, as after a snapshot.
+        """
+        previous = {post.guid: post for post in feed.posts_value.get(None) or ()}
+        fresh = []
+        for post in posts:
+            old = previous.get(post.guid)
+            if old is None or old is post or not old.same_content(post):
+                fresh.append(post)
+                continue
+            post.topics = old.topics
+            post.sentiment = old.sentiment
+            post.summary = old.summary
+        return fresh
+
+    def _load_description(self, feed: "Feed") -> str:
+        description = feed.fetch_summary_from_website(timeout=self.timeout)
+        if self.store is not None:
+            self.store.save_description(feed, description)
+        return description
+
+    def _enqueue(self, task: _Task, priority: int = 1) -> None:
+        with self._lock:
+            self._tasks_by_feed.setdefault(id(task.feed), []).append(task)
+            heapq.heappush(self._queue, (priority, next(self._counter), task))
+
+    def _pump(self) -> None:
+        """Start as many queued tasks as the global and per-host caps allow"""
+        with self._lock:
+            deferred = []
+            while self._queue and self._active < self.max_workers:
+                entry = heapq.heappop(self._queue)
+                task = entry[2]
+                if task.started:
+                    continue
+                # local work, like a restore, has no host to be polite to
+                if (
+                    task.host
+                    and self._active_per_host.get(task.host, 0) >= self.per_host
+                ) or (task.stage != "restore" and self._restoring(task.feed)):
+                    deferred.append(entry)
+                    continue
+                task.started = True
+                self._active += 1
+                if task.host:
+                    self._active_per_host[task.host] = (
+                        self._active_per_host.get(task.host, 0) + 1
+                    )
+                self._executor.submit(self._run, task)
+            for entry in deferred:
+                heapq.heappush(self._queue, entry)
+
+    def _restoring(self, feed: "Feed") -> bool:
+        # fetches wait for the stored history, so it never lands on top of them
+        return any(
+            task.stage == "restore" for task in self._tasks_by_feed.get(id(feed), [])
+        )
+
+    def _run(self, task: _Task) -> None:
+        error = None
+        try:
+            error = task.run()
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                self._active -= 1
+                if task.host:
+                    self._active_per_host[task.host] -= 1
+                tasks = self._tasks_by_feed.get(id(task.feed), [])
+                if task in tasks:
+                    tasks.remove(task)
+                if not tasks:
+                    self._tasks_by_feed.pop(id(task.feed), None)
+            self._pump()
+        for listener in self._listeners:
+            listener(task.feed, task.stage, error)
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from src.utils.helpers import default_cache_dir, shared_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (url, content_hash)
+);
+CREATE INDEX IF NOT EXISTS summaries_by_use ON summaries (last_used);
+"""
+
+
+class SummaryMemo:
+    """Persistent memo of summaries derived from web pages.
+
+    Entries are keyed by URL plus an optional caller-supplied hash of the
+    content they were derived from, so a changed input misses the memo.
+    Entries expire after ``ttl`` seconds and the least recently used are
+    evicted beyond ``max_entries`` or ``max_bytes``. Concurrent callers
+    asking for the same key share a single computation.
+    """
+
+    _default: Optional["SummaryMemo"] = None
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 7 * 86400,
+        max_entries: int = 5000,
+        max_bytes: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.path = path or os.path.join(default_cache_dir(), "summaries.db")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple[str, str], Future] = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def default(cls) -> "SummaryMemo":
+        return shared_default(cls, cls)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, url: str, content_hash: str = "") -> Optional[str]:
+        """Return an unexpired summary, or None"""
+        with self._lock:
+            return self._get(url, content_hash)
+
+    def _get(self, url: str, content_hash: str) -> Optional[str]:
+        now = time.time()
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries "
+                "WHERE url = ? AND content_hash = ?",
+                (url, content_hash),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute(
+                    "DELETE FROM summaries WHERE url = ? AND content_hash = ?",
+                    (url, content_hash),
+                )
+                return None
+            self._conn.execute(
+                "UPDATE summaries SET last_used = ? "
+                "WHERE url = ? AND content_hash = ?",
+                (now, url, content_hash),
+            )
+        return row[0]
+
+    def get_many(self, url: str, content_hashes: list[str]) -> dict[str, str]:
+        """Unexpired summaries for many hashes under one URL, in a few queries"""
+        now = time.time()
+        found: dict[str, str] = {}
+        with self._lock, self._conn:
+            # stay under SQLite's limit on bound parameters
+            for start in range(0, len(content_hashes), 500):
+                chunk = content_hashes[start : start + 500]
+                marks = ", ".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT content_hash, summary FROM summaries "
+                    f"WHERE url = ? AND content_hash IN ({marks}) AND created_at >= ?",
+                    (url, *chunk, now - self.ttl),
+                ).fetchall()
+                found.update(rows)
+                self._conn.execute(
+                    "UPDATE summaries SET last_used = ? "
+                    f"WHERE url = ? AND content_hash IN ({marks})",
+                    (now, url, *chunk),
+                )
+        return found
+
+    def put(self, url: str, summary: str, content_hash: str = "") -> None:
+        now = time.time()
+        size = len(summary.encode())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries "
+                "(url, content_hash, summary, created_at, last_used, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash, summary, now, now, size),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        rows = self._conn.execute(
+            "SELECT url, content_hash, size FROM summaries ORDER BY last_used"
+        )
+        for url, content_hash, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((url, content_hash))
+            count -= 1
+            total -= size
+        self._conn.executemany(
+            "DELETE FROM summaries WHERE url = ? AND content_hash = ?", victims
+        )
+
+    def get_or_compute(
+        self, url: str, compute: Callable[[], str], content_hash: str = ""
+    ) -> str:
+        """Return the memoized summary, computing it at most once per key at a time"""
+        key = (url, content_hash)
+        # looked up and claimed under one lock, so a computation that finishes
+        # in between cannot be repeated
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                summary = self._get(url, content_hash)
+                if summary is not None:
+                    return summary
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            summary = compute()
+        except BaseException as e:
+            # failures are shared with the waiters but never memoized
+            future.set_exception(e)
+            raise
+        else:
+            self.put(url, summary, content_hash)
+            future.set_result(summary)
+            return summary
+        finally:
+            with self._lock:
+                del self._in_flight[key]
@@ -0,0 +1,237 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from urllib.parse import urlparse
+
+from src.utils.helpers import shared_default
+
+# bucket upper bounds; anything larger lands in the +Inf bucket
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FRAME_SECONDS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.1)
+BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ENTRIES = (1, 5, 10, 25, 50, 100, 250, 500)
+
+HISTOGRAMS = {
+    "fetch_connect_seconds": (SECONDS, "Time to open a connection (DNS, TCP, TLS)"),
+    "fetch_ttfb_seconds": (SECONDS, "Time from request to response headers"),
+    "fetch_download_seconds": (SECONDS, "Time reading the response body"),
+    "fetch_bytes": (BYTES, "Feed body size"),
+    "parse_seconds": (SECONDS, "Time parsing a feed"),
+    "feed_entries": (ENTRIES, "Entries in a parsed feed"),
+    "frame_seconds": (FRAME_SECONDS, "Time to draw one UI frame"),
+}
+PREFIX = "myeditorial_"
+
+
+class Histogram:
+    """Counts of observations per bucket, Prometheus style"""
+
+    def __init__(self, bounds: tuple) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "bounds": list(self.bounds),
+            "counts": self.counts,
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+        }
+
+    def to_prometheus(self, name: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class FeedTiming:
+    """What the last fetch of one feed cost, and how it ended"""
+
+    def __init__(self, title: str, feed_link: str) -> None:
+        self.title = title
+        self.feed_link = feed_link
+        self.connect = 0.0
+        self.ttfb = 0.0
+        self.download = 0.0
+        self.nbytes = 0
+        self.parse = 0.0
+        self.entries = 0
+        self.from_cache = False
+        self.error: Optional[str] = None
+        self.when = time.time()
+
+    @property
+    def total(self) -> float:
+        return self.ttfb + self.download + self.parse
+
+    def add_fetch(self, timing) -> None:
+        """Copy in a FetchTiming from the Fetcher"""
+        if timing is None:
+            return
+        self.connect = timing.connect
+        self.ttfb = timing.ttfb
+        self.download = timing.download
+        self.nbytes = timing.nbytes
+        self.from_cache = timing.from_cache
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in vars(self)}
+
+    def __str__(self) -> str:
+        name = (self.title or urlparse(self.feed_link).netloc)[:24]
+        if self.error:
+            return f"{self.total:6.2f}s  {name:<24} {self.error}"
+        cached = " (cached)" if self.from_cache else ""
+        return (
+            f"{self.total:6.2f}s  {name:<24} connect {self.connect * 1000:.0f}ms "
+            f"ttfb {self.ttfb * 1000:.0f}ms parse {self.parse * 1000:.0f}ms "
+            f"{self.entries} entries {self.nbytes / 1024:.0f}KB{cached}"
+        )
+
+
+class Metrics:
+    """Fetch, parse and frame timings, kept as histograms and per feed.
+
+    Workers record fetches and the UI records frames; ``lines()`` is the
+    live summary DebugView shows, and ``dump()`` writes everything out as
+    JSON or, for a ``.prom`` path, Prometheus text.
+    """
+
+    _default: Optional["Metrics"] = None
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms = {
+            name: Histogram(bounds) for name, (bounds, _) in HISTOGRAMS.items()
+        }
+        self.feeds: dict[str, FeedTiming] = {}
+        self.errors: Counter = Counter()
+        self.started = time.time()
+
+    @classmethod
+    def default(cls) -> "Metrics":
+        return shared_default(cls, cls)
+
+    def record_fetch(self, timing: FeedTiming) -> None:
+        with self._lock:
+            self.feeds[timing.feed_link] = timing
+            if timing.error:
+                self.errors[timing.error] += 1
+                return
+            observed = self.histograms
+            # fresh cache hits never touched the network; 304s did
+            if timing.ttfb > 0:
+                observed["fetch_connect_seconds"].observe(timing.connect)
+                observed["fetch_ttfb_seconds"].observe(timing.ttfb)
+                observed["fetch_download_seconds"].observe(timing.download)
+                observed["fetch_bytes"].observe(timing.nbytes)
+            observed["parse_seconds"].observe(timing.parse)
+            observed["feed_entries"].observe(timing.entries)
+
+    def record_frame(self, seconds: float) -> None:
+        with self._lock:
+            self.histograms["frame_seconds"].observe(seconds)
+
+    def slowest(self, count: int) -> list[FeedTiming]:
+        with self._lock:
+            timings = list(self.feeds.values())
+        return sorted(timings, key=lambda timing: -timing.total)[:count]
+
+    def lines(self, count: int) -> list[str]:
+        """Up to ``count`` lines: medians and p95s, errors, then the slowest feeds"""
+
+        def ms(name: str, q: float) -> str:
+            return f"{self.histograms[name].quantile(q) * 1000:.0f}"
+
+        with self._lock:
+            fetched = self.histograms["fetch_ttfb_seconds"].count
+            frames = self.histograms["frame_seconds"]
+            summary = [
+                f"{len(self.feeds)} feeds, {fetched} fetched | "
+                f"ttfb p50 {ms('fetch_ttfb_seconds', 0.5)}ms "
+                f"p95 {ms('fetch_ttfb_seconds', 0.95)}ms | "
+                f"parse p50 {ms('parse_seconds', 0.5)}ms "
+                f"p95 {ms('parse_seconds', 0.95)}ms | "
+                f"frame p50 {frames.quantile(0.5) * 1000:.1f}ms "
+                f"p95 {frames.quantile(0.95) * 1000:.1f}ms"
+            ]
+            if self.errors:
+                summary.append(
+                    "errors: "
+                    + ", ".join(f"{k} {v}" for k, v in self.errors.most_common())
+                )
+        slowest = [str(timing) for timing in self.slowest(max(0, count - len(summary)))]
+        return (summary + slowest)[:count]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "dumped": time.time(),
+                "histograms": {
+                    name: histogram.to_dict()
+                    for name, histogram in self.histograms.items()
+                },
+                "errors": dict(self.errors),
+                "feeds": [timing.to_dict() for timing in self.feeds.values()],
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, histogram in self.histograms.items():
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {HISTOGRAMS[name][1]}")
+                lines.append(f"# TYPE {full} histogram")
+                lines.extend(histogram.to_prometheus(full))
+            lines.append(f"# HELP {PREFIX}fetch_errors_total Failed feed fetches")
+            lines.append(f"# TYPE {PREFIX}fetch_errors_total counter")
+            for error, count in self.errors.items():
+                lines.append(f'{PREFIX}fetch_errors_total{{error="{error}"}} {count}')
+            lines.append(f"# HELP {PREFIX}feed_seconds Last fetch and parse of a feed")
+            lines.append(f"# TYPE {PREFIX}feed_seconds gauge")
+            for timing in self.feeds.values():
+                link = timing.feed_link.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{PREFIX}feed_seconds{{feed="{link}"}} {timing.total}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write everything to ``path``: Prometheus text for .prom, else JSON"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            if path.endswith(".prom"):
+                file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), file, indent=2)
@@ -1,15 +1,215 @@
-from bs4 import BeautifulSoup, Tag, NavigableString
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Union
 import json
-import requests
-import feedparser
+import logging
+import sys
+import time
+import zlib
+
+from src.modules.loader import FeedLoader, LoadResult
+from src.modules.memo import SummaryMemo
+from src.modules.metrics import FeedTiming, Metrics
+from src.utils.helpers import LazyValue
+
+# requests, feedparser and everything built on them are imported where they
+# are first needed, so the UI can paint a restored session before they load
+if TYPE_CHECKING:
+    from src.modules.discovery import FeedCandidate
+    from src.modules.sentiment import FeedMood
+
+# descriptions and bodies at least this long are stored compressed
+COMPRESS_MIN = 256
+
+# seconds per sy:updatePeriod unit
+UPDATE_PERIODS = {
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 604800,
+    "monthly": 2592000,
+    "yearly": 31536000,
+}
+
+
+def publisher_interval(channel) -> Optional[float]:
+    """The polling interval a feed asks for through <ttl> or sy:updatePeriod"""
+    hints = []
+    try:
+        hints.append(float(channel["ttl"]) * 60)
+    except (KeyError, TypeError, ValueError):
+        pass
+    period = UPDATE_PERIODS.get(str(channel.get("sy_updateperiod", "")).strip())
+    if period:
+        try:
+            frequency = max(1, int(channel.get("sy_updatefrequency", 1)))
+        except (TypeError, ValueError):
+            frequency = 1
+        hints.append(period / frequency)
+    return max(hints) if hints else None
+
+
+def parse_json_feed(content: bytes, base_url: str):
+    """A JSON Feed (jsonfeed.org) shaped like feedparser's result, or None.
+
+    feedparser only reads XML, so JSON Feeds that discovery offers are read
+    here into the ``feed`` and ``entries`` fields fetch_posts uses.
+    """
+    import html
+    from datetime import datetime
+    from urllib.parse import urljoin
+
+    from feedparser import FeedParserDict
+
+    if not content[:2048].lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{"):
+        return None
+    try:
+        data = json.loads(content)
+        if "jsonfeed.org" not in str(data.get("version", "")):
+            return None
+    except (ValueError, AttributeError):
+        return None
+    entries = []
+    for item in data.get("items") or []:
+        if not isinstance(item, dict):
+            continue
+        entry = FeedParserDict(
+            title=item.get("title", ""),
+            link=urljoin(base_url, item.get("url") or item.get("external_url") or ""),
+            description=item.get("summary") or "",
+        )
+        if item.get("id") is not None:
+            entry["id"] = str(item["id"])
+        body = item.get("content_html") or html.escape(item.get("content_text") or "")
+        if body:
+            entry["content"] = [FeedParserDict(value=body)]
+            entry["description"] = entry["description"] or body
+        for key, field in (
+            ("date_published", "published_parsed"),
+            ("date_modified", "updated_parsed"),
+        ):
+            try:
+                entry[field] = datetime.fromisoformat(item[key]).utctimetuple()
+            except (KeyError, TypeError, ValueError):
+                pass
+        entries.append(entry)
+    return FeedParserDict(
+        feed=FeedParserDict(
+            title=data.get("title", ""),
+            link=data.get("home_page_url", ""),
+            subtitle=data.get("description", ""),
+        ),
+        entries=entries,
+    )
+
+
+def _split_link(link: str) -> tuple[str, str]:
+    """Split a URL after its last slash, interning the shared front part"""
+    cut = link.rfind("/") + 1
+    return sys.intern(link[:cut]), link[cut:]
+
+
+def _pack(text: str) -> Union[str, bytes]:
+    # short text compresses badly and is read often, so it stays a str
+    if len(text) < COMPRESS_MIN:
+        return text
+    # the fastest level; higher ones save little on a few hundred bytes
+    return zlib.compress(text.encode(), 1)
+
+
+def _unpack(packed: Union[str, bytes]) -> str:
+    if isinstance(packed, str):
+        return packed
+    return zlib.decompress(packed).decode()
 
 
 class Post:
-    def __init__(self, title: str, link: str, description: str) -> None:
+    """One feed entry, stored compactly since the history can run to 100k+.
+
+    Slots replace the per-instance dict. Links are split after their last
+    slash and the front part interned, so posts from one site share it, and
+    a guid equal to the link is not stored twice. Descriptions and bodies of
+    ``COMPRESS_MIN`` characters or more are kept zlib-compressed and decoded
+    on each read; readers that need one repeatedly should hold on to it.
+    """
+
+    __slots__ = (
+        "title",
+        "_link_prefix",
+        "_link_rest",
+        "_guid",
+        "_description",
+        "_body",
+        "topics",
+        "sentiment",
+        "summary",
+        "published",
+        "read",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        link: str,
+        description: str,
+        guid: Optional[str] = None,
+        published: Optional[float] = None,
+        read: bool = False,
+        body: str = "",
+    ) -> None:
         self.title = title
         self.link = link
         self.description = description
+        # full article text when the feed carries it (content:encoded)
+        self.body = body
+        # names of the topics it matched, see TopicFilter
+        self.topics: frozenset[str] = frozenset()
+        # -1 (negative) to 1 (positive), set once by SentimentScorer
+        self.sentiment: Optional[float] = None
+        # a short summary, filled in off the UI thread by SummaryPipeline
+        self.summary: Optional[str] = None
+        # entries without an id fall back to their link for deduplication
+        self.guid = guid or link
+        self.published = published
+        self.read = read
+
+    @property
+    def link(self) -> str:
+        return self._link_prefix + self._link_rest
+
+    @link.setter
+    def link(self, link: str) -> None:
+        self._link_prefix, self._link_rest = _split_link(link or "")
+
+    @property
+    def guid(self) -> str:
+        return self.link if self._guid is None else self._guid
+
+    @guid.setter
+    def guid(self, guid: str) -> None:
+        # most feeds use the link as the id; keep one copy
+        self._guid = None if guid == self.link else guid
+
+    @property
+    def description(self) -> str:
+        return _unpack(self._description)
+
+    @description.setter
+    def description(self, description: str) -> None:
+        self._description = _pack(description or "")
+
+    @property
+    def body(self) -> str:
+        return _unpack(self._body)
+
+    @body.setter
+    def body(self, body: str) -> None:
+        self._body = _pack(body or "")
+
+    def same_content(self, other: "Post") -> bool:
+        """Same title, description and body, compared without decompressing"""
+        return (
+            self.title == other.title
+            and self._description == other._description
+            and self._body == other._body
+        )
 
     def __repr__(self) -> str:
         return f"{self.title}, {self.link}, {self.description}"
@@ -29,58 +229,160 @@ class Post:
 
     def generate_summary_from_website(self) -> None:
         """Generate a summary from the website's content"""
+        import requests
+
+        from src.modules.extract import SummaryExtractor
+
         try:
-            response = requests.get(self.link)
-            soup = BeautifulSoup(response.content, "html.parser")
-            paragraphs = soup.find_all("p")
-            summary = " ".join(p.text for p in paragraphs[:3])
-            self.description = summary
+            self.description = SummaryExtractor.default().extract_url(
+                self.link, memo=SummaryMemo.default()
+            )
         except requests.RequestException:
             self.description = "Unable to fetch summary from website"
 
 
 class Feed:
+    __slots__ = (
+        "title",
+        "website_link",
+        "feed_link",
+        "posts_value",
+        "update_hint",
+        "cache_lifetime",
+        "mood",
+        "description_value",
+    )
+
     def __init__(
         self, title: str, website_link: str, feed_link: str, description: str
     ) -> None:
         self.title = title
-        self.website_link = website_link
-        self.feed_link = feed_link
+        # interned, since every store lookup and index key repeats them
+        self.website_link = sys.intern(website_link or "")
+        self.feed_link = sys.intern(feed_link or "")
+        # nothing is fetched here; posts and description load on first use or
+        # earlier if a FeedLoader prefetches them
+        self.posts_value = LazyValue(self.fetch_posts)
+        # what the last fetch said about how often to poll, see RefreshScheduler
+        self.update_hint: Optional[float] = None
+        self.cache_lifetime: Optional[float] = None
+        # aggregate sentiment of the scored posts, kept so renders never rescore
+        self.mood: Optional["FeedMood"] = None
         if description == "":
-            self.generate_summary_from_website()
+            self.description_value = LazyValue(self.fetch_summary_from_website)
         else:
-            self.description = description
-        self.posts = self.get_latest_posts()
+            self.description_value = LazyValue.of(description)
+
+    @property
+    def posts(self) -> List[Post]:
+        try:
+            return self.posts_value.result()
+        except Exception as e:
+            logging.error(f"Error fetching posts for feed {self.feed_link}: {e}")
+            return []
+
+    @posts.setter
+    def posts(self, posts: List[Post]) -> None:
+        self.posts_value.set(posts)
+
+    @property
+    def description(self) -> str:
+        try:
+            return self.description_value.result()
+        except Exception:
+            return "Unable to fetch summary from website"
+
+    @description.setter
+    def description(self, description: str) -> None:
+        self.description_value.set(description)
+
+    def is_loaded(self) -> bool:
+        return self.posts_value.done() and self.description_value.done()
 
     def __str__(self) -> str:
         return f"title: {self.title}, website_link: {self.website_link}, \
         feed_link: {self.feed_link}, description: {self.description}, {len(self.posts)} posts"
 
-    def get_latest_posts(self, num_posts=10) -> List[Post]:
-        """Retrieve the latest posts from the feed"""
-        try:
-            feed = feedparser.parse(self.feed_link)
-            posts = []
+    def needs_description(self) -> bool:
+        return not self.description_value.started()
+
+    def fetch_posts(
+        self, num_posts: Optional[int] = 10, timeout: Optional[float] = None
+    ) -> List[Post]:
+        """Fetch and parse the latest posts (all of them if num_posts is None)"""
+        import calendar
 
-            for entry in feed.entries[:num_posts]:
-                post = Post(
-                    title=entry.title, link=entry.link, description=entry.description
+        import feedparser
+
+        from src.modules.cache import freshness_lifetime
+        from src.modules.fetch import Fetcher
+
+        timing = FeedTiming(self.title, self.feed_link)
+        try:
+            response = Fetcher.default().get(self.feed_link, timeout=timeout)
+            timing.add_fetch(response.timing)
+            response.raise_for_status()
+            start = time.perf_counter()
+            base_url = response.url or self.feed_link
+            feed = parse_json_feed(response.content, base_url)
+            if feed is None:
+                # the base URL and charset resolve relative links and decode the body
+                feed = feedparser.parse(
+                    response.content,
+                    response_headers={
+                        "content-location": base_url,
+                        "content-type": response.headers.get("content-type", ""),
+                    },
                 )
-                posts.append(post)
+            timing.parse = time.perf_counter() - start
+            timing.entries = len(feed.entries)
+        except Exception as e:
+            timing.error = type(e).__name__
+            raise
+        finally:
+            Metrics.default().record_fetch(timing)
+        self.update_hint = publisher_interval(feed.feed)
+        self.cache_lifetime = freshness_lifetime(response.headers)
+        posts = []
+
+        for entry in feed.entries[:num_posts]:
+            published = entry.get("published_parsed") or entry.get("updated_parsed")
+            post = Post(
+                title=entry.get("title", ""),
+                link=entry.get("link", ""),
+                description=entry.get("description", ""),
+                guid=entry.get("id"),
+                published=calendar.timegm(published) if published else None,
+                body=entry.content[0].get("value", "") if entry.get("content") else "",
+            )
+            posts.append(post)
+
+        return posts
 
-            return posts
+    def get_latest_posts(self, num_posts=10) -> List[Post]:
+        """Retrieve the latest posts from the feed"""
+        try:
+            posts = self.fetch_posts(num_posts)
         except Exception as e:
-            print(f"Error fetching posts for feed {self.feed_link}: {e}")
+            logging.error(f"Error fetching posts for feed {self.feed_link}: {e}")
             return []
+        self.posts = posts
+        return posts
+
+    def fetch_summary_from_website(self, timeout: Optional[float] = None) -> str:
+        """Fetch the homepage and summarize its first paragraphs, raising on failure"""
+        from src.modules.extract import SummaryExtractor
+
+        return SummaryExtractor.default().extract_url(
+            self.website_link, timeout=timeout, memo=SummaryMemo.default()
+        )
 
     def generate_summary_from_website(self) -> None:
         """Generate a summary from the website's content"""
+        import requests
+
         try:
-            response = requests.get(self.website_link)
-            soup = BeautifulSoup(response.content, "html.parser")
-            paragraphs = soup.find_all("p")
-            summary = " ".join(p.text for p in paragraphs[:3])
-            self.description = summary
+            self.description = self.fetch_summary_from_website()
         except requests.RequestException:
             self.description = "Unable to fetch summary from website"
 
@@ -88,49 +390,40 @@ class Feed:
 class FeedParser:
     @staticmethod
     def extract_rss_feed_from_website(website_url: str) -> list[str]:
-        """Discover the RSS feed URL from a website's main page."""
-        response = requests.get(website_url)
-        soup = BeautifulSoup(response.content, "html.parser")
-        link: Optional[Union[Tag, NavigableString]] = soup.find(
-            "link", {"type": "application/rss+xml"}
-        )
-        if isinstance(link, Tag):
-            href_value = link["href"]
-            if isinstance(href_value, list):
-                return href_value
-            else:
-                return [href_value]
-        else:
-            return []
+        """Discover the feed URLs a website announces in its <head>"""
+        from src.modules.discovery import FeedDiscovery
+
+        return FeedDiscovery.default().homepage_feeds(website_url)
 
     @staticmethod
     def search_rss_feeds(keywords):
         """Search for RSS feeds based on keywords."""
-        api_url = f"https://cloud.feedly.com/v3/search/feeds?query={keywords}"
-        response = requests.get(api_url)
-        feeds = response.json().get("results", [])
-        return feeds
+        from src.modules.discovery import FeedDiscovery
+
+        return FeedDiscovery.default().search(keywords)
+
+    @staticmethod
+    def feed_from_candidate(candidate: "FeedCandidate") -> Feed:
+        # an empty description is scraped lazily (and memoized) on first use
+        return Feed(
+            title=candidate.title,
+            website_link=candidate.website_link,
+            feed_link=candidate.feed_link,
+            description=candidate.description,
+        )
 
     @classmethod
     def discover_feeds(cls, query: str) -> List[Feed]:
-        feeds_data = cls.search_rss_feeds(query)
-        feed_objects = []
-        for feed_data in feeds_data:
-            feed = Feed(
-                title=feed_data.get("title"),
-                website_link=feed_data.get("website"),
-                feed_link=feed_data.get("feedId").replace("feed/", ""),
-                description=feed_data.get("description", ""),
-            )
-            if not feed.description:
-                feed.generate_summary_from_website()
-            feed_objects.append(feed)
+        """Every valid feed for a query, best first, once all have been checked"""
+        from src.modules.discovery import FeedDiscovery
 
-        return feed_objects
+        candidates = FeedDiscovery.default().discover(query)
+        ranked = sorted(candidates, key=lambda candidate: -candidate.score)
+        return [cls.feed_from_candidate(candidate) for candidate in ranked]
 
     @classmethod
-    def load_feeds_from_file(cls, file_path: str) -> List[Feed]:
-        """Load feeds from a specified source file"""
+    def read_sources(cls, file_path: str) -> List[Feed]:
+        """Build lazy Feed objects from a specified source file"""
         with open(file_path, "r") as file:
             data = json.load(file)
             sources = data.get("sources", [])
@@ -146,3 +439,23 @@ class FeedParser:
                 feed_objects.append(feed)
 
         return feed_objects
+
+    @classmethod
+    def load_feeds_with_result(
+        cls, file_path: str, loader: Optional[FeedLoader] = None
+    ) -> LoadResult:
+        """Load feeds from a source file concurrently, reporting any failures"""
+        loader = loader or FeedLoader()
+        return loader.load(cls.read_sources(file_path))
+
+    @classmethod
+    def load_feeds_from_file(
+        cls, file_path: str, loader: Optional[FeedLoader] = None
+    ) -> List[Feed]:
+        """Load feeds from a specified source file, prefetching in the background"""
+        loader = loader or FeedLoader()
+        feeds = cls.read_sources(file_path)
+        # stored history renders straight away; the refresh replaces it when done
+        loader.restore(feeds)
+        loader.refresh(feeds)
+        return feeds
@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import logging
+import random
+import statistics
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from src.modules.loader import FeedLoader
+    from src.modules.rss import Feed
+
+
+class FeedSchedule:
+    """Polling state the scheduler keeps for one feed"""
+
+    def __init__(self, feed: "Feed", interval: float) -> None:
+        self.feed = feed
+        self.interval = interval
+        self.next_due = 0.0
+        self.failures = 0
+        self.in_flight = False
+        self.newest_seen: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.feed.title}: every {self.interval:.0f}s, "
+            f"{self.failures} failures, due {self.next_due:.0f}"
+        )
+
+
+def retry_after(error: Optional[Exception]) -> Optional[float]:
+    """Seconds a 429/503 response asked us to wait, if it said"""
+    response = getattr(error, "response", None)
+    if response is None or response.status_code not in (429, 503):
+        return None
+    value = response.headers.get("Retry-After", "")
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    # or an HTTP-date to wait until
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max(0.0, until.timestamp() - time.time())
+
+
+class RefreshScheduler:
+    """Keep loaded feeds fresh by re-fetching each on its own schedule.
+
+    Each feed's interval is learned from the gaps between its posts, never
+    polled faster than its <ttl>/sy:updatePeriod or HTTP freshness lifetime
+    allow, and backed off exponentially while it fails or is rate limited.
+    Due feeds go to the FeedLoader's bounded pool, and every delay is
+    jittered so feeds loaded together drift apart instead of polling in
+    lockstep. The scheduler has no thread of its own: the owner's event loop
+    calls ``run_due`` and sleeps for as long as it returns.
+    """
+
+    def __init__(
+        self,
+        feeds: list["Feed"],
+        loader: "FeedLoader",
+        min_interval: float = 5 * 60,
+        max_interval: float = 6 * 3600,
+        default_interval: float = 30 * 60,
+        max_backoff: float = 24 * 3600,
+        jitter: float = 0.1,
+        on_refresh: Optional[Callable[["Feed", Optional[Exception]], None]] = None,
+    ) -> None:
+        self.loader = loader
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.on_refresh = on_refresh
+        self.default_interval = default_interval
+        self._lock = threading.Lock()
+        self._queue: list[tuple[float, int, FeedSchedule]] = []
+        self._counter = itertools.count()
+        self.schedules: dict[int, FeedSchedule] = {}
+        now = time.time()
+        for feed in feeds:
+            schedule = FeedSchedule(feed, default_interval)
+            self.schedules[id(feed)] = schedule
+            # feeds were just loaded at startup; spread their first refresh out
+            self._push(schedule, now + random.uniform(0.5, 1.0) * default_interval)
+
+    def add(self, feed: "Feed") -> None:
+        """Schedule a feed that joined after startup, as if just loaded"""
+        schedule = FeedSchedule(feed, self.default_interval)
+        self.schedules[id(feed)] = schedule
+        self._push(schedule, time.time() + self.default_interval)
+
+    def refresh_now(self, feed: "Feed") -> None:
+        """Move a feed to the front of the schedule"""
+        schedule = self.schedules.get(id(feed))
+        if schedule is not None:
+            self._push(schedule, time.time())
+
+    def _push(self, schedule: FeedSchedule, due: float) -> None:
+        with self._lock:
+            schedule.next_due = due
+            heapq.heappush(self._queue, (due, next(self._counter), schedule))
+
+    def run_due(self) -> Optional[float]:
+        """Hand due feeds to the loader; return seconds until the next is due.
+
+        None means nothing is scheduled. Refreshes that finish reschedule
+        their feed, so callers should check back within a few seconds even
+        when the next feed is due much later.
+        """
+        due = self._pop_due()
+        if due:
+            for schedule in due:
+                schedule.in_flight = True
+            self.loader.refresh(
+                [schedule.feed for schedule in due], on_done=self._refreshed
+            )
+        with self._lock:
+            if not self._queue:
+                return None
+            return max(0.0, self._queue[0][0] - time.time())
+
+    def _pop_due(self) -> list[FeedSchedule]:
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now:
+                when, _, schedule = heapq.heappop(self._queue)
+                # skip entries superseded by a later _push or already running
+                if when != schedule.next_due or schedule.in_flight:
+                    continue
+                due.append(schedule)
+        return due
+
+    def _refreshed(self, feed: "Feed", error: Optional[Exception]) -> None:
+        schedule = self.schedules.get(id(feed))
+        if schedule is None:
+            return
+        schedule.in_flight = False
+        if error is None:
+            schedule.failures = 0
+            schedule.interval = self.next_interval(schedule)
+            delay = schedule.interval
+        else:
+            schedule.failures += 1
+            delay = min(schedule.interval * 2**schedule.failures, self.max_backoff)
+            delay = max(delay, retry_after(error) or 0)
+            logging.debug(
+                "Backing off %s for %.0fs after %s", feed.feed_link, delay, error
+            )
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._push(schedule, time.time() + delay)
+        if self.on_refresh:
+            self.on_refresh(feed, error)
+
+    def next_interval(self, schedule: FeedSchedule) -> float:
+        """Pick the next polling interval from cadence, history and server hints"""
+        feed = schedule.feed
+        published = sorted(
+            post.published for post in feed.posts if post.published is not None
+        )
+        newest = published[-1] if published else None
+        found_new = newest is not None and (
+            schedule.newest_seen is None or newest > schedule.newest_seen
+        )
+        schedule.newest_seen = newest
+
+        gaps = [later - earlier for earlier, later in zip(published, published[1:])]
+        gaps = [gap for gap in gaps if gap > 0]
+        if len(gaps) >= 2:
+            # poll about twice per typical gap between posts
+            interval = statistics.median(gaps[-20:]) / 2
+        elif found_new:
+            interval = schedule.interval * 0.75
+        else:
+            interval = schedule.interval * 1.5
+
+        # the publisher and the HTTP cache both set a floor on useful polling
+        for floor in (feed.update_hint, feed.cache_lifetime):
+            if floor:
+                interval = max(interval, floor)
+        return min(max(interval, self.min_interval), self.max_interval)
@@ -0,0 +1,287 @@
+import hashlib
+import itertools
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+
+from src.modules.layout import plain_text
+
+if TYPE_CHECKING:
+    from src.modules.rss import Post
+
+WORD = re.compile(r"[a-z']+")
+
+# valence from -3 (very negative) to 3 (very positive), tuned for headlines
+LEXICON = {
+    "abuse": -3,
+    "accident": -2,
+    "accused": -2,
+    "agree": 1,
+    "agreement": 1,
+    "alarm": -2,
+    "angry": -2,
+    "attack": -2,
+    "attacks": -2,
+    "award": 2,
+    "bad": -2,
+    "ban": -1,
+    "bankrupt": -3,
+    "beat": 1,
+    "benefit": 2,
+    "best": 3,
+    "blast": -2,
+    "boost": 2,
+    "breakthrough": 3,
+    "bribery": -3,
+    "celebrate": 3,
+    "charged": -2,
+    "cheer": 2,
+    "clash": -2,
+    "collapse": -3,
+    "concern": -1,
+    "concerns": -1,
+    "conflict": -2,
+    "corruption": -3,
+    "crash": -3,
+    "crisis": -3,
+    "critical": -1,
+    "cure": 3,
+    "cut": -1,
+    "cuts": -1,
+    "damage": -2,
+    "danger": -2,
+    "dead": -3,
+    "deadly": -3,
+    "death": -3,
+    "deaths": -3,
+    "decline": -1,
+    "defeat": -2,
+    "delay": -1,
+    "died": -3,
+    "disaster": -3,
+    "dispute": -1,
+    "drop": -1,
+    "excellent": 3,
+    "fail": -2,
+    "failed": -2,
+    "failure": -2,
+    "fear": -2,
+    "fears": -2,
+    "fine": 1,
+    "fire": -1,
+    "flood": -2,
+    "fraud": -3,
+    "gain": 2,
+    "gains": 2,
+    "good": 2,
+    "great": 3,
+    "grow": 1,
+    "growth": 2,
+    "happy": 3,
+    "harm": -2,
+    "hero": 2,
+    "hope": 2,
+    "hopes": 2,
+    "hurt": -2,
+    "improve": 2,
+    "improved": 2,
+    "injured": -2,
+    "innovative": 2,
+    "killed": -3,
+    "killing": -3,
+    "kills": -3,
+    "lose": -2,
+    "loss": -2,
+    "losses": -2,
+    "love": 3,
+    "murder": -3,
+    "peace": 2,
+    "praise": 2,
+    "problem": -1,
+    "profit": 2,
+    "progress": 2,
+    "protest": -1,
+    "rally": 1,
+    "record": 1,
+    "recover": 2,
+    "recovery": 2,
+    "rescue": 2,
+    "rescued": 2,
+    "rise": 1,
+    "risk": -1,
+    "safe": 2,
+    "scandal": -3,
+    "slump": -2,
+    "soar": 2,
+    "strike": -1,
+    "strong": 2,
+    "success": 3,
+    "successful": 3,
+    "suffer": -2,
+    "surge": 1,
+    "terror": -3,
+    "threat": -2,
+    "threatens": -2,
+    "top": 1,
+    "tragedy": -3,
+    "victory": 3,
+    "violence": -3,
+    "war": -3,
+    "warning": -2,
+    "welcome": 2,
+    "win": 2,
+    "wins": 2,
+    "won": 2,
+    "worse": -2,
+    "worst": -3,
+}
+NEGATORS = frozenset(
+    {"not", "no", "never", "without", "nor", "isn't", "wasn't", "don't", "won't"}
+)
+# how many tokens after a negator have their valence flipped, and by how much
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.74
+# squashes a summed valence into [-1, 1]; larger means slower saturation
+ALPHA = 15.0
+
+
+def content_hash(post: "Post") -> str:
+    digest = hashlib.sha1()
+    for field in (post.title, post.description, post.body):
+        digest.update((field or "").encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class FeedMood:
+    """A feed's average sentiment and which way its newest posts lean"""
+
+    def __init__(self, mean: float, recent: float, scored: int) -> None:
+        self.mean = mean
+        self.recent = recent
+        self.scored = scored
+
+    @property
+    def trend(self) -> str:
+        if self.recent > self.mean + 0.1:
+            return "up"
+        if self.recent < self.mean - 0.1:
+            return "down"
+        return "flat"
+
+    def __str__(self) -> str:
+        arrow = {"up": "^", "down": "v", "flat": "="}[self.trend]
+        return f"mood {self.mean:+.2f}{arrow}"
+
+
+class SentimentScorer:
+    """Lexicon sentiment for posts, scored a batch at a time.
+
+    Each batch is tokenized into one NumPy array of token ids. Valences are
+    looked up for the whole array at once, words within ``NEGATION_WINDOW``
+    tokens after a negator are flipped using a cumulative sum, and per-post
+    totals come from a single ``reduceat``. Totals are squashed into [-1, 1].
+    Results are cached by a hash of the post's text, so a post that comes
+    back on the next refresh, or from the store, is never scored twice.
+    """
+
+    def __init__(
+        self, lexicon: Optional[dict[str, float]] = None, max_entries: int = 100_000
+    ) -> None:
+        lexicon = LEXICON if lexicon is None else lexicon
+        # id 0 is every word outside the lexicon
+        words = ["", *sorted(set(lexicon) | NEGATORS)]
+        self.vocabulary = {word: index for index, word in enumerate(words)}
+        self.valence = np.array(
+            [lexicon.get(word, 0.0) for word in words], dtype=np.float32
+        )
+        self.negator = np.array([word in NEGATORS for word in words], dtype=np.int32)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def token_ids(self, text: str) -> list[int]:
+        return list(
+            map(self.vocabulary.get, WORD.findall(text.lower()), itertools.repeat(0))
+        )
+
+    def score_texts(self, texts: list[str]) -> np.ndarray:
+        """Scores in [-1, 1] for a batch of plain texts"""
+        lengths = np.empty(len(texts), dtype=np.int64)
+        ids: list[int] = []
+        for i, text in enumerate(texts):
+            tokens = self.token_ids(text)
+            lengths[i] = len(tokens)
+            ids.extend(tokens)
+        if not ids:
+            return np.zeros(len(texts), dtype=np.float32)
+        ids_array = np.fromiter(ids, dtype=np.int32, count=len(ids))
+        values = self.valence[ids_array]
+
+        # negators seen in the window before each token, not counting ones
+        # from the previous post
+        starts = np.zeros(len(texts), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        seen = np.concatenate(([0], np.cumsum(self.negator[ids_array])))
+        positions = np.arange(len(ids_array))
+        post_start = np.repeat(starts, lengths)
+        window_start = np.maximum(positions - NEGATION_WINDOW, post_start)
+        negated = seen[positions] - seen[window_start] > 0
+        values = np.where(negated, values * NEGATION_FACTOR, values)
+
+        totals = np.zeros(len(texts), dtype=np.float32)
+        nonempty = lengths > 0
+        totals[nonempty] = np.add.reduceat(values, starts[nonempty])
+        return totals / np.sqrt(totals * totals + ALPHA)
+
+    def score(self, posts: Iterable["Post"]) -> None:
+        """Set ``sentiment`` on every post that does not have one yet"""
+        pending: dict[str, list["Post"]] = {}
+        with self._lock:
+            for post in posts:
+                if post.sentiment is not None:
+                    continue
+                key = content_hash(post)
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    post.sentiment = cached
+                else:
+                    pending.setdefault(key, []).append(post)
+        if not pending:
+            return
+
+        texts = []
+        for same in pending.values():
+            post = same[0]
+            texts.append(
+                f"{post.title}\n{plain_text(post.description or '')}\n"
+                f"{plain_text(post.body or '')}"
+            )
+        scores = self.score_texts(texts)
+        with self._lock:
+            for (key, same), value in zip(pending.items(), scores):
+                value = float(value)
+                self._cache[key] = value
+                for post in same:
+                    post.sentiment = value
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def mood(posts: list["Post"], recent: int = 10) -> Optional[FeedMood]:
+        """Aggregate already-scored posts; ``posts`` are newest first"""
+        scores = [post.sentiment for post in posts if post.sentiment is not None]
+        if not scores:
+            return None
+        return FeedMood(
+            sum(scores) / len(scores),
+            sum(scores[:recent]) / len(scores[:recent]),
+            len(scores),
+        )
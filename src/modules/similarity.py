@@ -0,0 +1,332 @@
+import math
+import re
+import threading
+import time
+import zlib
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+
+from src.modules.layout import plain_text
+
+if TYPE_CHECKING:
+    from src.modules.rss import Feed, Post
+
+WORD = re.compile(r"[^\W\d_]{2,}")
+STOPWORDS = frozenset("""
+    a an and are as at be been but by for from had has have he her his how i
+    if in into is it its more most new not of on or our out over says said she
+    so than that the their them they this to up was we were what when which
+    who will with would you your after about all also can could just like may
+    no one only other some there these those two us very via
+    """.split())
+# how much of a long description or body goes into a post's vector
+MAX_TEXT = 4000
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so "killed", "kills" and "killing" meet"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def terms(text: str) -> list[str]:
+    return [stem(word) for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def features(title: str, text: str) -> dict[str, float]:
+    """Term counts for one post; title words count double, plus title bigrams"""
+    counts: dict[str, float] = {}
+    title_terms = terms(title)
+    for term in title_terms:
+        counts[term] = counts.get(term, 0.0) + 2.0
+    for first, second in zip(title_terms, title_terms[1:]):
+        bigram = f"{first} {second}"
+        counts[bigram] = counts.get(bigram, 0.0) + 1.0
+    for term in terms(text[:MAX_TEXT]):
+        counts[term] = counts.get(term, 0.0) + 1.0
+    return counts
+
+
+class Story:
+    """Posts from one or more feeds that cover the same event"""
+
+    def __init__(self, rows: list[int], posts: list["Post"], feeds: list["Feed"]):
+        self.rows = rows
+        self.posts = posts
+        self.feeds = feeds
+
+    @property
+    def sources(self) -> int:
+        return len({feed.feed_link for feed in self.feeds})
+
+    @property
+    def newest(self) -> float:
+        return max((post.published or 0.0) for post in self.posts)
+
+    @property
+    def title(self) -> str:
+        return f"[{self.sources}] {self.posts[0].title}"
+
+
+class SimilarityIndex:
+    """Hashed TF-IDF vectors for every post, clustered into stories.
+
+    Each post becomes a row of a float32 matrix: its terms are hashed into
+    ``dims`` buckets with a random sign (so collisions cancel out on average),
+    weighted by sublinear tf times the idf of the corpus as it stood when the
+    post arrived, and L2-normalised. Rows are appended in place as posts come
+    in, with the matrix doubling when full, so a refresh costs one matrix
+    product against the posts and stories already indexed rather than a
+    rebuild. A post joins the story whose centroid it is most similar to, if
+    that similarity reaches ``threshold``, and starts a new story otherwise.
+    Posts published more than ``max_age`` seconds ago are left out, since
+    stories are about what is happening now. The index holds at most
+    ``max_posts`` rows: when it fills up, posts that have aged out and then
+    the oldest are evicted and the stories rebuilt from what is left.
+    """
+
+    def __init__(
+        self,
+        dims: int = 2048,
+        threshold: float = 0.25,
+        capacity: int = 128,
+        max_age: Optional[float] = 3 * 86400,
+        max_posts: int = 4096,
+    ) -> None:
+        self.dims = dims
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_posts = max_posts
+        self._lock = threading.Lock()
+        self.vectors = np.zeros((capacity, dims), dtype=np.float32)
+        self.count = 0
+        self.posts: list["Post"] = []
+        self.feeds: list["Feed"] = []
+        self._rows: dict[tuple[str, str], int] = {}
+        # document frequency per bucket, for idf
+        self.doc_freq = np.zeros(dims, dtype=np.float32)
+        # unnormalised centroid sums, one row per story
+        self.centroids = np.zeros((capacity, dims), dtype=np.float32)
+        self.centroid_norms = np.zeros(capacity, dtype=np.float32)
+        self.story_count = 0
+        self.story_of: list[int] = []
+        self.members: list[list[int]] = []
+        # bumped whenever posts are added, so readers can tell stories moved
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _hash(self, counts: dict[str, float]) -> tuple[np.ndarray, np.ndarray]:
+        buckets = np.empty(len(counts), dtype=np.int64)
+        values = np.empty(len(counts), dtype=np.float32)
+        for i, (term, count) in enumerate(counts.items()):
+            h = zlib.crc32(term.encode())
+            buckets[i] = h % self.dims
+            values[i] = (1.0 + math.log(count)) * (1.0 if h & 0x80000000 else -1.0)
+        return buckets, values
+
+    def vectorize(self, posts: Iterable["Post"]) -> np.ndarray:
+        """Rows for posts under the current idf, without adding them"""
+        hashed = [
+            self._hash(features(post.title or "", plain_text(post.description or "")))
+            for post in posts
+        ]
+        return self._weigh(hashed)
+
+    def _weigh(self, hashed: list[tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        matrix = np.zeros((len(hashed), self.dims), dtype=np.float32)
+        for i, (buckets, values) in enumerate(hashed):
+            np.add.at(matrix[i], buckets, values)
+        idf = np.log((1.0 + self.count) / (1.0 + self.doc_freq)) + 1.0
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        capacity = min(capacity, max(needed, self.max_posts))
+        for name in ("vectors", "centroids", "centroid_norms"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=np.float32)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, feed: "Feed", posts: list["Post"]) -> list[int]:
+        """Index the posts not seen before; returns the stories they joined"""
+        cutoff = time.time() - self.max_age if self.max_age else None
+        with self._lock:
+            fresh = []
+            for post in posts:
+                key = (feed.feed_link, post.guid)
+                if cutoff and post.published is not None and post.published < cutoff:
+                    continue
+                if key not in self._rows:
+                    self._rows[key] = -1
+                    fresh.append(post)
+            if not fresh:
+                return []
+            # feeds list newest first; past the cap only the newest fit
+            fresh = fresh[: self.max_posts]
+            if self.count + len(fresh) > self.max_posts:
+                self._evict(len(fresh), cutoff)
+
+            hashed = [
+                self._hash(features(p.title or "", plain_text(p.description or "")))
+                for p in fresh
+            ]
+            for buckets, _ in hashed:
+                self.doc_freq[np.unique(buckets)] += 1
+            start = self.count
+            self.count += len(fresh)
+            batch = self._weigh(hashed)
+            self._grow(self.count)
+            self.vectors[start : self.count] = batch
+            for offset, post in enumerate(fresh):
+                self._rows[(feed.feed_link, post.guid)] = start + offset
+                self.posts.append(post)
+                self.feeds.append(feed)
+            joined = self._cluster(batch, start)
+            self.generation += 1
+            return joined
+
+    def _evict(self, incoming: int, cutoff: Optional[float]) -> None:
+        """Drop aged-out posts, then the oldest, leaving room for ``incoming``.
+
+        A quarter of the index is freed beyond what is needed so this runs
+        rarely. Evicted posts stay known, so a refresh does not add them back.
+        """
+        room = max(0, self.max_posts * 3 // 4 - incoming)
+        newest = sorted(
+            range(self.count),
+            key=lambda row: self.posts[row].published or 0.0,
+            reverse=True,
+        )
+        keep = [
+            row
+            for row in newest
+            if not (cutoff and (self.posts[row].published or cutoff) < cutoff)
+        ][:room]
+        keep.sort()
+        for row in set(range(self.count)) - set(keep):
+            self._rows[(self.feeds[row].feed_link, self.posts[row].guid)] = -1
+
+        rows = np.array(keep, dtype=np.int64)
+        kept = len(keep)
+        self.vectors[:kept] = self.vectors[rows]
+        self.vectors[kept : self.count] = 0
+        self.posts = [self.posts[row] for row in keep]
+        self.feeds = [self.feeds[row] for row in keep]
+        for row, (post, feed) in enumerate(zip(self.posts, self.feeds)):
+            self._rows[(feed.feed_link, post.guid)] = row
+        self.count = kept
+        self.doc_freq = np.count_nonzero(self.vectors[:kept], axis=0).astype(np.float32)
+
+        # renumber the stories that still have posts and rebuild their centroids
+        renumbered: dict[int, int] = {}
+        self.story_of = [
+            renumbered.setdefault(self.story_of[row], len(renumbered)) for row in keep
+        ]
+        self.story_count = len(renumbered)
+        self.members = [[] for _ in range(self.story_count)]
+        for row, story in enumerate(self.story_of):
+            self.members[story].append(row)
+        self.centroids[:] = 0
+        np.add.at(
+            self.centroids, np.array(self.story_of, dtype=np.int64), self.vectors[:kept]
+        )
+        self.centroid_norms[:] = 0
+        self.centroid_norms[: self.story_count] = np.linalg.norm(
+            self.centroids[: self.story_count], axis=1
+        )
+
+    def _cluster(self, batch: np.ndarray, start: int) -> list[int]:
+        existing = self.story_count
+        # one product scores the whole batch against every known story, and
+        # another against itself for stories the batch starts
+        norms = np.maximum(self.centroid_norms[:existing], 1e-6)
+        scores = batch @ self.centroids[:existing].T / norms
+        pairs = batch @ batch.T
+        started: dict[int, list[int]] = {}
+
+        joined = []
+        for i, vector in enumerate(batch):
+            best, best_score = -1, self.threshold
+            if existing:
+                candidate = int(np.argmax(scores[i]))
+                if scores[i, candidate] >= best_score:
+                    best, best_score = candidate, scores[i, candidate]
+            for story, batch_rows in started.items():
+                score = pairs[i, batch_rows].sum() / self.centroid_norms[story]
+                if score >= best_score:
+                    best, best_score = story, score
+            if best < 0:
+                best = self.story_count
+                self.story_count += 1
+                self.members.append([])
+                started[best] = []
+            if best in started:
+                started[best].append(i)
+            self.centroids[best] += vector
+            self.centroid_norms[best] = np.linalg.norm(self.centroids[best])
+            self.members[best].append(start + i)
+            self.story_of.append(best)
+            joined.append(best)
+        return joined
+
+    def similar(self, post: "Post", feed: "Feed", k: int = 5) -> list[tuple]:
+        """The k posts most like an indexed post, as (post, feed, score)"""
+        with self._lock:
+            row = self._rows.get((feed.feed_link, post.guid), -1)
+            if row < 0:
+                return []
+            return self._nearest(self.vectors[row : row + 1], k, exclude=row)[0]
+
+    def similar_to(self, posts: list["Post"], k: int = 5) -> list[list[tuple]]:
+        """Batched lookup for posts that need not be indexed"""
+        with self._lock:
+            return self._nearest(self.vectorize(posts), k)
+
+    def _nearest(
+        self, queries: np.ndarray, k: int, exclude: Optional[int] = None
+    ) -> list[list[tuple]]:
+        scores = queries @ self.vectors[: self.count].T
+        if exclude is not None:
+            scores[:, exclude] = -1.0
+        k = min(k, self.count)
+        results = []
+        for row in scores:
+            # argpartition finds the top k without sorting every score
+            top = np.argpartition(-row, k - 1)[:k] if k else []
+            top = sorted(top, key=lambda i: -row[i])
+            results.append(
+                [
+                    (self.posts[i], self.feeds[i], float(row[i]))
+                    for i in top
+                    if row[i] > 0
+                ]
+            )
+        return results
+
+    def stories(self, min_sources: int = 2) -> list[Story]:
+        """Stories covered by at least ``min_sources`` feeds, newest first"""
+        with self._lock:
+            stories = []
+            for rows in self.members:
+                story = Story(
+                    list(rows),
+                    [self.posts[row] for row in rows],
+                    [self.feeds[row] for row in rows],
+                )
+                if story.sources >= min_sources:
+                    stories.append(story)
+        stories.sort(key=lambda story: story.newest, reverse=True)
+        return stories
@@ -0,0 +1,101 @@
+import html
+import json
+import logging
+import os
+import zlib
+from typing import Optional
+
+from src.modules.layout import plain_text
+from src.modules.rss import Feed, Post
+from src.utils.helpers import default_data_dir
+
+VERSION = 1
+# posts keep a plain-text preview of their description, short enough that
+# Post never compresses it; the store and the refresh bring back the full text
+PREVIEW = 200
+
+
+class SessionSnapshot:
+    """The last session's feeds, newest posts and selection, kept on disk.
+
+    Written on exit and read on launch so the first frame shows last
+    session's lists straight away, before the store is opened or anything
+    is fetched; the background refresh then replaces what is stale. Only
+    the newest ``posts_per_feed`` posts of each feed, with a preview of
+    each description, are kept in one zlib-compressed JSON document.
+    """
+
+    def __init__(self, path: Optional[str] = None, posts_per_feed: int = 30) -> None:
+        self.path = path or os.path.join(default_data_dir(), "session.snapshot")
+        self.posts_per_feed = posts_per_feed
+
+    def save(self, feeds: list[Feed], selected: int = 0) -> None:
+        entries = []
+        for feed in feeds:
+            entry = {"feed_link": feed.feed_link, "posts": []}
+            if feed.description_value.done() and not feed.description_value.exception():
+                entry["description"] = feed.description_value.get()
+            if feed.posts_value.done():
+                entry["posts"] = [
+                    self._pack_post(post)
+                    for post in feed.posts_value.get([])[: self.posts_per_feed]
+                ]
+            entries.append(entry)
+        data = json.dumps(
+            {"version": VERSION, "selected": selected, "feeds": entries},
+            separators=(",", ":"),
+        ).encode()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # written aside and renamed, so a crash never leaves half a snapshot
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(zlib.compress(data, 6))
+        os.replace(temporary, self.path)
+
+    def restore(self, feeds: list[Feed]) -> Optional[int]:
+        """Fill in the feeds the snapshot knows and return its selection.
+
+        Returns None, leaving every feed alone, if there is no usable
+        snapshot.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                data = json.loads(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logging.error(f"Ignoring unreadable session snapshot {self.path}: {e}")
+            return None
+        if data.get("version") != VERSION:
+            return None
+        by_link = {entry["feed_link"]: entry for entry in data["feeds"]}
+        for feed in feeds:
+            entry = by_link.get(feed.feed_link)
+            if entry is None:
+                continue
+            if entry["posts"]:
+                feed.posts = [self._unpack_post(post) for post in entry["posts"]]
+            if "description" in entry and feed.needs_description():
+                feed.description = entry["description"]
+        return max(0, min(data.get("selected", 0), len(feeds) - 1))
+
+    @staticmethod
+    def _pack_post(post: Post) -> list:
+        guid = "" if post.guid == post.link else post.guid
+        return [
+            post.title,
+            post.link,
+            # cut as text, so no tag or entity is left half open
+            html.escape(plain_text(post.description)[:PREVIEW], quote=False),
+            guid,
+            post.published,
+            post.read,
+            post.summary,
+        ]
+
+    @staticmethod
+    def _unpack_post(packed: list) -> Post:
+        title, link, description, guid, published, read, summary = packed
+        post = Post(title, link, description, guid or None, published, read)
+        post.summary = summary
+        return post
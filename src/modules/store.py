@@ -0,0 +1,363 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.modules.layout import plain_text
+from src.modules.rss import Feed, Post
+from src.utils.helpers import default_data_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    id INTEGER PRIMARY KEY,
+    feed_link TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    website_link TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    refreshed_at REAL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    feed_id INTEGER NOT NULL REFERENCES feeds (id) ON DELETE CASCADE,
+    guid TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    link TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    -- publication time, or first_seen when the feed gives none
+    published REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    read INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (feed_id, guid)
+);
+CREATE INDEX IF NOT EXISTS posts_by_feed ON posts (feed_id, published DESC);
+CREATE INDEX IF NOT EXISTS posts_by_date ON posts (published DESC);
+CREATE INDEX IF NOT EXISTS posts_by_read ON posts (feed_id, read, published DESC);
+"""
+
+# Full-text index over posts. It reads its content from the posts table, so
+# only the index itself is stored, and triggers keep it in step with every
+# insert, edit and delete. Descriptions are indexed as plain text; the
+# plain_text() SQL function is registered on each connection.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5 (
+    title, description, body,
+    content = 'posts', content_rowid = 'id',
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, description, body)
+    VALUES (new.id, new.title, plain_text(new.description), plain_text(new.body));
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, description, body)
+    VALUES ('delete', old.id, old.title, plain_text(old.description),
+        plain_text(old.body));
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_update
+AFTER UPDATE OF title, description, body ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, description, body)
+    VALUES ('delete', old.id, old.title, plain_text(old.description),
+        plain_text(old.body));
+    INSERT INTO posts_fts (rowid, title, description, body)
+    VALUES (new.id, new.title, plain_text(new.description), plain_text(new.body));
+END;
+"""
+
+# bm25 column weights: a hit in the title counts for more than one in the text
+SEARCH_WEIGHTS = (10.0, 2.0, 1.0)
+# only the newest matches are scored, so common words stay fast on big archives
+SEARCH_CANDIDATES = 2000
+MIN_PREFIX = 3
+
+
+def content_hash(post: Post) -> str:
+    """Fingerprint of the fields that make an entry worth re-saving"""
+    digest = hashlib.sha1()
+    for field in (post.title, post.link, post.description):
+        digest.update((field or "").encode())
+        digest.update(b"\0")
+    # only hashed when present, so posts without a body keep their old hash
+    if post.body:
+        digest.update(post.body.encode())
+    return digest.hexdigest()
+
+
+def match_query(text: str) -> str:
+    """Turn what the user typed into an FTS5 query.
+
+    Every word must match, and the last one matches as a prefix so results
+    appear while a word is still being typed. Words are quoted, so FTS5
+    operators and punctuation in the input are searched for literally.
+    """
+    words = [word.replace('"', '""') for word in text.split()]
+    terms = [f'"{word}"' for word in words]
+    # one or two letters prefix too many terms to merge at interactive speed
+    if terms and text[-1:].isalnum() and len(words[-1]) >= MIN_PREFIX:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchHit:
+    """One search result: a post, the feed it came from and its bm25 score"""
+
+    def __init__(self, feed_title: str, feed_link: str, post: Post, score: float):
+        self.feed_title = feed_title
+        self.feed_link = feed_link
+        self.post = post
+        self.score = score
+
+    @property
+    def title(self) -> str:
+        return f"{self.feed_title}: {self.post.title}"
+
+
+class ArticleStore:
+    """SQLite-backed history of every feed and post we have seen.
+
+    Posts are keyed by (feed, guid) so refreshes only write entries that are
+    new or whose content changed, and reads are served from indexes on feed,
+    date and read state. An FTS5 index over titles, descriptions and bodies
+    is maintained by triggers, so it is always as current as the posts.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.path.join(default_data_dir(), "articles.db")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # one connection shared by the loader's worker threads, serialized here
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("plain_text", 1, plain_text, deterministic=True)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+        self._feed_ids: dict[str, int] = {}
+
+    def _migrate(self) -> None:
+        """Bring databases written by older versions up to the current schema"""
+        columns = {
+            row["name"] for row in self._conn.execute("PRAGMA table_info(posts)")
+        }
+        if "body" not in columns:
+            self._conn.execute(
+                "ALTER TABLE posts ADD COLUMN body TEXT NOT NULL DEFAULT ''"
+            )
+        indexed = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'posts_fts'"
+        ).fetchone()
+        self._conn.executescript(SEARCH_SCHEMA)
+        if not indexed:
+            self._conn.execute(
+                "INSERT INTO posts_fts (rowid, title, description, body) "
+                "SELECT id, title, plain_text(description), plain_text(body) "
+                "FROM posts"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _feed_id(self, feed: Feed) -> int:
+        feed_id = self._feed_ids.get(feed.feed_link)
+        if feed_id is not None:
+            return feed_id
+        self._conn.execute(
+            "INSERT INTO feeds (feed_link, title, website_link) VALUES (?, ?, ?) "
+            "ON CONFLICT (feed_link) DO UPDATE SET "
+            "title = excluded.title, website_link = excluded.website_link",
+            (feed.feed_link, feed.title or "", feed.website_link or ""),
+        )
+        row = self._conn.execute(
+            "SELECT id FROM feeds WHERE feed_link = ?", (feed.feed_link,)
+        ).fetchone()
+        self._feed_ids[feed.feed_link] = row["id"]
+        return row["id"]
+
+    def upsert_feed(self, feed: Feed) -> int:
+        with self._lock, self._conn:
+            return self._feed_id(feed)
+
+    def save_description(self, feed: Feed, description: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE feeds SET description = ? WHERE id = ?",
+                (description, self._feed_id(feed)),
+            )
+
+    def feed_description(self, feed: Feed) -> str:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT description FROM feeds WHERE id = ?", (self._feed_id(feed),)
+            ).fetchone()
+        return row["description"] if row else ""
+
+    def upsert_posts(self, feed: Feed, posts: list[Post]) -> tuple[int, int]:
+        """Save new and changed posts; returns (inserted, updated) counts"""
+        now = time.time()
+        with self._lock, self._conn:
+            feed_id = self._feed_id(feed)
+            known = {}
+            guids = [post.guid for post in posts]
+            # stay under SQLite's bound-parameter limit on very long feeds
+            for start in range(0, len(guids), 500):
+                chunk = guids[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT guid, content_hash FROM posts WHERE feed_id = ? "
+                    f"AND guid IN ({','.join('?' * len(chunk))})",
+                    (feed_id, *chunk),
+                )
+                known.update((row["guid"], row["content_hash"]) for row in rows)
+
+            inserts, updates = [], []
+            for post in posts:
+                fingerprint = content_hash(post)
+                if post.guid not in known:
+                    inserts.append(
+                        (
+                            feed_id,
+                            post.guid,
+                            post.title or "",
+                            post.link or "",
+                            post.description or "",
+                            post.body or "",
+                            now if post.published is None else post.published,
+                            now,
+                            now,
+                            fingerprint,
+                        )
+                    )
+                    known[post.guid] = fingerprint
+                elif known[post.guid] != fingerprint:
+                    updates.append(
+                        (
+                            post.title or "",
+                            post.link or "",
+                            post.description or "",
+                            post.body or "",
+                            now,
+                            fingerprint,
+                            feed_id,
+                            post.guid,
+                        )
+                    )
+
+            self._conn.executemany(
+                "INSERT INTO posts (feed_id, guid, title, link, description, body, "
+                "published, first_seen, updated_at, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                inserts,
+            )
+            self._conn.executemany(
+                "UPDATE posts SET title = ?, link = ?, description = ?, body = ?, "
+                "updated_at = ?, content_hash = ? WHERE feed_id = ? AND guid = ?",
+                updates,
+            )
+            self._conn.execute(
+                "UPDATE feeds SET refreshed_at = ? WHERE id = ?", (now, feed_id)
+            )
+        return len(inserts), len(updates)
+
+    def _to_posts(self, rows) -> list[Post]:
+        return [
+            Post(
+                title=row["title"],
+                link=row["link"],
+                description=row["description"],
+                guid=row["guid"],
+                published=row["published"],
+                read=bool(row["read"]),
+                body=row["body"],
+            )
+            for row in rows
+        ]
+
+    def posts_for_feed(
+        self,
+        feed: Feed,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        unread_only: bool = False,
+    ) -> list[Post]:
+        """Newest-first posts of one feed"""
+        query = "SELECT * FROM posts WHERE feed_id = ?"
+        if unread_only:
+            query += " AND read = 0"
+        query += " ORDER BY published DESC LIMIT ? OFFSET ?"
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                query, (self._feed_id(feed), -1 if limit is None else limit, offset)
+            ).fetchall()
+        return self._to_posts(rows)
+
+    def recent_posts(
+        self,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+        unread_only: bool = False,
+    ) -> list[Post]:
+        """Newest-first posts across every feed"""
+        query = "SELECT * FROM posts WHERE published >= ?"
+        if unread_only:
+            query += " AND read = 0"
+        query += " ORDER BY published DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(
+                query, (since or 0, -1 if limit is None else limit)
+            ).fetchall()
+        return self._to_posts(rows)
+
+    def search(self, text: str, limit: int = 100) -> list[SearchHit]:
+        """Best-matching posts across every feed, best first"""
+        query = match_query(text)
+        if not query:
+            return []
+        # FTS5 walks the matches newest first and stops after the candidates,
+        # which are ranked by bm25 before only the top hits are joined
+        sql = (
+            "SELECT posts.*, feeds.title AS feed_title, feeds.feed_link, hits.score "
+            "FROM (SELECT rowid, score FROM ("
+            "SELECT rowid, bm25(posts_fts, ?, ?, ?) AS score FROM posts_fts "
+            "WHERE posts_fts MATCH ? ORDER BY rowid DESC LIMIT ?"
+            ") ORDER BY score LIMIT ?) AS hits "
+            "JOIN posts ON posts.id = hits.rowid "
+            "JOIN feeds ON feeds.id = posts.feed_id "
+            "ORDER BY hits.score"
+        )
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    sql, (*SEARCH_WEIGHTS, query, SEARCH_CANDIDATES, limit)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                logging.error(f"Search for {text!r} failed: {e}")
+                return []
+        posts = self._to_posts(rows)
+        return [
+            SearchHit(row["feed_title"], row["feed_link"], post, row["score"])
+            for row, post in zip(rows, posts)
+        ]
+
+    def unread_count(self, feed: Feed) -> int:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM posts WHERE feed_id = ? AND read = 0",
+                (self._feed_id(feed),),
+            ).fetchone()
+        return row[0]
+
+    def mark_read(self, feed: Feed, post: Post, read: bool = True) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE posts SET read = ? WHERE feed_id = ? AND guid = ?",
+                (int(read), self._feed_id(feed), post.guid),
+            )
+        post.read = read
@@ -0,0 +1,353 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from src.modules.fetch import Fetcher
+from src.modules.layout import plain_text
+from src.modules.memo import SummaryMemo
+from src.modules.similarity import terms
+from src.utils.helpers import default_data_dir
+
+if TYPE_CHECKING:
+    from src.modules.rss import Post
+
+SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+# how much of one post is sent to a backend
+MAX_INPUT = 6000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting; about four characters per token"""
+    return len(text) // 4 + 1
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def post_text(post: "Post") -> str:
+    text = f"{post.title}\n{plain_text(post.description or '')}"
+    if post.body:
+        text += f"\n{plain_text(post.body)}"
+    return text[:MAX_INPUT]
+
+
+class SummaryBackend:
+    """Turns a batch of texts into one summary each, in order"""
+
+    name = "backend"
+
+    def summarize(self, texts: list[str], max_words: int) -> list[str]:
+        raise NotImplementedError
+
+
+class ExtractiveBackend(SummaryBackend):
+    """Picks the sentences whose words recur most through the text.
+
+    Runs locally and needs no network, so it is the default backend.
+    """
+
+    name = "extractive"
+
+    def summarize(self, texts: list[str], max_words: int) -> list[str]:
+        return [self.summarize_one(text, max_words) for text in texts]
+
+    @staticmethod
+    def summarize_one(text: str, max_words: int) -> str:
+        sentences = [s.strip() for s in SENTENCE.split(text) if s.strip()]
+        if not sentences:
+            return ""
+        counts = Counter(term for sentence in sentences for term in terms(sentence))
+        scored = []
+        for index, sentence in enumerate(sentences):
+            words = terms(sentence)
+            score = sum(counts[word] for word in words) / math.sqrt(len(words) or 1)
+            # the opening sentences of news copy usually carry the story
+            scored.append((score / (1 + 0.1 * index), index))
+        chosen, words = [], 0
+        for _, index in sorted(scored, reverse=True):
+            length = len(sentences[index].split())
+            if chosen and words + length > max_words:
+                continue
+            chosen.append(index)
+            words += length
+            if words >= max_words:
+                break
+        summary = " ".join(sentences[index] for index in sorted(chosen))
+        split = summary.split()
+        if len(split) > max_words:
+            summary = " ".join(split[:max_words]) + "..."
+        return summary
+
+
+class HTTPBackend(SummaryBackend):
+    """A summarization service reached over HTTP.
+
+    Each batch is one POST of ``{"model", "max_words", "inputs": [...]}``
+    and the service answers ``{"summaries": [...]}`` in the same order.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model: str = "",
+        api_key: Optional[str] = None,
+        timeout: float = 60.0,
+        fetcher: Optional[Fetcher] = None,
+    ) -> None:
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.fetcher = fetcher or Fetcher.default()
+        self.name = f"http:{model or url}"
+
+    def summarize(self, texts: list[str], max_words: int) -> list[str]:
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        reply = self.fetcher.post_json(
+            self.url,
+            {"model": self.model, "max_words": max_words, "inputs": texts},
+            headers=headers,
+            timeout=self.timeout,
+        )
+        summaries = reply.get("summaries")
+        if not isinstance(summaries, list) or len(summaries) != len(texts):
+            raise ValueError(f"{self.url} answered {len(texts)} inputs badly")
+        return [str(summary) for summary in summaries]
+
+
+class TokenBucket:
+    """Allows ``per_minute`` units a minute, refilled continuously"""
+
+    def __init__(self, per_minute: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available"""
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # a request bigger than the whole bucket waits for a full one
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class SummaryPipeline:
+    """Summaries for posts and digests, produced off the UI thread.
+
+    ``summarize_posts`` and ``digest`` answer from memory or the persistent
+    memo when they can and queue the rest. One worker drains the queue in
+    batches of up to ``batch_size`` texts. Before each call it waits until
+    the requests-per-minute and tokens-per-minute budgets allow it. Work is
+    keyed by a hash of the text, so a post carried by several feeds, or
+    queued twice before its summary arrives, costs one summary. Summaries
+    are stored per backend and length, so switching backends does not serve
+    another backend's output.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[SummaryBackend] = None,
+        memo: Optional[SummaryMemo] = None,
+        batch_size: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_words: int = 60,
+        digest_words: int = 150,
+        per_feed: int = 25,
+    ) -> None:
+        self.backend = backend or ExtractiveBackend()
+        self.memo = memo or SummaryMemo(
+            os.path.join(default_data_dir(), "summaries.db"),
+            ttl=math.inf,
+            max_entries=200_000,
+            max_bytes=64 * 1024 * 1024,
+        )
+        self.batch_size = batch_size
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_words = max_words
+        self.digest_words = digest_words
+        self.per_feed = per_feed
+        self._condition = threading.Condition()
+        # text hash -> (text, max_words, callbacks waiting for its summary)
+        self._pending: OrderedDict[str, tuple[str, int, list[Callable]]] = OrderedDict()
+        self._busy = False
+        self._closed = False
+        # the digest last queued, dropped if another is asked for before it runs
+        self._digest_key: Optional[str] = None
+        # summaries seen this session, so renders never touch the database
+        self._recent: OrderedDict[str, str] = OrderedDict()
+        self._listeners: list[Callable[[], None]] = []
+        self._worker = threading.Thread(
+            target=self._run, name="summarizer", daemon=True
+        )
+        self._worker.start()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener()`` from the worker whenever summaries arrive"""
+        self._listeners.append(listener)
+
+    def _memo_key(self, max_words: int) -> str:
+        return f"summary:{self.backend.name}:{max_words}"
+
+    def _lookup(self, hashes: list[str], max_words: int) -> dict[str, str]:
+        found = {key: self._recent[key] for key in hashes if key in self._recent}
+        missing = [key for key in hashes if key not in found]
+        if missing:
+            stored = self.memo.get_many(self._memo_key(max_words), missing)
+            found.update(stored)
+            self._remember(stored)
+        return found
+
+    def _remember(self, summaries: dict[str, str]) -> None:
+        with self._condition:
+            self._recent.update(summaries)
+            while len(self._recent) > 10_000:
+                self._recent.popitem(last=False)
+
+    def summarize_posts(self, posts: Iterable["Post"]) -> None:
+        """Fill in ``summary`` on the newest ``per_feed`` posts, queueing misses"""
+        posts = [post for post in list(posts)[: self.per_feed] if post.summary is None]
+        texts = {id(post): post_text(post) for post in posts}
+        hashes = {id(post): text_hash(texts[id(post)]) for post in posts}
+        known = self._lookup(list(set(hashes.values())), self.max_words)
+        for post in posts:
+            key = hashes[id(post)]
+            if key in known:
+                post.summary = known[key]
+            else:
+
+                def fill(summary: str, post: "Post" = post) -> None:
+                    post.summary = summary
+
+                self._enqueue(key, texts[id(post)], self.max_words, fill)
+
+    def digest(self, posts: list["Post"], limit: int = 20) -> Optional[str]:
+        """An overview of the newest posts, or None while it is being written.
+
+        A digest is keyed by the posts it covers, not by their text, so it is
+        written once per set of posts however their summaries fill in. Asking
+        for another set drops a digest that is still waiting in the queue.
+        """
+        posts = posts[:limit]
+        if not posts:
+            return ""
+        key = text_hash("\n".join(post.guid for post in posts))
+        found = self._lookup([key], self.digest_words)
+        if key in found:
+            return found[key]
+        lines = [
+            f"{post.title}: {post.summary or plain_text(post.description or '')}"
+            for post in posts
+        ]
+        with self._condition:
+            if self._digest_key not in (None, key):
+                self._pending.pop(self._digest_key, None)
+            self._digest_key = key
+        self._enqueue(key, "\n".join(lines)[: MAX_INPUT * 2], self.digest_words, None)
+        return None
+
+    def _enqueue(
+        self, key: str, text: str, max_words: int, callback: Optional[Callable]
+    ) -> None:
+        with self._condition:
+            if key not in self._pending:
+                self._pending[key] = (text, max_words, [])
+                self._condition.notify()
+            if callback is not None:
+                self._pending[key][2].append(callback)
+
+    def _next_batch(self) -> list[tuple[str, str, int, list[Callable]]]:
+        """Oldest pending texts of one length, within the token budget"""
+        batch, tokens, max_words = [], 0, None
+        for key, (text, words, callbacks) in self._pending.items():
+            if max_words is None:
+                max_words = words
+            elif words != max_words:
+                continue
+            cost = estimate_tokens(text) + words * 2
+            if batch and self.tokens and tokens + cost > self.tokens.capacity:
+                break
+            batch.append((key, text, words, callbacks))
+            tokens += cost
+            if len(batch) >= self.batch_size:
+                break
+        for key, *_ in batch:
+            del self._pending[key]
+        return batch
+
+    def _wait_for_budget(self, tokens: int) -> bool:
+        """Sleep until both budgets allow the call; False if closed meanwhile"""
+        with self._condition:
+            while not self._closed:
+                delay = max(
+                    self.requests.delay(1) if self.requests else 0.0,
+                    self.tokens.delay(tokens) if self.tokens else 0.0,
+                )
+                if delay <= 0:
+                    if self.requests:
+                        self.requests.take(1)
+                    if self.tokens:
+                        self.tokens.take(tokens)
+                    return True
+                self._condition.wait(delay)
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._busy = False
+                    self._condition.notify_all()
+                    self._condition.wait()
+                if self._closed:
+                    return
+                self._busy = True
+                batch = self._next_batch()
+            texts = [text for _, text, _, _ in batch]
+            max_words = batch[0][2]
+            tokens = sum(estimate_tokens(text) + max_words * 2 for text in texts)
+            if not self._wait_for_budget(tokens):
+                return
+            try:
+                summaries = self.backend.summarize(texts, max_words)
+            except Exception as e:
+                # dropped, not retried; the posts ask again on their next refresh
+                logging.error(f"Error summarizing {len(texts)} texts: {e}")
+                continue
+            for (key, _, _, callbacks), summary in zip(batch, summaries):
+                self.memo.put(self._memo_key(max_words), summary, content_hash=key)
+                for callback in callbacks:
+                    callback(summary)
+            self._remember({key: s for (key, *_), s in zip(batch, summaries)})
+            for listener in self._listeners:
+                listener()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the queue to drain; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._busy, timeout
+            )
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout=5)
+        self.memo.close()
@@ -0,0 +1,160 @@
+import csv
+import logging
+import os
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from src.modules.layout import plain_text
+
+if TYPE_CHECKING:
+    from src.modules.rss import Post
+
+
+def normalize(text: str) -> str:
+    """Case-fold and collapse whitespace so keywords match however written"""
+    return " ".join(text.casefold().split())
+
+
+def read_topics(path: str) -> dict[str, list[str]]:
+    """Parse a topics CSV: a topic name, then any number of keywords.
+
+    A line with just a name uses the name as its only keyword. Blank lines
+    and lines starting with # are ignored, and repeated names are merged.
+    """
+    topics: dict[str, list[str]] = {}
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            cells = [cell.strip() for cell in row if cell.strip()]
+            if not cells or cells[0].startswith("#"):
+                continue
+            name, keywords = cells[0], cells[1:] or cells[:1]
+            topics.setdefault(name, []).extend(keywords)
+    return topics
+
+
+class TopicMatcher:
+    """Aho-Corasick automaton over every keyword of every topic.
+
+    The text is scanned once, character by character, whatever the number of
+    keywords. A hit only counts when it starts and ends on a word boundary,
+    so "ai" matches "AI chips" but not "said".
+    """
+
+    def __init__(self, topics: dict[str, list[str]]) -> None:
+        self.names = list(topics)
+        self._goto: list[dict[str, int]] = [{}]
+        # (topic index, keyword length) for every keyword ending at a node
+        self._out: list[list[tuple[int, int]]] = [[]]
+        for index, keywords in enumerate(topics.values()):
+            for keyword in keywords:
+                keyword = normalize(keyword)
+                if keyword:
+                    self._insert(keyword, index)
+        self._fail = [0] * len(self._goto)
+        self._link()
+
+    def _insert(self, keyword: str, topic: int) -> None:
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._out.append([])
+            node = child
+        self._out[node].append((topic, len(keyword)))
+
+    def _link(self) -> None:
+        # breadth first, so every node's failure target is already linked
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                target = self._fail[node]
+                while target and char not in self._goto[target]:
+                    target = self._fail[target]
+                if node:
+                    self._fail[child] = self._goto[target].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def match(self, text: str) -> frozenset[str]:
+        """Names of the topics with at least one keyword in ``text``"""
+        if not self.names:
+            return frozenset()
+        text = normalize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for topic, length in out[node]:
+                if topic in found:
+                    continue
+                start = end - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (
+                    end + 1 == len(text) or not text[end + 1].isalnum()
+                ):
+                    found.add(topic)
+        return frozenset(self.names[topic] for topic in found)
+
+
+class TopicFilter:
+    """Tag posts with the topics from a CSV file, following edits to it.
+
+    ``reload_if_changed`` compiles a new matcher off to the side and swaps
+    it in with a single assignment, so taggers on other threads always see
+    either the old set of topics or the new one, never a mix. A file that
+    fails to parse leaves the previous topics in place.
+    """
+
+    def __init__(self, path: str = "data/topics.csv") -> None:
+        self.path = path
+        self.matcher = TopicMatcher({})
+        self._stamp: Optional[tuple[float, int]] = None
+        self.reload_if_changed()
+
+    def reload_if_changed(self) -> bool:
+        """Recompile if the file changed since the last load"""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            topics = read_topics(self.path) if stamp else {}
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            logging.error(f"Error reading topics from {self.path}: {e}")
+            return False
+        self.matcher = TopicMatcher(topics)
+        return True
+
+    @property
+    def names(self) -> list[str]:
+        return self.matcher.names
+
+    def tag(
+        self, posts: Iterable["Post"], matcher: Optional[TopicMatcher] = None
+    ) -> None:
+        """Set ``topics`` on every post, with ``matcher`` or the current one"""
+        matcher = matcher or self.matcher
+        for post in posts:
+            post.topics = matcher.match(
+                f"{post.title}\n{plain_text(post.description or '')}\n"
+                f"{plain_text(post.body or '')}"
+            )
+
+    @staticmethod
+    def unread_counts(posts: Iterable["Post"]) -> Counter:
+        """How many unread posts each topic has"""
+        counts: Counter = Counter()
+        for post in posts:
+            if not post.read:
+                counts.update(post.topics)
+        return counts
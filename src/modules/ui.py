@@ -1,13 +1,14 @@
 import curses
-import textwrap
+import time
 
+from src.modules.layout import LayoutCache, TextLayout, plain_text
+from src.modules.loader import FeedLoader
+from src.modules.metrics import Metrics
 from src.modules.rss import Feed, Post
-from typing import TYPE_CHECKING
+from src.utils.log import RingBuffer
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 import logging
-import re
-
-# Initialize logging
-logging.basicConfig(filename="ui.log", level=logging.DEBUG)
 
 if TYPE_CHECKING:
     from curses import _CursesWindow
@@ -16,27 +17,99 @@ else:
 
 
 class Pane:
+    """A bordered window that only repaints the rows that changed.
+
+    Text added between ``clear()`` and ``refresh()`` is collected as the next
+    frame for this pane. ``refresh()`` compares it with what is on screen,
+    rewrites just the dirty rows and stages them with ``noutrefresh``; the
+    terminal is updated once per frame by ``Renderer.end_frame``.
+    """
+
     def __init__(self, height: int, width: int, start_y: int, start_x: int) -> None:
         self.window = curses.newwin(height, width, start_y, start_x)
         self.height = height
         self.width = width
+        self._shown: dict[int, list[tuple]] = {}
+        self._pending: dict[int, list[tuple]] = {}
+        self._full_redraw = True
         self.draw_border()
 
     def draw_border(self) -> None:
         self.window.box()
 
     def clear(self) -> None:
-        self.window.clear()
-        self.draw_border()
+        """Start a new frame; rows not drawn again before refresh() are blanked"""
+        self._pending = {}
+
+    def invalidate(self) -> None:
+        """Repaint everything on the next refresh, e.g. after a resize"""
+        self._full_redraw = True
 
     def add_text(self, y: int, x: int, text: str, color_pair=None) -> None:
-        if color_pair:
-            self.window.addstr(y, x, text, color_pair)
-        else:
-            self.window.addstr(y, x, text)
+        self._pending.setdefault(y, []).append((x, text, color_pair))
+
+    def dirty_rows(self) -> list[int]:
+        rows = self._pending.keys() | self._shown.keys()
+        return sorted(y for y in rows if self._pending.get(y) != self._shown.get(y))
 
     def refresh(self) -> None:
-        self.window.refresh()
+        if self._full_redraw:
+            self.window.erase()
+            self.draw_border()
+            rows = sorted(self._pending)
+        else:
+            rows = self.dirty_rows()
+            if not rows:
+                return
+        blank = " " * (self.width - 2)
+        for y in rows:
+            if not self._full_redraw:
+                self.window.addstr(y, 1, blank)
+            for x, text, color_pair in self._pending.get(y, []):
+                if color_pair:
+                    self.window.addstr(y, x, text, color_pair)
+                else:
+                    self.window.addstr(y, x, text)
+        self._full_redraw = False
+        self._shown = self._pending
+        # later add_text calls without a clear() draw on top of this frame
+        self._pending = {y: list(segments) for y, segments in self._shown.items()}
+        self.window.noutrefresh()
+
+
+class Renderer:
+    """Frame boundaries: one doupdate per frame, plus frame-time accounting"""
+
+    frame_count = 0
+    last_frame_ms = 0.0
+    max_frame_ms = 0.0
+    total_frame_ms = 0.0
+    _frame_start: Optional[float] = None
+
+    @classmethod
+    def begin_frame(cls) -> None:
+        cls._frame_start = time.perf_counter()
+
+    @classmethod
+    def end_frame(cls) -> None:
+        curses.doupdate()
+        if cls._frame_start is None:
+            return
+        elapsed = (time.perf_counter() - cls._frame_start) * 1000
+        cls._frame_start = None
+        cls.frame_count += 1
+        cls.last_frame_ms = elapsed
+        cls.total_frame_ms += elapsed
+        cls.max_frame_ms = max(cls.max_frame_ms, elapsed)
+        Metrics.default().record_frame(elapsed / 1000)
+
+    @classmethod
+    def summary(cls) -> str:
+        average = cls.total_frame_ms / cls.frame_count if cls.frame_count else 0.0
+        return (
+            f"{cls.frame_count} frames, last {cls.last_frame_ms:.2f}ms, "
+            f"avg {average:.2f}ms, max {cls.max_frame_ms:.2f}ms"
+        )
 
 
 class InputHandler:
@@ -45,7 +118,7 @@ class InputHandler:
 
     def get_input(self) -> int:
         key = self.stdscr.getch()
-        logging.debug(f"Key pressed: {key}")
+        logging.debug("Key pressed: %s", key)
         return key
 
     def is_quit(self, key) -> bool:
@@ -57,26 +130,58 @@ class InputHandler:
     def is_down(self, key) -> bool:
         return key == curses.KEY_DOWN
 
+    def is_page_up(self, key) -> bool:
+        return key == curses.KEY_PPAGE
+
+    def is_page_down(self, key) -> bool:
+        return key == curses.KEY_NPAGE
+
+    def is_home(self, key) -> bool:
+        return key == curses.KEY_HOME
+
+    def is_end(self, key) -> bool:
+        return key == curses.KEY_END
+
 
 class FeedManager:
-    def __init__(self, feeds: list[Feed]) -> None:
+    def __init__(self, feeds: list[Feed], loader: Optional[FeedLoader] = None) -> None:
         self.feeds = feeds
         self.selected_feed_index = 0
+        self.loader = loader
+        self.prefetch_current()
 
     def get_current_feed(self) -> Feed:
-        logging.debug(f"Current feed index: {self.selected_feed_index}")
+        logging.debug("Current feed index: %s", self.selected_feed_index)
         return self.feeds[self.selected_feed_index]
 
     def get_next_feed(self) -> Feed:
         if self.selected_feed_index < len(self.feeds) - 1:
             self.selected_feed_index += 1
+            self.prefetch_current()
         return self.get_current_feed()
 
     def get_previous_feed(self) -> Feed:
         if self.selected_feed_index > 0:
             self.selected_feed_index -= 1
+            self.prefetch_current()
+        return self.get_current_feed()
+
+    def select(self, index: int) -> Feed:
+        """Jump to an index, clamped to the list"""
+        index = max(0, min(index, len(self.feeds) - 1))
+        if index != self.selected_feed_index:
+            self.selected_feed_index = index
+            self.prefetch_current()
         return self.get_current_feed()
 
+    def move_by(self, delta: int) -> Feed:
+        return self.select(self.selected_feed_index + delta)
+
+    def prefetch_current(self) -> None:
+        """Ask the loader to fetch the feed under the cursor first"""
+        if self.loader and self.feeds:
+            self.loader.prioritize(self.feeds[self.selected_feed_index])
+
     def get_selected_feed_posts(self):
         selected_feed = self.get_current_feed()
         return selected_feed.posts
@@ -100,10 +205,83 @@ class PostManager:
             self.selected_post_index -= 1
         return self.get_current_post()
 
+    def select(self, index: int) -> Post:
+        """Jump to an index, clamped to the list"""
+        self.selected_post_index = max(0, min(index, len(self.posts) - 1))
+        return self.get_current_post()
+
+    def move_by(self, delta: int) -> Post:
+        return self.select(self.selected_post_index + delta)
+
     def reset_selection(self):
         self.selected_post_index = 0
 
 
+class ListView:
+    """A scrolling window onto a list that may be far taller than its pane.
+
+    Only the rows between ``offset`` and ``offset + rows`` are drawn, and the
+    offset follows the selection, so a redraw costs O(visible rows) however
+    long the list is.
+    """
+
+    def __init__(self, first_row: int = 1) -> None:
+        self.first_row = first_row
+        self.rows = 1
+        self.offset = 0
+
+    def resize(self, pane: "Pane") -> None:
+        # leave the border row at the bottom free
+        self.rows = max(1, pane.height - 1 - self.first_row)
+
+    def follow(self, selected: int, count: int) -> None:
+        """Scroll just enough to keep the selection on screen"""
+        if selected < self.offset:
+            self.offset = selected
+        elif selected >= self.offset + self.rows:
+            self.offset = selected - self.rows + 1
+        self.offset = max(0, min(self.offset, max(0, count - self.rows)))
+
+    def visible(self, count: int) -> range:
+        return range(self.offset, min(self.offset + self.rows, count))
+
+    def render(self, pane: "Pane", labels, selected: int) -> None:
+        """Draw the visible slice of ``labels``, a sequence of strings"""
+        self.resize(pane)
+        self.follow(selected, len(labels))
+        for row, idx in enumerate(self.visible(len(labels))):
+            text = f"> {labels[idx]}" if idx == selected else labels[idx]
+            pane.add_text(
+                self.first_row + row, 1, text[: pane.width - 2], curses.color_pair(1)
+            )
+
+
+class _Titles:
+    """Lazy sequence of titles so ListView never builds a label per item"""
+
+    def __init__(self, items) -> None:
+        self.items = items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.items[idx].title
+
+
+class _Badged(_Titles):
+    """Titles with a per-item suffix, such as a feed's unread topic counts"""
+
+    def __init__(self, items, badges: dict[int, str]) -> None:
+        super().__init__(items)
+        self.badges = badges
+
+    def __getitem__(self, idx: int) -> str:
+        item = self.items[idx]
+        badge = self.badges.get(id(item))
+        return f"{item.title}  {badge}" if badge else item.title
+
+
 class PaneManager:
     @staticmethod
     def init_display() -> "_CursesWindow":
@@ -138,6 +316,10 @@ class PaneManager:
 
 class FeedView:
     debug_messages = []
+    # how long getch waits before repainting, so lazily loaded feeds show up
+    poll_interval_ms = 200
+    list_view = ListView(first_row=1)
+    layout_cache = LayoutCache()
 
     @staticmethod
     def display_feeds(
@@ -146,35 +328,31 @@ class FeedView:
         top_pane: Pane,
         middle_pane: Pane,
         bottom_pane: Pane,
+        feed_manager: Optional[FeedManager] = None,
     ) -> None:
+        """Standalone feed browser that polls getch until quit.
+
+        The reader itself runs on ReaderApp's event loop; this is kept for
+        scripts that only want the feed list.
+        """
         input_handler = InputHandler(stdscr)
-        feed_manager = FeedManager(feeds)
+        feed_manager = feed_manager or FeedManager(feeds)
+        stdscr.timeout(FeedView.poll_interval_ms)
+        last_model = None
         while True:
             try:
-                top_pane.clear()
-                current_feed = feed_manager.get_current_feed()
-                for idx, feed in enumerate(feeds):
-                    if idx == feed_manager.selected_feed_index:
-                        top_pane.add_text(
-                            idx + 1, 1, f"> {feed.title}", curses.color_pair(1)
-                        )
-                    else:
-                        top_pane.add_text(idx + 1, 1, feed.title, curses.color_pair(1))
-                top_pane.refresh()
-
-                middle_pane.clear()
-
-                FeedView.display_description(current_feed, middle_pane)
-
-                middle_pane.refresh()
+                model = FeedView.model(feed_manager)
+                if model != last_model:
+                    Renderer.begin_frame()
+                    FeedView.render(top_pane, middle_pane, feed_manager)
+                    Renderer.end_frame()
+                    last_model = model
 
                 key = input_handler.get_input()
-                if input_handler.is_up(key):
-                    feed_manager.get_previous_feed()
-                elif input_handler.is_down(key):
-                    feed_manager.get_next_feed()
-                elif input_handler.is_quit(key):
+                if input_handler.is_quit(key):
+                    stdscr.timeout(-1)
                     break
+                FeedView.handle_navigation(key, feed_manager)
 
             except curses.error:
                 DebugView.display_debug_message(
@@ -182,76 +360,269 @@ class FeedView:
                 )
                 logging.error("Window size error. Please resize the terminal.")
 
+    @staticmethod
+    def model(feed_manager: FeedManager) -> tuple:
+        """Everything a feed frame depends on; unchanged means nothing to draw"""
+        current_feed = feed_manager.get_current_feed()
+        return (
+            feed_manager.selected_feed_index,
+            len(feed_manager.feeds),
+            FeedView.description_text(current_feed),
+        )
+
+    @staticmethod
+    def render(
+        top_pane: Pane,
+        middle_pane: Pane,
+        feed_manager: FeedManager,
+        badges: Optional[dict[int, str]] = None,
+        placeholder: str = "No feeds",
+    ) -> None:
+        """Draw one frame; ``badges`` maps id(feed) to text shown after its title"""
+        top_pane.clear()
+        if not feed_manager.feeds:
+            top_pane.add_text(1, 1, placeholder, curses.color_pair(1))
+            top_pane.refresh()
+            middle_pane.clear()
+            middle_pane.refresh()
+            return
+        labels = _Badged(feed_manager.feeds, badges) if badges else None
+        FeedView.list_view.render(
+            top_pane,
+            labels or _Titles(feed_manager.feeds),
+            feed_manager.selected_feed_index,
+        )
+        top_pane.refresh()
+
+        middle_pane.clear()
+        FeedView.display_description(feed_manager.get_current_feed(), middle_pane)
+        middle_pane.refresh()
+
+    @staticmethod
+    def handle_navigation(key, feed_manager: FeedManager) -> None:
+        if key == curses.KEY_UP:
+            feed_manager.get_previous_feed()
+        elif key == curses.KEY_DOWN:
+            feed_manager.get_next_feed()
+        elif key == curses.KEY_PPAGE:
+            feed_manager.move_by(-FeedView.list_view.rows)
+        elif key == curses.KEY_NPAGE:
+            feed_manager.move_by(FeedView.list_view.rows)
+        elif key == curses.KEY_HOME:
+            feed_manager.select(0)
+        elif key == curses.KEY_END:
+            feed_manager.select(len(feed_manager.feeds) - 1)
+
+    @staticmethod
+    def description_text(current_feed) -> str:
+        """The feed's description, or a placeholder while it is loading"""
+        # never block the paint on the network; a failed load says so
+        if not current_feed.description_value.done():
+            return "Loading..."
+        return current_feed.description
+
     @staticmethod
     def display_description(current_feed, pane) -> None:
-        description = current_feed.description.strip()
-        paragraphs = re.split(r" {2,}", description)
-        current_y = 1
-        for paragraph in paragraphs:
-            wrapped_paragraph = textwrap.wrap(paragraph, pane.width - 2)
-            for line in wrapped_paragraph:
-                pane.add_text(current_y, 1, line, curses.color_pair(1))
-                current_y += 1
-            current_y += 1  # Add an extra line between paragraphs
+        description = FeedView.description_text(current_feed).strip()
+        layout = FeedView.layout_cache.get(description, pane.width - 2)
+        for row, line in enumerate(layout.lines(0, pane.height - 2)):
+            pane.add_text(row + 1, 1, line, curses.color_pair(1))
+
+
+@lru_cache(maxsize=256)
+def _post_text(description: str) -> str:
+    return plain_text(description) or "No description available"
 
 
 class PostView:
     debug_messages = []
+    list_view = ListView(first_row=2)
+    layout_cache = LayoutCache()
+    # scroll position within the selected post's text
+    content_offset = 0
+    content_rows = 1
+    _content_post: Optional[Post] = None
+    _content_layout: Optional[TextLayout] = None
 
     @classmethod
     def display_posts(
-        cls, pane: Pane, posts: list[Post], selected_post_index: int
+        cls, pane: Pane, posts: list[Post], selected_post_index: int, status: str = ""
     ) -> None:
         pane.clear()
-        pane.add_text(1, 1, "Posts:", curses.color_pair(1))
-        for idx, post in enumerate(posts):
-            if idx == selected_post_index:
-                pane.add_text(idx + 2, 1, f"> {post.title}", curses.color_pair(1))
-            else:
-                pane.add_text(idx + 2, 1, post.title, curses.color_pair(1))
+        header = f"Posts:  {status}" if status else "Posts:"
+        pane.add_text(1, 1, header[: pane.width - 2], curses.color_pair(1))
+        cls.list_view.render(pane, _Titles(posts), selected_post_index)
         pane.refresh()
 
     @classmethod
     def display_post_content(cls, pane, post) -> None:
+        if post is not cls._content_post:
+            cls._content_post = post
+            cls.content_offset = 0
         pane.clear()
-        pane.add_text(1, 1, post.content, curses.color_pair(1))
+        cls.content_rows = max(1, pane.height - 2)
+        text = _post_text(post.description)
+        if post.summary:
+            text = f"Summary: {post.summary}\n\n{text}"
+        cls._content_layout = cls.layout_cache.get(text, pane.width - 2)
+        lines = cls._content_layout.lines(cls.content_offset, cls.content_rows)
+        for row, line in enumerate(lines):
+            pane.add_text(row + 1, 1, line, curses.color_pair(1))
         pane.refresh()
 
+    @classmethod
+    def scroll_content(cls, lines: int) -> None:
+        """Scroll the post text, never past its first or last line"""
+        offset = max(0, cls.content_offset + lines)
+        if cls._content_layout is None or cls._content_layout.has_line(offset):
+            cls.content_offset = offset
+
     @classmethod
     def handle_navigation(cls, key, post_manager) -> None | str:
         if key == curses.KEY_UP:
             post_manager.get_previous_post()
         elif key == curses.KEY_DOWN:
             post_manager.get_next_post()
+        elif key == curses.KEY_PPAGE:
+            post_manager.move_by(-cls.list_view.rows)
+        elif key == curses.KEY_NPAGE:
+            post_manager.move_by(cls.list_view.rows)
+        elif key == curses.KEY_HOME:
+            post_manager.select(0)
+        elif key == curses.KEY_END:
+            post_manager.select(len(post_manager.posts) - 1)
+        elif key == ord(" "):
+            cls.scroll_content(cls.content_rows)
+        elif key == ord("b"):
+            cls.scroll_content(-cls.content_rows)
         elif key == curses.KEY_BACKSPACE:
             post_manager.reset_selection()
             return "feeds"  # Indicate that we want to switch back to feeds view
         return None  # No state change
 
 
+class SearchView:
+    """The `/` search prompt and its ranked results across every feed"""
+
+    list_view = ListView(first_row=2)
+
+    @classmethod
+    def display_results(
+        cls, pane: Pane, query: str, hits: list, selected: int, elapsed_ms: float
+    ) -> None:
+        pane.clear()
+        status = f"{len(hits)} results, {elapsed_ms:.1f}ms" if query.strip() else ""
+        pane.add_text(
+            1, 1, f"/{query}  {status}"[: pane.width - 2], curses.color_pair(1)
+        )
+        if hits:
+            cls.list_view.render(pane, _Titles(hits), selected)
+        elif query.strip():
+            pane.add_text(2, 1, "No matches", curses.color_pair(1))
+        pane.refresh()
+
+
+class StoriesView:
+    """One row per story covered by several feeds, with its sources below"""
+
+    list_view = ListView(first_row=2)
+
+    @classmethod
+    def display_stories(cls, pane: Pane, stories: list, selected: int) -> None:
+        pane.clear()
+        pane.add_text(1, 1, "Stories:", curses.color_pair(1))
+        if stories:
+            cls.list_view.render(pane, _Titles(stories), selected)
+        else:
+            pane.add_text(2, 1, "No stories shared by several feeds yet")
+        pane.refresh()
+
+    @staticmethod
+    def display_sources(pane: Pane, story) -> None:
+        pane.clear()
+        rows = pane.height - 2
+        for row, (feed, post) in enumerate(zip(story.feeds, story.posts)):
+            if row >= rows:
+                break
+            text = f"{feed.title}: {post.title}"[: pane.width - 2]
+            pane.add_text(row + 1, 1, text, curses.color_pair(1))
+        pane.refresh()
+
+
+class DigestView:
+    """Overviews of what the feeds are saying: all of them, then each one"""
+
+    list_view = ListView(first_row=2)
+    layout_cache = LayoutCache()
+
+    @classmethod
+    def display_choices(cls, pane: Pane, labels: list[str], selected: int) -> None:
+        pane.clear()
+        pane.add_text(1, 1, "Digests:", curses.color_pair(1))
+        cls.list_view.render(pane, labels, selected)
+        pane.refresh()
+
+    @classmethod
+    def display_digest(cls, pane: Pane, digest: Optional[str]) -> None:
+        pane.clear()
+        if digest is None:
+            text = "Summarizing..."
+        else:
+            text = digest or "Nothing to summarize yet"
+        layout = cls.layout_cache.get(text, pane.width - 2)
+        for row, line in enumerate(layout.lines(0, pane.height - 2)):
+            pane.add_text(row + 1, 1, line, curses.color_pair(1))
+        pane.refresh()
+
+
 class DebugView:
-    debug_messages = []
+    # recent warnings and errors, filled by LogSetup's listener thread
+    debug_messages = RingBuffer(500)
+    # how far the log view is scrolled back from the newest message
+    offset = 0
+    _seen = 0
 
     @staticmethod
-    def display_debug_message(message: str, bottom_pane: Pane) -> None:
-        DebugView.debug_messages.append(message)
+    def display_metrics(metrics: Metrics, bottom_pane: Pane) -> None:
+        """Live fetch, parse and frame timings, slowest feeds first"""
         bottom_pane.clear()
-        start_idx = max(0, len(DebugView.debug_messages) - bottom_pane.height + 2)
-        for idx, msg in enumerate(DebugView.debug_messages[start_idx:]):
-            bottom_pane.add_text(idx + 1, 1, msg, curses.color_pair(1))
+        width = bottom_pane.width - 2
+        for row, line in enumerate(metrics.lines(bottom_pane.height - 2)):
+            bottom_pane.add_text(row + 1, 1, line[:width], curses.color_pair(1))
         bottom_pane.refresh()
 
-    @staticmethod
-    def scroll_debug_messages(direction: str, bottom_pane: Pane) -> None:
-        if direction == "up":
-            start_idx = max(0, len(DebugView.debug_messages) - bottom_pane.height + 1)
-        else:
-            start_idx = max(0, len(DebugView.debug_messages) - bottom_pane.height + 3)
+    @classmethod
+    def display_log(cls, bottom_pane: Pane) -> None:
+        """The messages that fit, ending ``offset`` lines before the newest"""
+        messages = cls.debug_messages
+        if cls.offset:
+            # stay on the same lines while new ones arrive below
+            cls.offset += messages.appended - cls._seen
+        cls._seen = messages.appended
+        rows = bottom_pane.height - 2
+        cls.offset = max(0, min(cls.offset, len(messages) - rows))
+        end = len(messages) - cls.offset
+        width = bottom_pane.width - 2
         bottom_pane.clear()
-        for idx, msg in enumerate(DebugView.debug_messages[start_idx:]):
-            bottom_pane.add_text(idx + 1, 1, msg, curses.color_pair(1))
+        for row, index in enumerate(range(max(0, end - rows), end)):
+            bottom_pane.add_text(
+                row + 1, 1, messages[index][:width], curses.color_pair(1)
+            )
         bottom_pane.refresh()
 
+    @classmethod
+    def display_debug_message(cls, message: str, bottom_pane: Pane) -> None:
+        cls.debug_messages.append(message)
+        cls.offset = 0
+        cls.display_log(bottom_pane)
+        curses.doupdate()
+
+    @classmethod
+    def scroll_debug_messages(cls, direction: str, bottom_pane: Pane) -> None:
+        cls.offset += 1 if direction == "up" else -1
+        cls.display_log(bottom_pane)
+        curses.doupdate()
+
 
 class StateManager:
     def __init__(self) -> None:
@@ -0,0 +1,127 @@
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Generator, Optional, TypeVar
+
+T = TypeVar("T")
+# reentrant, since building one default may build another (Fetcher's cache)
+_defaults_lock = threading.RLock()
+
+
+def default_cache_dir() -> str:
+    """Where cached network data lives, honouring XDG_CACHE_HOME"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "myeditorial")
+
+
+def default_data_dir() -> str:
+    """Where persistent user data lives, honouring XDG_DATA_HOME"""
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "myeditorial")
+
+
+def shared_default(cls: type, build: Callable[[], T]) -> T:
+    """The process-wide instance kept in ``cls._default``, built on first use.
+
+    Worker threads ask for these all at once on startup, so the check and the
+    build happen under one lock and exactly one instance is ever made.
+    """
+    with _defaults_lock:
+        if cls._default is None:
+            cls._default = build()
+        return cls._default
+
+
+class LazyValue:
+    """A value that is computed at most once, on first use or ahead of time.
+
+    Background workers call ``run()`` to compute the value early. Readers call
+    ``result()`` to block until it is ready, ``get()`` to peek without
+    blocking, or ``await`` the value from asyncio code.
+    """
+
+    def __init__(self, compute: Optional[Callable[[], Any]] = None) -> None:
+        self._compute = compute
+        self._future: Future = Future()
+        self._claimed = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, value: Any) -> "LazyValue":
+        lazy = cls()
+        lazy.set(value)
+        return lazy
+
+    def claim(self) -> bool:
+        """Reserve the computation; only the first caller gets True"""
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+    def run(self, compute: Optional[Callable[[], Any]] = None) -> None:
+        """Compute the value in the calling thread unless someone already has"""
+        if not self.claim():
+            return
+        future = self._future
+        try:
+            value = (compute or self._compute)()
+        except BaseException as e:
+            with self._lock:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        with self._lock:
+            # a set() while we were computing wins over our stale value
+            if not future.done():
+                future.set_result(value)
+
+    def set(self, value: Any) -> None:
+        """Replace the value, completing any pending readers"""
+        with self._lock:
+            self._claimed = True
+            if self._future.done():
+                self._future = Future()
+            self._future.set_result(value)
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        self.run()
+        return self._future.result(timeout)
+
+    def get(self, default: Any = None) -> Any:
+        """Return the value if it is ready, otherwise ``default``"""
+        if self._future.done() and self._future.exception() is None:
+            return self._future.result()
+        return default
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def started(self) -> bool:
+        return self._claimed
+
+    def exception(self) -> Optional[BaseException]:
+        if not self._future.done():
+            return None
+        return self._future.exception()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until a started computation finishes, without raising"""
+        try:
+            self._future.result(timeout)
+        except Exception:
+            pass
+
+    @property
+    def future(self) -> Future:
+        return self._future
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        # only asyncio callers pay for importing it
+        import asyncio
+
+        if not self._claimed:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self.run)
+        return asyncio.wrap_future(self._future).__await__()
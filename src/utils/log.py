@@ -0,0 +1,157 @@
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Iterator, Optional, Union
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+FORMAT = "%(asctime)s %(levelname)s %(threadName)s %(name)s: %(message)s"
+
+
+class RingBuffer:
+    """The last ``capacity`` items, oldest first, indexable in O(1).
+
+    Index 0 is the oldest item still held; appending to a full buffer
+    overwrites it.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._items: list = [None] * capacity
+        self._start = 0
+        self._length = 0
+        # bumped on every append, so readers can tell the buffer moved on
+        self.appended = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._length
+
+    def __getitem__(self, index: int):
+        with self._lock:
+            if index < 0:
+                index += self._length
+            if not 0 <= index < self._length:
+                raise IndexError("ring buffer index out of range")
+            return self._items[(self._start + index) % self.capacity]
+
+    def __iter__(self) -> Iterator:
+        # a copy, so appends while the caller iterates do not shift the items
+        with self._lock:
+            items = [
+                self._items[(self._start + index) % self.capacity]
+                for index in range(self._length)
+            ]
+        return iter(items)
+
+    def append(self, item) -> None:
+        with self._lock:
+            end = (self._start + self._length) % self.capacity
+            self._items[end] = item
+            if self._length < self.capacity:
+                self._length += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+            self.appended += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items = [None] * self.capacity
+            self._start = 0
+            self._length = 0
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep formatted records in a RingBuffer for the UI to show"""
+
+    def __init__(self, buffer: RingBuffer, level: int = logging.WARNING) -> None:
+        super().__init__(level)
+        self.buffer = buffer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that drops records when the queue is full.
+
+    The caller never waits on the disk: records are formatted lazily by
+    the listener thread, and a backed-up listener costs records, not
+    keystrokes.
+    """
+
+    def __init__(self, records: queue.Queue) -> None:
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the base class formats here, on the caller's thread; only make the
+        # record safe to hand over and leave formatting to the listener
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class LogSetup:
+    """Logging for the interactive reader.
+
+    Records go onto a bounded queue and a listener thread writes them to
+    ``path`` and, from ``ring_level`` up, into ``ring`` for DebugView.
+    ``set_level`` changes what is recorded while the app runs.
+    """
+
+    def __init__(
+        self,
+        path: str = "ui.log",
+        level: Union[int, str] = logging.INFO,
+        ring: Optional[RingBuffer] = None,
+        ring_level: int = logging.WARNING,
+        max_queued: int = 10000,
+    ) -> None:
+        self.ring = ring if ring is not None else RingBuffer(500)
+        self.handler = DroppingQueueHandler(queue.Queue(max_queued))
+        formatter = logging.Formatter(FORMAT)
+        file_handler = logging.FileHandler(path, delay=True)
+        file_handler.setFormatter(formatter)
+        ring_handler = RingBufferHandler(self.ring, ring_level)
+        ring_handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, file_handler, ring_handler, respect_handler_level=True
+        )
+        self.root = logging.getLogger()
+        self.root.addHandler(self.handler)
+        self.set_level(level)
+        self.listener.start()
+
+    @property
+    def level(self) -> str:
+        return logging.getLevelName(self.root.level)
+
+    def set_level(self, level: Union[int, str]) -> None:
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        self.root.setLevel(level)
+
+    def cycle_level(self) -> str:
+        """Step to the next of DEBUG, INFO, WARNING, ERROR and return it"""
+        current = self.level if self.level in LEVELS else LEVELS[-1]
+        self.set_level(LEVELS[(LEVELS.index(current) + 1) % len(LEVELS)])
+        return self.level
+
+    def close(self) -> None:
+        """Flush what is queued and detach from the root logger"""
+        self.root.removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+
+import pytest
+
+from src.modules.cache import HTTPCache
+from src.modules.discovery import FeedDiscovery
+from src.modules.extract import SummaryExtractor
+from src.modules.fetch import Fetcher
+from src.modules.memo import SummaryMemo
+from src.modules.metrics import Metrics
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch) -> None:
+    """Keep caches, memos and data out of the developer's home directory.
+
+    The XDG directories point into the test's tmp_path, and every default()
+    singleton starts unbuilt, so one test never sees another's instance.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    singletons = (HTTPCache, Fetcher, SummaryExtractor, SummaryMemo, FeedDiscovery)
+    for cls in (*singletons, Metrics):
+        monkeypatch.setattr(cls, "_default", None)
+
+
+@pytest.fixture
+def serve() -> Iterator[Callable[[type[BaseHTTPRequestHandler]], str]]:
+    """Start a local HTTP server for a handler class and return its base URL.
+
+    Each call starts another server (and so another host:port); all of them
+    are shut down when the test ends. Request logging is silenced.
+    """
+    servers: list[ThreadingHTTPServer] = []
+
+    def start(handler: type[BaseHTTPRequestHandler]) -> str:
+        quiet = type(handler.__name__, (handler,), {"log_message": _quiet})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), quiet)
+        server.daemon_threads = True
+        # a short poll interval keeps shutdown quick
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _quiet(self, *args) -> None:
+    pass
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import os
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.cache import HTTPCache, freshness_lifetime
+from src.modules.fetch import Fetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits: list[str] = []
+
+    def do_GET(self):
+        _Handler.hits.append(self.path)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b"x" * 100
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        if self.path == "/fresh":
+            self.send_header("Cache-Control", "max-age=60")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(serve):
+    _Handler.hits = []
+    return serve(_Handler)
+
+
+def test_revalidates_with_etag(server, tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    fetcher = Fetcher(cache)
+    first = fetcher.get(server + "/stale")
+    second = fetcher.get(server + "/stale")
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.content == first.content
+    assert len(_Handler.hits) == 2
+
+
+def test_fresh_entry_skips_network(server, tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    fetcher = Fetcher(cache)
+    fetcher.get(server + "/fresh")
+    assert fetcher.get(server + "/fresh").from_cache
+    assert len(_Handler.hits) == 1
+
+
+def test_index_survives_restart(server, tmp_path):
+    Fetcher(HTTPCache(str(tmp_path))).get(server + "/fresh")
+    assert Fetcher(HTTPCache(str(tmp_path))).get(server + "/fresh").from_cache
+
+
+def test_evicts_least_recently_used(server, tmp_path):
+    cache = HTTPCache(str(tmp_path), max_bytes=250)
+    fetcher = Fetcher(cache)
+    fetcher.get(server + "/a")
+    fetcher.get(server + "/b")
+    cache.lookup(server + "/a")
+    fetcher.get(server + "/c")
+    assert cache.lookup(server + "/b") is None
+    assert cache.lookup(server + "/a") is not None
+    assert cache.total_bytes() <= 250
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"Cache-Control": "public, max-age=300"}) == 300
+    assert freshness_lifetime({"Cache-Control": "no-cache"}) == 0
+    assert freshness_lifetime({}) is None
+
+
+def test_racing_workers_share_one_cache_and_keep_every_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(HTTPCache, "_default", None)
+    monkeypatch.setattr(Fetcher, "_default", None)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    start = threading.Barrier(16)
+    seen = []
+
+    def worker(n):
+        start.wait()
+        fetcher = Fetcher.default()
+        seen.append((fetcher, HTTPCache.default()))
+        for i in range(25):
+            fetcher.cache.store(f"https://example.com/{n}/{i}", {}, b"x")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(fetcher) for fetcher, _ in seen}) == 1
+    assert len({id(cache) for _, cache in seen}) == 1
+    assert len(HTTPCache(seen[0][1].directory)._index) == 400
+    assert not [name for name in os.listdir(seen[0][1].directory) if ".tmp" in name]
+
+
+def test_default_cache_stays_out_of_the_home_directory(tmp_path):
+    assert HTTPCache.default().directory.startswith(str(tmp_path))
+    assert Fetcher.default().cache is HTTPCache.default()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+from src.modules.columns import PostColumns
+from src.modules.rss import COMPRESS_MIN, Feed, Post
+
+LONG = "<p>" + "word " * COMPRESS_MIN + "</p>"
+
+
+def test_post_fields_round_trip_through_compact_storage():
+    post = Post("Title", "https://example.com/news/a", LONG, guid=None, body=LONG)
+    assert isinstance(post._description, bytes) and post.description == LONG
+    assert post.body == LONG and post.guid == post.link == "https://example.com/news/a"
+    other = Post("Other", "https://example.com/news/b", "short", guid="tag:b")
+    # sites share their link prefix, and a distinct guid is kept
+    assert other._link_prefix is post._link_prefix
+    assert other.guid == "tag:b" and other.description == "short"
+    other.description = LONG
+    assert other.description == LONG
+
+
+def test_columns_rebuild_posts_and_find_the_newest():
+    feed = Feed("Example", "https://example.com", "https://example.com/rss", "-")
+    posts = [
+        Post(f"Post {n}", f"https://example.com/news/{n}", LONG, published=n)
+        for n in range(5)
+    ]
+    posts[2].read = True
+    columns = PostColumns()
+    columns.extend(feed, posts)
+    assert len(columns) == 5 and columns.feeds == [feed]
+    assert columns.newest(2) == [4, 3]
+    assert list(columns.unread()) == [0, 1, 3, 4]
+    rebuilt = columns.post(3)
+    assert (rebuilt.title, rebuilt.link, rebuilt.guid) == (
+        "Post 3",
+        "https://example.com/news/3",
+        "https://example.com/news/3",
+    )
+    assert rebuilt.description == LONG and rebuilt.published == 3
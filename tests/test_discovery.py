@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.discovery import FeedDiscovery, feed_links, read_head, sniff
+from src.modules.fetch import Fetcher
+from src.modules.memo import SummaryMemo
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Announced</title>
+<entry><title>One</title><updated>2024-01-01T00:00:00Z</updated></entry>
+<entry><title>Two</title><updated>2024-01-02T00:00:00Z</updated></entry>
+</feed>"""
+JSON_FEED = json.dumps(
+    {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": "Guessed",
+        "items": [{"id": "1", "date_published": "2024-01-03T00:00:00+00:00"}],
+    }
+).encode()
+PAGES = {
+    "/a/": b'<html><head><link rel="alternate" type="application/atom+xml" '
+    b'href="/a/atom"></head><body>',
+    "/a/atom": ATOM,
+    "/b/": b"<html><head><title>no feed links</title></head><body>",
+    "/feed.json": JSON_FEED,
+}
+
+
+@pytest.fixture
+def site(serve):
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            hits.append(self.path)
+            body = PAGES.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Length", str(len(body or b"")))
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+    return serve(Handler), hits
+
+
+@pytest.fixture
+def discovery(tmp_path):
+    discovery = FeedDiscovery(
+        Fetcher(), SummaryMemo(str(tmp_path / "discovery.db")), max_workers=4
+    )
+    yield discovery
+    discovery.memo.close()
+
+
+def test_head_is_read_no_further_than_its_end():
+    chunks = iter([b"<html><he", b"ad><link></he", b"ad><body>", b"never read"])
+    assert read_head(chunks).endswith(b"</head>")
+    assert next(chunks) == b"never read"
+
+
+def test_feed_links_and_sniffing():
+    head = (
+        '<link rel="alternate" type="application/rss+xml" href="/rss">'
+        "<link rel='alternate' type='application/feed+json' href='feed.json'>"
+        '<link rel="stylesheet" type="text/css" href="/style.css">'
+    )
+    assert feed_links(head, "https://example.com/blog/") == [
+        "https://example.com/rss",
+        "https://example.com/blog/feed.json",
+    ]
+    assert sniff(ATOM) == "atom" and sniff(JSON_FEED) == "json"
+    assert sniff(b"<html>") is None and sniff(b'{"not": "a feed"}') is None
+
+
+def test_resolves_announced_and_guessed_feeds_and_caches(site, discovery, monkeypatch):
+    base, hits = site
+    results = [
+        {"title": "Site A", "website": f"{base}/a/", "subscribers": 1000},
+        {"title": "Site B", "website": f"{base}/b/"},
+        {"feedId": f"feed/{base}/missing", "title": "Gone"},
+    ]
+    monkeypatch.setattr(discovery, "search", lambda query: results)
+
+    found = {c.title: c for c in discovery.discover("anything")}
+    assert set(found) == {"Site A", "Site B"}
+    assert found["Site A"].feed_link == f"{base}/a/atom"
+    assert found["Site A"].entries == 2
+    # site B announces nothing, so the common paths were probed
+    assert found["Site B"].feed_link == f"{base}/feed.json"
+
+    # the ranking only grows, best first
+    snapshots = list(discovery.ranked("anything"))
+    assert [len(ranked) for ranked in snapshots] == [1, 2]
+    assert snapshots[-1][0].title == "Site A"
+
+    # the second and third runs were answered from the cache
+    count = len(hits)
+    list(discovery.discover("anything"))
+    assert len(hits) == count
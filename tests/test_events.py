@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import os
+import signal
+import threading
+
+import pytest
+
+from src.modules.events import FETCH, KEY, RESIZE, EventLoop
+
+
+def _loop(keys: list[int]) -> tuple[EventLoop, int]:
+    read_fd, write_fd = os.pipe()
+
+    def read_key() -> int:
+        if not keys:
+            return -1
+        os.read(read_fd, 1)
+        return keys.pop(0)
+
+    loop = EventLoop(read_key, input_fd=read_fd)
+    return loop, write_fd
+
+
+def test_keys_are_drained_and_dispatched_in_order():
+    loop, write_fd = _loop([ord("a"), ord("b"), ord("q")])
+    seen = []
+
+    def on_key(key):
+        seen.append(chr(key))
+        if key == ord("q"):
+            loop.stop()
+
+    loop.on(KEY, on_key)
+    os.write(write_fd, b"abq")
+    loop.run()
+    assert seen == ["a", "b", "q"]
+
+
+def test_posts_from_workers_wake_the_loop():
+    loop, _ = _loop([])
+    seen = []
+
+    def on_fetch(payload):
+        seen.append(payload)
+        loop.stop()
+
+    loop.on(FETCH, on_fetch)
+    threading.Timer(0.05, loop.post, (FETCH, "feed")).start()
+    loop.run()
+    assert seen == ["feed"]
+
+
+def test_timers_run_in_due_order_and_idle_runs_per_batch():
+    loop, _ = _loop([])
+    order = []
+    idle = []
+    loop.on_idle = lambda: idle.append(len(order))
+    loop.call_later(0.02, lambda: order.append("late") or loop.stop())
+    loop.call_later(0.01, lambda: order.append("early"))
+    loop.run()
+    assert order == ["early", "late"]
+    # once before the first wait, then after each batch except the last
+    assert idle[0] == 0
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="no SIGWINCH")
+def test_resize_wakes_the_loop_without_a_keypress():
+    loop, _ = _loop([])
+    seen = []
+
+    def on_resize(key):
+        seen.append(key)
+        loop.stop()
+
+    loop.on(RESIZE, on_resize)
+    previous = signal.getsignal(signal.SIGWINCH)
+    threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGWINCH)).start()
+    loop.run()
+    assert len(seen) == 1
+    assert signal.getsignal(signal.SIGWINCH) == (previous or signal.SIG_DFL)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.export import export_feeds
+from src.modules.loader import FeedLoader
+from src.modules.rss import Feed
+
+
+def rss(name: str, count: int) -> bytes:
+    items = "".join(
+        f"<item><title>{name} {n}</title><link>https://{name}.example/{n}</link>"
+        f"<description>&lt;p&gt;Story {n}&lt;/p&gt;</description>"
+        f"<pubDate>Mon, 0{n + 1} Jan 2024 00:00:00 GMT</pubDate></item>"
+        for n in range(count)
+    )
+    return f"<rss><channel><title>{name}</title>{items}</channel></rss>".encode()
+
+
+@pytest.fixture
+def feeds(serve):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            name = self.path.strip("/")
+            body = rss(name, 3) if name.startswith("site") else b""
+            self.send_response(200 if body else 404)
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    base = serve(Handler)
+    names = ["site-a", "site-b", "site-c", "missing"]
+    return [Feed(name, base, f"{base}/{name}", "-") for name in names]
+
+
+def test_completed_yields_every_feed_once_within_the_window(feeds):
+    loader = FeedLoader(max_workers=2)
+    seen = {}
+    for feed, error in loader.completed(feeds, window=1):
+        seen[feed.title] = error
+    loader.shutdown()
+    assert set(seen) == {"site-a", "site-b", "site-c", "missing"}
+    assert seen["missing"] is not None and seen["site-a"] is None
+
+
+def test_jsonl_export_writes_normalized_posts_and_releases_them(feeds):
+    out = io.StringIO()
+    stats = export_feeds(feeds, out, "jsonl", FeedLoader())
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (stats.feeds, stats.posts, len(stats.failures)) == (4, 9, 1)
+    assert "feeds/s" in str(stats) and "posts/s" in str(stats)
+    first = next(r for r in records if r["link"] == "https://site-a.example/0")
+    assert first["description"] == "Story 0"
+    assert first["published"] == "2024-01-01T00:00:00+00:00"
+    # nothing is kept once written
+    assert all(feed.posts == [] for feed in feeds)
+
+
+def test_csv_and_opml_exports(feeds):
+    out = io.StringIO()
+    export_feeds(feeds, out, "csv", FeedLoader())
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert len(rows) == 9 and rows[0]["feed"].startswith("site")
+
+    out = io.StringIO()
+    export_feeds(feeds, out, "opml", FeedLoader())
+    body = ET.fromstring(out.getvalue()).find("body")
+    outlines = {o.get("text"): o for o in body.findall("outline")}
+    assert len(outlines) == 4 and len(outlines["missing"]) == 0
+    assert [o.get("url") for o in outlines["site-b"]][0] == "https://site-b.example/0"
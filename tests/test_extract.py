@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.extract import SummaryExtractor, etree
+from src.modules.fetch import Fetcher
+from src.modules.memo import SummaryMemo
+
+BACKENDS = ["html.parser"] + (["lxml"] if etree is not None else [])
+
+PAGE = (
+    b"<html><head><script>var p = '<p>not this</p>';</script></head><body>"
+    b"<p>short</p>"
+    b"<p>The first paragraph is long enough to keep.</p>"
+    b"<p>The second one <b>has markup</b> inside it.</p>"
+    b"<p>The third paragraph completes the summary.</p>"
+    b"<p>The fourth paragraph should never be read.</p>"
+    b"</body></html>"
+)
+
+
+def _chunks(data: bytes, size: int = 16):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_collects_meaningful_paragraphs(backend):
+    summary = SummaryExtractor(backend=backend).extract(_chunks(PAGE))
+    assert summary == (
+        "The first paragraph is long enough to keep. "
+        "The second one has markup inside it. "
+        "The third paragraph completes the summary."
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stops_reading_once_done(backend):
+    _, bytes_read = SummaryExtractor(backend=backend).extract_counting(_chunks(PAGE))
+    assert bytes_read < PAGE.index(b"fourth") + 16
+
+
+def test_respects_byte_budget():
+    extractor = SummaryExtractor(max_bytes=100, backend="html.parser")
+    _, bytes_read = extractor.extract_counting(_chunks(PAGE))
+    assert bytes_read == 100
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_an_unclosed_last_paragraph_is_kept(backend):
+    extractor = SummaryExtractor(backend=backend)
+    assert extractor.extract([b"<p>" + b"a" * 80]) == "a" * 80
+    assert extractor.extract([]) == ""
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_pages_are_decoded_in_their_declared_charset(backend):
+    extractor = SummaryExtractor(backend=backend)
+    text = "<p>Un café très bon, et un thé pour tout le monde.</p>"
+    expected = "Un café très bon, et un thé pour tout le monde."
+    assert extractor.extract([text.encode("latin-1")], "ISO-8859-1") == expected
+    meta = '<head><meta charset="windows-1252"></head>' + text
+    assert extractor.extract(_chunks(meta.encode("cp1252"))) == expected
+    assert extractor.extract([text.encode()]) == expected
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        SummaryExtractor(backend="regex")
+
+
+def test_memoized_summaries_follow_the_page_validator(serve, tmp_path):
+    page = {"etag": '"v1"', "text": "The first version of this page says this."}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = f"<p>{page['text']}</p>".encode()
+            self.send_response(200)
+            if page["etag"]:
+                self.send_header("ETag", page["etag"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    url = serve(Handler) + "/article"
+    extractor = SummaryExtractor(paragraphs=1)
+    memo = SummaryMemo(str(tmp_path / "summaries.db"))
+    fetcher = Fetcher(retries=0)
+
+    def summary() -> str:
+        return extractor.extract_url(url, fetcher, memo=memo)
+
+    assert summary() == "The first version of this page says this."
+    # the same validator is answered from the memo
+    page["text"] = "Changed without a new validator, so not read."
+    assert summary() == "The first version of this page says this."
+    # a new version of the page is summarized again
+    page["etag"] = '"v2"'
+    page["text"] = "The second version of the page says that."
+    assert summary() == "The second version of the page says that."
+    # without a validator the page is always read
+    page["etag"] = None
+    page["text"] = "An unversioned page is never served stale."
+    assert summary() == "An unversioned page is never served stale."
+    memo.close()
+    fetcher.close()
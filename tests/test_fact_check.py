@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+import time
+
+from src.modules.fact_check import FactIndex, extract_claims, source_of
+from src.modules.rss import Feed, Post
+
+
+def _feed(name: str, site: str) -> Feed:
+    return Feed(name, f"https://{site}", f"https://{site}/rss/{name}", "-")
+
+
+def _post(title: str, description: str = "", published=None) -> Post:
+    return Post(
+        title, f"https://example.com/{hash(title)}", description, published=published
+    )
+
+
+def test_claims_are_quotes_figures_and_entity_pairs():
+    claims = extract_claims(
+        "Flood kills 12 people in Valencia",
+        'The mayor of Valencia said "we will rebuild every home". '
+        "NATO and the United Nations sent help in 2024.",
+    )
+    keys = {claim.key for claim in claims}
+    assert ("quote", "we will rebuild every home") in keys
+    assert ("figure", "valencia", "people") in keys
+    assert ("pair", "nato", "united nations") in keys
+    # a sentence-initial word and a year are not claims
+    assert not any("flood" in claim.key for claim in claims)
+    assert not any(claim.value == 2024 for claim in claims)
+
+
+def test_sources_are_outlets_not_feeds():
+    assert source_of(_feed("world", "www.bbc.co.uk")) == "bbc.co.uk"
+    assert source_of(_feed("world", "bbc.co.uk")) == source_of(_feed("uk", "bbc.co.uk"))
+
+
+def test_check_counts_agreeing_and_contradicting_sources():
+    index = FactIndex()
+    bbc, bbc_uk = _feed("world", "bbc.co.uk"), _feed("uk", "bbc.co.uk")
+    cnn, guardian = _feed("all", "cnn.com"), _feed("all", "theguardian.com")
+    post = _post("Flood kills 12 people in Valencia")
+    index.add(bbc, [post])
+    index.add(bbc_uk, [_post("Storm kills 12 people in Valencia")])
+    index.add(cnn, [_post("Deadly storm: 12 people dead in Valencia")])
+    index.add(guardian, [_post("Rain leaves 30 people dead in Valencia")])
+
+    report = index.check(bbc, post)
+    # the other BBC feed is the same outlet, so it does not corroborate
+    assert set(report.agreeing) == {"cnn.com"}
+    assert set(report.contradicting) == {"theguardian.com"}
+    assert str(report) == "1 other source agrees, 1 disagrees"
+
+
+def test_posts_are_indexed_once():
+    index = FactIndex()
+    feed = _feed("all", "cnn.com")
+    post = _post("Rescuers find 12 people missing near Mont Blanc")
+    assert index.add(feed, [post]) == 1
+    assert index.add(feed, [post]) == 0
+    assert str(index.check(_feed("x", "other.org"), post)) == "1 other source agrees"
+
+
+def test_old_claims_age_out_and_the_cap_evicts_the_oldest(monkeypatch):
+    index = FactIndex(max_age=3600, max_posts=4)
+    cnn, other = _feed("all", "cnn.com"), _feed("x", "other.org")
+    now = time.time()
+    old = _post("Rescuers find 12 people missing near Mont Blanc", published=now - 60)
+    index.add(cnn, [old])
+    assert str(index.check(other, old)) == "1 other source agrees"
+
+    # an hour later the post has aged out, and its postings with it
+    now += 3600
+    monkeypatch.setattr(time, "time", lambda: now)
+    index.add(cnn, [_post("NATO and the United Nations meet", published=now)])
+    assert len(index) == 1
+    assert str(index.check(other, old)) == "no other source yet"
+    assert not any(key[0] == "figure" for key in index._postings)
+
+    posts = [
+        _post(f"NATO and Acme{n} sign a deal", published=now - n) for n in range(5)
+    ]
+    index.add(cnn, posts)
+    assert len(index) == 3
+    assert str(index.check(other, posts[-1])) == "no other source yet"
+    assert str(index.check(other, posts[0])) == "1 other source agrees"
+    # evicted posts are not indexed again by the next refresh
+    assert index.add(cnn, posts) == 0
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.fetch import Fetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+    ports: set[int] = set()
+
+    def do_GET(self):
+        _Handler.ports.add(self.client_address[1])
+        if _Handler.failures_left:
+            _Handler.failures_left -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<rss></rss>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(serve):
+    _Handler.failures_left = 0
+    _Handler.ports = set()
+    return serve(_Handler)
+
+
+def test_reuses_connections(server):
+    fetcher = Fetcher()
+    for _ in range(5):
+        assert fetcher.get(server + "/feed").content == b"<rss></rss>"
+    assert len(_Handler.ports) == 1
+
+
+def test_retries_after_503(server):
+    _Handler.failures_left = 2
+    fetcher = Fetcher(backoff_factor=0)
+    assert fetcher.get(server + "/feed").status_code == 200
+
+
+def test_gives_up_after_retries(server):
+    _Handler.failures_left = 10
+    fetcher = Fetcher(retries=1, backoff_factor=0)
+    assert fetcher.get(server + "/feed").status_code == 503
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import re
+import textwrap
+
+from src.modules.layout import LayoutCache, TextLayout, plain_text, wrap_lazily
+
+
+def test_matches_textwrap_per_paragraph():
+    text = "  ".join(
+        " ".join(f"word{i}x{j}" for j in range(i * 7 + 3)) for i in range(1, 6)
+    )
+    expected = []
+    for idx, paragraph in enumerate(re.split(r" {2,}", text)):
+        if idx:
+            expected.append("")
+        expected += textwrap.wrap(paragraph, 30)
+    assert list(wrap_lazily(text, 30)) == expected
+
+
+def test_layout_is_lazy():
+    layout = TextLayout(" ".join(["word"] * 20000), 40)
+    assert len(layout.lines(10, 5)) == 5
+    assert layout.laid_out() == 15
+    assert not layout.has_line(10**6)
+
+
+def test_cache_reuses_and_invalidates_on_width_change():
+    cache = LayoutCache(max_entries=2)
+    text = "some text " * 50
+    layout = cache.get(text, 40)
+    assert cache.get(text, 40) is layout
+    assert cache.get(text, 60) is not layout
+    assert len(cache) == 1
+
+
+def test_cache_is_bounded():
+    cache = LayoutCache(max_entries=2)
+    first = cache.get("a", 10)
+    cache.get("b", 10)
+    cache.get("c", 10)
+    assert len(cache) == 2
+    assert cache.get("a", 10) is not first
+
+
+def test_plain_text():
+    assert plain_text("<p>Fish &amp; chips</p><p>Two</p>") == "Fish & chips  Two"
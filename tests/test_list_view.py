@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+from src.modules.ui import ListView
+
+
+class _Pane:
+    def __init__(self, height: int) -> None:
+        self.height = height
+
+
+def test_only_visible_rows_are_in_range():
+    view = ListView(first_row=1)
+    view.resize(_Pane(12))
+    view.follow(0, 50_000)
+    assert view.visible(50_000) == range(0, 10)
+
+
+def test_offset_follows_selection_both_ways():
+    view = ListView(first_row=1)
+    view.resize(_Pane(12))
+    view.follow(25, 100)
+    assert view.visible(100) == range(16, 26)
+    view.follow(20, 100)
+    assert view.visible(100) == range(16, 26)
+    view.follow(3, 100)
+    assert view.visible(100) == range(3, 13)
+
+
+def test_end_of_list_fills_the_pane():
+    view = ListView(first_row=2)
+    view.resize(_Pane(12))
+    view.follow(99, 100)
+    assert view.visible(100) == range(91, 100)
+    view.follow(99, 5)
+    assert view.visible(5) == range(0, 5)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.fact_check import FactIndex
+from src.modules.fetch import Fetcher
+from src.modules.loader import FeedLoader
+from src.modules.memo import SummaryMemo
+from src.modules.rss import Feed, FeedParser, Post
+from src.modules.similarity import SimilarityIndex
+from src.modules.store import ArticleStore
+from src.modules.topics import TopicFilter
+
+RSS = b"<rss><channel><title>T</title></channel></rss>"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def topics(tmp_path):
+    path = tmp_path / "topics.csv"
+    path.write_text("space,rocket\n")
+    return TopicFilter(str(path))
+
+
+class _Hosts:
+    """Local feed servers, one per "host", that record how busy each one gets"""
+
+    def __init__(self, serve, count: int, delay: float = 0.05) -> None:
+        self.lock = threading.Lock()
+        self.active: dict[int, int] = {}
+        self.peak: dict[int, int] = {}
+        self.active_total = 0
+        self.peak_total = 0
+        self.requested: list[str] = []
+        hosts = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                port = self.server.server_port
+                with hosts.lock:
+                    hosts.requested.append(f"http://{self.headers['Host']}{self.path}")
+                    hosts.active[port] = hosts.active.get(port, 0) + 1
+                    hosts.active_total += 1
+                    hosts.peak[port] = max(hosts.peak.get(port, 0), hosts.active[port])
+                    hosts.peak_total = max(hosts.peak_total, hosts.active_total)
+                time.sleep(delay)
+                with hosts.lock:
+                    hosts.active[port] -= 1
+                    hosts.active_total -= 1
+                if self.path.startswith("/missing"):
+                    body, status = b"", 404
+                else:
+                    body, status = RSS, 200
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.urls = [serve(Handler) for _ in range(count)]
+
+    def feeds(self, per_host: int) -> list[Feed]:
+        return [
+            Feed(f"{n}", url, f"{url}/feed/{n}", "-")
+            for url in self.urls
+            for n in range(per_host)
+        ]
+
+
+@pytest.fixture
+def hosts(serve, monkeypatch, tmp_path):
+    monkeypatch.setattr(Fetcher, "_default", Fetcher(retries=0))
+    monkeypatch.setattr(SummaryMemo, "_default", SummaryMemo(str(tmp_path / "m.db")))
+    return _Hosts(serve, 3)
+
+
+class _Feed(Feed):
+    """A feed whose fetch calls ``fetch()`` instead of going to the network"""
+
+    def __init__(self, fetch) -> None:
+        super().__init__(
+            "Example", "https://example.com", "https://example.com/rss", "-"
+        )
+        self.fetch = fetch
+
+    def fetch_posts(self, num_posts=None, timeout=None) -> list[Post]:
+        return self.fetch()
+
+
+def _posts(*titles: str) -> list[Post]:
+    return [
+        Post(title, f"https://example.com/{n}", "", published=float(n))
+        for n, title in enumerate(titles)
+    ]
+
+
+def _count_matches(topics: TopicFilter) -> list[str]:
+    matched = []
+    match = topics.matcher.match
+
+    def counting(text: str) -> frozenset:
+        matched.append(text.split("\n")[0])
+        return match(text)
+
+    topics.matcher.match = counting
+    return matched
+
+
+def test_refresh_only_tags_new_and_changed_posts(store, topics):
+    fetched = _posts("Rocket one", "Rocket two", "Rocket three")
+    feed = _Feed(lambda: fetched)
+    loader = FeedLoader(store=store, topics=topics)
+    matched = _count_matches(topics)
+    done = threading.Semaphore(0)
+
+    def refresh() -> None:
+        loader.refresh([feed], on_done=lambda feed, error: done.release())
+        assert done.acquire(timeout=5)
+
+    refresh()
+    assert sorted(matched) == ["Rocket one", "Rocket three", "Rocket two"]
+    matched.clear()
+    fetched = _posts("Rocket one", "Rocket 2, corrected", "Rocket three", "Rocket 4")
+    refresh()
+    assert sorted(matched) == ["Rocket 2, corrected", "Rocket 4"]
+    assert all(post.topics == {"space"} for post in feed.posts)
+
+    # new topics mean every post is looked at again
+    with open(topics.path, "w") as file:
+        file.write("science,rocket\nspace,launch\n")
+    assert topics.reload_if_changed()
+    refresh()
+    assert all(post.topics == {"science"} for post in feed.posts)
+    loader.shutdown()
+
+
+def test_changed_topics_tag_each_post_once(store, topics):
+    feed = _Feed(lambda: _posts("Rocket one", "Launch two"))
+    loader = FeedLoader(store=store, topics=topics)
+    loader.load([feed])
+    with open(topics.path, "w") as file:
+        file.write("science,rocket\nspace,launch\n")
+    assert topics.reload_if_changed()
+    matched = _count_matches(topics)
+    retagged = threading.Semaphore(0)
+    loader.add_listener(lambda feed, stage, error: retagged.release())
+
+    loader.retag([feed])
+    assert retagged.acquire(timeout=5)
+    assert sorted(matched) == ["Launch two", "Rocket one"]
+    assert [post.topics for post in feed.posts] == [{"space"}, {"science"}]
+
+    # neither a second retag nor a refresh of the same posts tags again
+    matched.clear()
+    loader.retag([feed])
+    assert retagged.acquire(timeout=5)
+    loader.refresh([feed])
+    assert retagged.acquire(timeout=5)
+    assert matched == []
+    loader.shutdown()
+
+
+def test_background_restore_runs_on_workers_before_the_fetch(store, topics):
+    seen = []
+
+    def fetch() -> list[Post]:
+        seen.append(("fetch", [post.title for post in feed.posts_value.get([])]))
+        return _posts("Rocket stored", "Rocket fetched")
+
+    feed = _Feed(fetch)
+    store.upsert_posts(feed, _posts("Rocket stored"))
+    read = store.posts_for_feed
+
+    def slow_read(*args, **kwargs) -> list[Post]:
+        time.sleep(0.1)
+        return read(*args, **kwargs)
+
+    store.posts_for_feed = slow_read
+    loader = FeedLoader(store=store, topics=topics)
+    finished = threading.Event()
+
+    def listener(feed, stage, error) -> None:
+        seen.append((stage, threading.current_thread().name))
+        if stage == "posts":
+            finished.set()
+
+    loader.add_listener(listener)
+    loader.restore([feed], background=True)
+    loader.refresh([feed])
+    assert finished.wait(5)
+    stages = dict(seen)
+    assert stages["restore"].startswith("feed-loader")
+    # the fetch only started once the stored history was showing
+    assert stages["fetch"] == ["Rocket stored"]
+    assert [post.title for post in feed.posts] == ["Rocket fetched", "Rocket stored"]
+    loader.shutdown()
+
+
+def test_restores_are_not_held_to_the_per_host_cap(store):
+    feeds = [_Feed(list) for _ in range(3)]
+    for n, feed in enumerate(feeds):
+        feed.feed_link = f"https://example.com/{n}.rss"
+        store.upsert_posts(feed, _posts("Stored"))
+    read = store.posts_for_feed
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def slow_read(*args, **kwargs) -> list[Post]:
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return read(*args, **kwargs)
+
+    store.posts_for_feed = slow_read
+    loader = FeedLoader(max_workers=4, per_host=1, store=store)
+    restored = threading.Semaphore(0)
+    loader.add_listener(lambda feed, stage, error: restored.release())
+    loader.restore(feeds, background=True)
+    for _ in feeds:
+        assert restored.acquire(timeout=5)
+    assert running[1] == 3
+    loader.shutdown()
+
+
+def test_forgotten_feed_is_tagged_afresh(topics):
+    feed = _Feed(lambda: _posts("Rocket one"))
+    loader = FeedLoader(topics=topics)
+    loader.load([feed])
+    assert loader._tagged_with == {feed.feed_link: topics.matcher}
+    loader.forget(feed)
+    assert loader._tagged_with == {}
+    loader.shutdown()
+
+
+def test_snapshot_posts_are_badged_but_not_summarized(store, topics):
+    class Summarizer:
+        def __init__(self) -> None:
+            self.summarized: list[str] = []
+
+        def summarize_posts(self, posts) -> None:
+            self.summarized.extend(post.title for post in posts)
+
+    feed = _Feed(lambda: _posts("Rocket fetched"))
+    # as restored from the session snapshot, with only a preview of each post
+    feed.posts = _posts("Rocket preview")
+    loader = FeedLoader(store=store, topics=topics, summarizer=Summarizer())
+    loader.restore([feed])
+    assert feed.posts[0].topics == {"space"}
+    assert loader.summarizer.summarized == []
+    done = threading.Event()
+    loader.refresh([feed], on_done=lambda feed, error: done.set())
+    assert done.wait(5)
+    assert "Rocket fetched" in loader.summarizer.summarized
+    loader.shutdown()
+
+
+def test_workers_index_posts_for_stories_and_fact_checks():
+    threads = []
+
+    class Index(SimilarityIndex):
+        def add(self, feed, posts):
+            threads.append(threading.current_thread().name)
+            return super().add(feed, posts)
+
+    now = time.time()
+    feed = _Feed(
+        lambda: [
+            Post("Rocket launch delayed", "https://example.com/1", "", published=now),
+            Post(
+                "Rocket launch delayed again",
+                "https://example.com/2",
+                "",
+                published=now,
+            ),
+        ]
+    )
+    similarity, facts = Index(), FactIndex()
+    loader = FeedLoader(similarity=similarity, facts=facts)
+    done = threading.Event()
+    loader.refresh([feed], on_done=lambda feed, error: done.set())
+    assert done.wait(5)
+    assert len(similarity) == 2 and similarity.generation == 1
+    assert len(facts) == 2
+    assert threads and threads[0].startswith("feed-loader")
+    loader.shutdown()
+
+
+def test_fetches_stay_within_the_global_and_per_host_caps(hosts):
+    loader = FeedLoader(max_workers=4, per_host=2)
+    result = loader.load(hosts.feeds(per_host=6))
+    assert result.ok() and len(hosts.requested) == 18
+    assert max(hosts.peak.values()) == 2
+    assert hosts.peak_total == 4
+    loader.shutdown()
+
+
+def test_prioritized_feed_jumps_the_queue(hosts):
+    loader = FeedLoader(max_workers=1, per_host=1)
+    feeds = hosts.feeds(per_host=2)
+    loader.prefetch(feeds)
+    loader.prioritize(feeds[-1])
+    loader.load(feeds)
+    # the first fetch had already started; the prioritized one came next
+    assert hosts.requested[1] == feeds[-1].feed_link
+    loader.shutdown()
+
+
+def test_failures_are_reported_per_feed_and_stage(hosts, tmp_path):
+    url = hosts.urls[0]
+    sources = tmp_path / "sources.json"
+    sources.write_text(
+        json.dumps(
+            {
+                "sources": [
+                    {
+                        "title": "No homepage",
+                        "website_link": f"{url}/missing-site",
+                        "feedId": f"{url}/feed",
+                    },
+                    {
+                        "title": "No feed",
+                        "website_link": url,
+                        "feedId": f"{url}/missing-feed",
+                        "description": "-",
+                    },
+                ]
+            }
+        )
+    )
+    loader = FeedLoader()
+    result = FeedParser.load_feeds_with_result(str(sources), loader)
+    homeless, gone = result.feeds
+    assert not result.ok() and result.failed_feeds == [homeless, gone]
+    assert [(f.feed, f.stage) for f in result.failures] == [
+        (homeless, "description"),
+        (gone, "posts"),
+    ]
+    assert homeless.posts == [] and homeless.posts_value.exception() is None
+    loader.shutdown()
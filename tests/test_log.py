@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import logging
+import queue
+import threading
+
+from src.utils.log import DroppingQueueHandler, LogSetup, RingBuffer
+
+
+def test_ring_buffer_keeps_the_newest_items_in_order():
+    ring = RingBuffer(3)
+    for n in range(5):
+        ring.append(n)
+    assert len(ring) == 3 and list(ring) == [2, 3, 4]
+    assert ring[0] == 2 and ring[-1] == 4 and ring.appended == 5
+
+
+def test_ring_buffer_reads_are_consistent_while_another_thread_appends():
+    ring = RingBuffer(50)
+    writer = threading.Thread(target=lambda: [ring.append(n) for n in range(50000)])
+    writer.start()
+    while writer.is_alive():
+        items = list(ring)
+        if items:
+            # always a run of consecutive appends, never a half-moved window
+            assert items == list(range(items[0], items[0] + len(items)))
+    writer.join()
+
+
+def test_records_are_formatted_and_written_off_the_calling_thread(
+    tmp_path, monkeypatch
+):
+    # pytest's own capture handler would format on this thread
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    formatted_on = []
+
+    class Key:
+        def __str__(self) -> str:
+            formatted_on.append(threading.current_thread().name)
+            return "KEY_DOWN"
+
+    ring = RingBuffer(10)
+    log = LogSetup(str(tmp_path / "ui.log"), "INFO", ring=ring)
+    try:
+        logging.debug("hidden %s", Key())
+        logging.warning("pressed %s", Key())
+        log.set_level("DEBUG")
+        logging.debug("shown %s", Key())
+        assert log.cycle_level() == "INFO"
+    finally:
+        log.close()
+    text = (tmp_path / "ui.log").read_text()
+    assert "pressed KEY_DOWN" in text and "shown KEY_DOWN" in text
+    assert "hidden" not in text
+    # only warnings and worse reach the DebugView buffer
+    assert list(ring) == ["WARNING pressed KEY_DOWN"]
+    assert threading.current_thread().name not in formatted_on
+
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "m %s", (1,), None)
+    for _ in range(5):
+        handler.handle(record)
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
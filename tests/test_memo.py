@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import threading
+import time
+
+import pytest
+
+from src.modules.memo import SummaryMemo
+
+
+@pytest.fixture
+def memo(tmp_path):
+    memo = SummaryMemo(str(tmp_path / "summaries.db"))
+    yield memo
+    memo.close()
+
+
+def test_memoizes_and_persists(memo, tmp_path):
+    calls = []
+    compute = lambda: calls.append(1) or "summary"
+    assert memo.get_or_compute("https://example.com", compute) == "summary"
+    assert memo.get_or_compute("https://example.com", compute) == "summary"
+    assert len(calls) == 1
+    assert SummaryMemo(memo.path).get("https://example.com") == "summary"
+
+
+def test_content_hash_is_part_of_the_key(memo):
+    memo.put("https://example.com/a", "old", content_hash="v1")
+    assert memo.get("https://example.com/a", content_hash="v2") is None
+    assert memo.get("https://example.com/a", content_hash="v1") == "old"
+
+
+def test_entries_expire(tmp_path):
+    memo = SummaryMemo(str(tmp_path / "summaries.db"), ttl=0.05)
+    memo.put("https://example.com", "summary")
+    time.sleep(0.1)
+    assert memo.get("https://example.com") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    memo = SummaryMemo(str(tmp_path / "summaries.db"), max_entries=2)
+    memo.put("a", "1")
+    memo.put("b", "2")
+    memo.get("a")
+    memo.put("c", "3")
+    assert memo.get("b") is None
+    assert memo.get("a") == "1"
+    assert memo.get("c") == "3"
+
+
+def test_concurrent_callers_share_one_computation(memo):
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return "summary"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(memo.get_or_compute("https://x", compute))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["summary"] * 5
+    assert len(calls) == 1
+
+
+def test_a_miss_and_its_claim_are_one_step(memo):
+    calls = []
+    compute = lambda: calls.append(1) or "summary"
+    lookup = memo._get
+    racer = threading.Thread(target=memo.get_or_compute, args=("https://x", compute))
+
+    def racing_get(*args):
+        found = lookup(*args)
+        # another caller arrives between the lookup and the claim
+        if racer.ident is None:
+            racer.start()
+            racer.join(0.1)
+        return found
+
+    memo._get = racing_get
+    assert memo.get_or_compute("https://x", compute) == "summary"
+    racer.join(5)
+    assert len(calls) == 1
+
+
+def test_get_many_skips_misses_and_expired(tmp_path):
+    memo = SummaryMemo(str(tmp_path / "summaries.db"), ttl=60)
+    memo.put("summary:x", "one", content_hash="a")
+    memo.put("summary:x", "two", content_hash="b")
+    memo.put("summary:y", "other", content_hash="c")
+    assert memo.get_many("summary:x", ["a", "b", "c", "d"]) == {"a": "one", "b": "two"}
+    memo.ttl = 0
+    time.sleep(0.01)
+    assert memo.get_many("summary:x", ["a"]) == {}
+
+
+def test_racing_threads_share_one_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(SummaryMemo, "_default", None)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    start = threading.Barrier(16)
+    seen = []
+
+    def worker():
+        start.wait()
+        seen.append(SummaryMemo.default())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(memo) for memo in seen}) == 1
+    seen[0].close()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.fetch import Fetcher
+from src.modules.metrics import FeedTiming, Histogram, Metrics
+from src.modules.rss import Feed
+
+RSS = b"""<rss><channel><title>T</title>
+<item><title>One</title><link>https://example.com/1</link></item>
+<item><title>Two</title><link>https://example.com/2</link></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def server(serve):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            body = RSS if self.path == "/rss" else b""
+            self.send_response(200 if body else 404)
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return serve(Handler)
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(Metrics, "_default", metrics)
+    monkeypatch.setattr(Fetcher, "_default", Fetcher())
+    return metrics
+
+
+def test_histogram_buckets_quantiles_and_prometheus_text():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1 and histogram.quantile(1.0) == 3.0
+    lines = histogram.to_prometheus("x")
+    assert 'x_bucket{le="1.0"} 3' in lines and 'x_bucket{le="+Inf"} 4' in lines
+    assert "x_count 4" in lines
+
+
+def test_fetches_record_timings_and_errors(server, metrics):
+    Feed("Good", server, f"{server}/rss", "-").fetch_posts()
+    with pytest.raises(Exception):
+        Feed("Gone", server, f"{server}/gone", "-").fetch_posts()
+    Feed("Again", server, f"{server}/rss", "-").fetch_posts()
+
+    timing = metrics.feeds[f"{server}/rss"]
+    assert timing.entries == 2 and timing.nbytes == len(RSS)
+    assert timing.ttfb > 0 and timing.parse > 0 and timing.error is None
+    # the second fetch reused the pooled connection
+    assert timing.connect == 0.0
+    assert metrics.histograms["fetch_connect_seconds"].max > 0
+    assert metrics.feeds[f"{server}/gone"].error == "HTTPError"
+    assert metrics.errors == {"HTTPError": 1}
+    assert metrics.histograms["feed_entries"].count == 2
+
+
+def test_summary_lines_and_dumps(tmp_path, metrics):
+    slow = FeedTiming("Slow", "https://a/rss")
+    fast = FeedTiming("Fast", "https://b/rss")
+    slow.ttfb, fast.ttfb = 2.0, 0.1
+    metrics.record_fetch(slow)
+    metrics.record_fetch(fast)
+    metrics.record_frame(0.003)
+    lines = metrics.lines(3)
+    assert lines[0].startswith("2 feeds, 2 fetched") and "frame p50 3.0ms" in lines[0]
+    assert "Slow" in lines[1] and "Fast" in lines[2]
+
+    metrics.dump(str(tmp_path / "m.json"))
+    data = json.loads((tmp_path / "m.json").read_text())
+    assert data["histograms"]["frame_seconds"]["count"] == 1
+    assert {feed["title"] for feed in data["feeds"]} == {"Slow", "Fast"}
+    metrics.dump(str(tmp_path / "m.prom"))
+    text = (tmp_path / "m.prom").read_text()
+    assert "# TYPE myeditorial_fetch_ttfb_seconds histogram" in text
+    assert 'myeditorial_feed_seconds{feed="https://a/rss"} 2.0' in text
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import calendar
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.fetch import Fetcher
+from src.modules.rss import Feed, parse_json_feed
+
+RSS = """<rss><channel><title>T</title>
+<item><title>Café</title><link>/posts/1</link>
+<description>&lt;a href="../about"&gt;About&lt;/a&gt;</description></item>
+</channel></rss>""".encode("latin-1")
+JSON_FEED = json.dumps(
+    {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": "J",
+        "items": [
+            {
+                "id": 7,
+                "url": "/posts/7",
+                "title": "Seven",
+                "content_text": "Fish & chips",
+                "date_published": "2024-05-01T12:00:00Z",
+            },
+            {
+                "id": "8",
+                "title": "Eight",
+                "summary": "Short",
+                "content_html": "<p>Long</p>",
+            },
+        ],
+    }
+).encode()
+
+
+@pytest.fixture
+def server(serve, monkeypatch):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            if self.path.endswith(".json"):
+                body, kind = JSON_FEED, "application/feed+json"
+            else:
+                # the body declares no encoding, only the header does
+                body, kind = RSS, "application/rss+xml; charset=latin-1"
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    monkeypatch.setattr(Fetcher, "_default", Fetcher())
+    return serve(Handler)
+
+
+def test_relative_links_resolve_against_the_feed_url(server):
+    (post,) = Feed("T", server, f"{server}/news/rss", "-").fetch_posts()
+    assert post.title == "Café"
+    assert post.link == f"{server}/posts/1"
+    assert f'href="{server}/about"' in post.description
+
+
+def test_json_feeds_are_read(server):
+    seven, eight = Feed("J", server, f"{server}/feed.json", "-").fetch_posts()
+    assert (seven.guid, seven.link, seven.title) == ("7", f"{server}/posts/7", "Seven")
+    assert seven.description == seven.body == "Fish &amp; chips"
+    assert seven.published == calendar.timegm((2024, 5, 1, 12, 0, 0))
+    assert (eight.description, eight.body) == ("Short", "<p>Long</p>")
+    # anything else is left to feedparser
+    assert parse_json_feed(b'{"items": []}', server) is None
+    assert parse_json_feed(RSS, server) is None
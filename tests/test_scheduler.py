@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import time
+from email.utils import formatdate
+
+import requests
+
+from src.modules.cache import CachedResponse
+from src.modules.rss import Feed, Post, publisher_interval
+from src.modules.scheduler import FeedSchedule, RefreshScheduler, retry_after
+
+
+class _NullLoader:
+    def refresh(self, feeds, on_done=None):
+        pass
+
+
+def _feed(gap: float, count: int = 10) -> Feed:
+    feed = Feed("Example", "https://example.com", "https://example.com/rss", "blurb")
+    feed.posts = [
+        Post(str(i), f"https://example.com/{i}", "", published=i * gap)
+        for i in range(count)
+    ]
+    return feed
+
+
+def _scheduler(feed: Feed) -> RefreshScheduler:
+    return RefreshScheduler([feed], _NullLoader(), jitter=0)
+
+
+def test_busy_feed_polls_often():
+    feed = _feed(gap=10 * 60)
+    scheduler = _scheduler(feed)
+    assert scheduler.next_interval(scheduler.schedules[id(feed)]) == 5 * 60
+
+
+def test_quiet_feed_drops_to_max_interval():
+    feed = _feed(gap=3 * 86400)
+    scheduler = _scheduler(feed)
+    assert scheduler.next_interval(scheduler.schedules[id(feed)]) == 6 * 3600
+
+
+def test_publisher_hint_is_a_floor():
+    feed = _feed(gap=10 * 60)
+    feed.update_hint = 3600
+    scheduler = _scheduler(feed)
+    assert scheduler.next_interval(scheduler.schedules[id(feed)]) == 3600
+
+
+def test_failures_back_off_and_honour_retry_after():
+    feed = _feed(gap=10 * 60)
+    scheduler = _scheduler(feed)
+    schedule: FeedSchedule = scheduler.schedules[id(feed)]
+    schedule.interval = 600
+
+    scheduler._refreshed(feed, requests.ConnectionError())
+    assert schedule.failures == 1
+    assert schedule.next_due - time.time() > 1000
+
+    response = CachedResponse(feed.feed_link, 429, b"", {"Retry-After": "7200"})
+    scheduler._refreshed(feed, requests.HTTPError(response=response))
+    assert schedule.failures == 2
+    assert schedule.next_due - time.time() > 7000
+
+    scheduler._refreshed(feed, None)
+    assert schedule.failures == 0
+
+
+def test_retry_after_is_seconds_or_an_http_date():
+    def error(value: str, status: int = 503) -> requests.HTTPError:
+        response = CachedResponse("https://example.com", status, b"", {})
+        response.headers["Retry-After"] = value
+        return requests.HTTPError(response=response)
+
+    assert retry_after(error("120")) == 120
+    assert 3590 < retry_after(error(formatdate(time.time() + 3600, usegmt=True)))
+    assert retry_after(error(formatdate(time.time() - 60, usegmt=True))) == 0
+    assert retry_after(error("soon")) is None
+    assert retry_after(error("120", status=500)) is None
+
+
+def test_publisher_interval():
+    assert publisher_interval({"ttl": "60"}) == 3600
+    assert (
+        publisher_interval({"sy_updateperiod": "daily", "sy_updatefrequency": "4"})
+        == 21600
+    )
+    assert publisher_interval({}) is None
+
+
+def test_run_due_hands_due_feeds_to_loader():
+    refreshed = []
+
+    class _Loader:
+        def refresh(self, feeds, on_done=None):
+            refreshed.extend(feeds)
+
+    feed = _feed(gap=10 * 60)
+    scheduler = RefreshScheduler([feed], _Loader(), jitter=0)
+    assert scheduler.run_due() > 0 and not refreshed
+
+    scheduler.refresh_now(feed)
+    scheduler.run_due()
+    assert refreshed == [feed]
+    assert scheduler.schedules[id(feed)].in_flight
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import numpy as np
+
+from src.modules.loader import FeedLoader
+from src.modules.rss import Feed, Post
+from src.modules.sentiment import SentimentScorer
+from src.modules.store import ArticleStore
+
+
+def _post(title: str, description: str = "") -> Post:
+    return Post(title, f"https://example.com/{title}", description)
+
+
+def test_batch_scores_sign_and_bounds():
+    scores = SentimentScorer().score_texts(
+        [
+            "Rescuers celebrate as miners rescued after great success",
+            "Deadly flood kills dozens in worst disaster in decades",
+            "Council publishes meeting minutes",
+            "",
+        ]
+    )
+    assert scores[0] > 0.5 and scores[1] < -0.5
+    assert scores[2] == 0 and scores[3] == 0
+    assert np.all(np.abs(scores) <= 1)
+
+
+def test_negation_flips_only_within_the_post():
+    scorer = SentimentScorer()
+    plain, negated, next_post = scorer.score_texts(
+        ["a good result", "not a good result", "good result"]
+    )
+    assert plain > 0 > negated
+    # a negator at the end of one post does not reach into the next
+    assert scorer.score_texts(["never", "good result"])[1] == next_post
+
+
+def test_each_post_scored_once_and_cached_by_content():
+    scorer = SentimentScorer()
+    first = [_post("Team wins title"), _post("Markets crash")]
+    scorer.score(first)
+    assert first[0].sentiment > 0 > first[1].sentiment
+    assert len(scorer) == 2
+
+    # the same content arriving again (a refresh or the store) is a cache hit
+    again = [_post("Team wins title")]
+    scorer.score_texts = None  # scoring again would fail
+    scorer.score(again)
+    assert again[0].sentiment == first[0].sentiment
+
+
+def test_mood_aggregates_and_trends():
+    posts = [_post(str(i)) for i in range(20)]
+    for i, post in enumerate(posts):
+        post.sentiment = 0.5 if i < 10 else -0.5
+    mood = SentimentScorer.mood(posts)
+    assert mood.mean == 0 and mood.recent == 0.5 and mood.trend == "up"
+    assert str(mood) == "mood +0.00^"
+    assert SentimentScorer.mood([_post("unscored")]) is None
+
+
+def test_loader_scores_restored_posts(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    feed = Feed("Example", "https://example.com", "https://example.com/rss", "-")
+    store.upsert_posts(feed, [_post("Team wins title")])
+    # a fresh scorer has an empty cache, which must not read as "no scorer"
+    loader = FeedLoader(store=store, sentiment=SentimentScorer())
+    loader.restore([feed])
+    assert feed.posts[0].sentiment > 0
+    assert feed.mood is not None and feed.mood.scored == 1
+    loader.shutdown()
+    store.close()
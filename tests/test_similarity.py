@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import time
+
+from src.modules.rss import Feed, Post
+from src.modules.similarity import SimilarityIndex, features
+
+
+def _feed(name: str) -> Feed:
+    return Feed(name, f"https://{name}.example", f"https://{name}.example/rss", "-")
+
+
+def _post(feed: Feed, n: int, title: str, text: str) -> Post:
+    return Post(
+        title, f"{feed.website_link}/{n}", f"<p>{text}</p>", published=time.time()
+    )
+
+
+BBC, CNN, GUARDIAN = _feed("bbc"), _feed("cnn"), _feed("guardian")
+
+
+def _index() -> SimilarityIndex:
+    index = SimilarityIndex()
+    index.add(
+        BBC,
+        [
+            _post(
+                BBC,
+                1,
+                "Earthquake strikes central Turkey, killing dozens",
+                "A magnitude 7.1 earthquake hit central Turkey on Monday, killing at "
+                "least 40 people and collapsing buildings.",
+            ),
+            _post(
+                BBC,
+                2,
+                "Bank of England holds interest rates at 5%",
+                "The Bank of England kept interest rates unchanged as inflation eased.",
+            ),
+        ],
+    )
+    index.add(
+        CNN,
+        [
+            _post(
+                CNN,
+                1,
+                "Deadly earthquake hits Turkey",
+                "Dozens are dead after a powerful earthquake struck central Turkey, "
+                "with rescuers searching collapsed buildings.",
+            ),
+            _post(
+                CNN,
+                2,
+                "Apple unveils new iPhone",
+                "Apple announced a new iPhone with a faster chip.",
+            ),
+        ],
+    )
+    index.add(
+        GUARDIAN,
+        [
+            _post(
+                GUARDIAN,
+                1,
+                "Turkey earthquake: death toll rises as rescuers search rubble",
+                "The death toll from the earthquake in central Turkey has risen.",
+            ),
+        ],
+    )
+    return index
+
+
+def test_same_event_clusters_across_feeds():
+    stories = _index().stories()
+    assert len(stories) == 1
+    assert stories[0].sources == 3
+    assert all("Turkey" in post.title for post in stories[0].posts)
+
+
+def test_similar_ranks_same_story_first():
+    index = _index()
+    similar = index.similar(index.posts[0], BBC, k=3)
+    assert [feed for _, feed, _ in similar[:2]] == [CNN, GUARDIAN]
+    assert similar[0][2] > index.threshold
+
+
+def test_adding_is_incremental_and_idempotent():
+    index = SimilarityIndex(capacity=2)
+    posts = [_post(BBC, n, f"headline {n} about topic{n}", "text") for n in range(5)]
+    index.add(BBC, posts[:3])
+    before = index.vectors[:3].copy()
+    assert index.add(BBC, posts) == index.story_of[3:]
+    assert len(index) == 5
+    # rows already indexed are never rewritten when the matrix grows
+    assert (index.vectors[:3] == before).all()
+    assert index.add(BBC, posts) == []
+
+
+def test_old_posts_are_left_out():
+    index = SimilarityIndex(max_age=3600)
+    post = Post("old news", "https://bbc.example/old", "", published=0)
+    assert index.add(BBC, [post]) == [] and len(index) == 0
+
+
+def test_full_index_evicts_the_oldest_and_keeps_stories_whole():
+    index = SimilarityIndex(capacity=2, max_posts=10)
+    now = time.time() - 60
+    old = [
+        Post(
+            f"story {n} topic{n}",
+            f"https://bbc.example/archive/{n}",
+            "",
+            published=now - n,
+        )
+        for n in range(6)
+    ]
+    index.add(BBC, old)
+    news = _index()
+    for feed in (BBC, CNN, GUARDIAN):
+        index.add(feed, [p for p, f in zip(news.posts, news.feeds) if f is feed])
+    assert len(index) <= 10 and len(index.vectors) <= 10
+    # the two newest of the first batch survived, the rest went
+    assert [post.title for post in index.posts[:2]] == [
+        "story 0 topic0",
+        "story 1 topic1",
+    ]
+    assert index.add(BBC, old) == []
+    assert sorted(row for rows in index.members for row in rows) == list(
+        range(len(index))
+    )
+    stories = index.stories()
+    assert len(stories) == 1 and stories[0].sources == 3
+
+
+def test_title_terms_weigh_double():
+    counts = features("Markets rally", "markets closed higher")
+    assert counts["market"] == 3.0 and counts["rally"] == 2.0
+    assert counts["market rally"] == 1.0
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import subprocess
+import sys
+
+import pytest
+
+from src.modules.layout import plain_text
+from src.modules.rss import Feed, Post
+from src.modules.snapshot import PREVIEW, SessionSnapshot
+
+
+@pytest.fixture
+def feeds():
+    def make(n):
+        site = f"https://{n}.example.com"
+        return Feed(f"Feed {n}", site, f"{site}/rss", "")
+
+    return [make(n) for n in range(3)]
+
+
+def test_round_trip_restores_posts_descriptions_and_selection(tmp_path, feeds):
+    feeds[0].description = "About feed 0"
+    feeds[0].posts = [
+        Post("One", "https://0.example.com/1", "x" * 500, published=2.0, read=True),
+        Post("Two", "https://0.example.com/2", "short", guid="id-2", published=1.0),
+    ]
+    feeds[0].posts[1].summary = "A summary"
+    feeds[2].posts = []
+    snapshot = SessionSnapshot(str(tmp_path / "session.snapshot"), posts_per_feed=2)
+    snapshot.save(feeds, selected=2)
+
+    fresh = [Feed(feed.title, feed.website_link, feed.feed_link, "") for feed in feeds]
+    assert snapshot.restore(fresh) == 2
+    one, two = fresh[0].posts
+    assert fresh[0].description == "About feed 0"
+    assert (one.title, one.link, one.read) == ("One", "https://0.example.com/1", True)
+    assert one.guid == one.link
+    assert one.description == "x" * PREVIEW
+    assert (two.guid, two.published, two.summary) == ("id-2", 1.0, "A summary")
+    # feeds the last session never loaded are left to load as usual
+    assert not fresh[1].posts_value.done() and fresh[1].needs_description()
+
+
+def test_previews_are_plain_text(tmp_path, feeds):
+    feeds[0].posts = [
+        Post("One", "https://0.example.com/1", "<p>Fish &amp; <b>chips</b></p>" * 50)
+    ]
+    snapshot = SessionSnapshot(str(tmp_path / "session.snapshot"))
+    snapshot.save(feeds)
+    snapshot.restore(feeds)
+    (one,) = feeds[0].posts
+    assert one.description.startswith("Fish &amp; chips  Fish")
+    assert "<" not in one.description and len(plain_text(one.description)) == PREVIEW
+
+
+def test_restore_clamps_selection_and_ignores_bad_files(tmp_path, feeds):
+    path = tmp_path / "session.snapshot"
+    snapshot = SessionSnapshot(str(path))
+    assert snapshot.restore(feeds) is None
+
+    snapshot.save(feeds, selected=2)
+    assert snapshot.restore(feeds[:1]) == 0
+
+    path.write_bytes(b"not a snapshot")
+    assert snapshot.restore(feeds) is None
+
+
+def test_startup_imports_stay_light():
+    code = (
+        "import sys, main, src.modules.rss, src.modules.snapshot, src.modules.ui\n"
+        "print(sorted({'bs4', 'feedparser', 'requests', 'numpy'} & set(sys.modules)))"
+    )
+    done = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert done.stdout.strip() == "[]"
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+import sqlite3
+
+import pytest
+
+from src.modules.rss import Feed, Post
+from src.modules.store import ArticleStore, match_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def feed():
+    return Feed("Example", "https://example.com", "https://example.com/rss", "blurb")
+
+
+def test_upsert_dedups_by_guid(store, feed):
+    posts = [
+        Post(f"post {i}", f"https://example.com/{i}", "", published=i) for i in range(3)
+    ]
+    assert store.upsert_posts(feed, posts) == (3, 0)
+    assert store.upsert_posts(feed, posts) == (0, 0)
+
+    posts[0].title = "post 0, corrected"
+    posts.append(Post("post 3", "https://example.com/3", "", published=3))
+    assert store.upsert_posts(feed, posts) == (1, 1)
+
+    stored = store.posts_for_feed(feed)
+    assert [post.title for post in stored] == [
+        "post 3",
+        "post 2",
+        "post 1",
+        "post 0, corrected",
+    ]
+
+
+def test_history_outlives_feed_window(store, feed):
+    store.upsert_posts(feed, [Post("old", "https://example.com/old", "", published=1)])
+    store.upsert_posts(feed, [Post("new", "https://example.com/new", "", published=2)])
+    assert [post.title for post in store.posts_for_feed(feed)] == ["new", "old"]
+
+
+def test_read_state(store, feed):
+    posts = [
+        Post(f"post {i}", f"https://example.com/{i}", "", published=i) for i in range(3)
+    ]
+    store.upsert_posts(feed, posts)
+    store.mark_read(feed, posts[1])
+    assert store.unread_count(feed) == 2
+    assert [post.title for post in store.posts_for_feed(feed, unread_only=True)] == [
+        "post 2",
+        "post 0",
+    ]
+    assert [post.read for post in store.posts_for_feed(feed)] == [False, True, False]
+
+
+def test_recent_posts_across_feeds(store, feed):
+    other = Feed("Other", "https://other.org", "https://other.org/rss", "blurb")
+    store.upsert_posts(feed, [Post("a", "https://example.com/a", "", published=10)])
+    store.upsert_posts(other, [Post("b", "https://other.org/b", "", published=20)])
+    assert [post.title for post in store.recent_posts(since=5)] == ["b", "a"]
+    assert [post.title for post in store.recent_posts(since=15)] == ["b"]
+
+
+def test_search_ranks_title_hits_across_feeds(store, feed):
+    other = Feed("Other", "https://other.org", "https://other.org/rss", "blurb")
+    store.upsert_posts(
+        feed,
+        [
+            Post("Weather", "https://example.com/1", "<p>storms and <b>rain</b></p>"),
+            Post("Rain returns", "https://example.com/2", "<p>more of it</p>"),
+        ],
+    )
+    store.upsert_posts(
+        other, [Post("Markets", "https://other.org/1", "", body="<p>rainy days</p>")]
+    )
+
+    hits = store.search("rain")
+    assert [hit.post.title for hit in hits] == ["Rain returns", "Weather", "Markets"]
+    assert hits[2].title == "Other: Markets"
+    # markup is not indexed
+    assert store.search("href b") == []
+
+
+def test_search_follows_edits(store, feed):
+    post = Post("Old headline", "https://example.com/1", "")
+    store.upsert_posts(feed, [post])
+    post.title = "New headline"
+    store.upsert_posts(feed, [post])
+    assert store.search("old") == []
+    assert [hit.post.title for hit in store.search("new head")] == ["New headline"]
+
+
+def test_match_query_is_literal():
+    assert match_query('AND "quoted" NEAR(') == '"AND" """quoted""" "NEAR("'
+    assert match_query("climate cha") == '"climate" "cha"*'
+    assert match_query("climate c") == '"climate" "c"'
+    assert match_query("  ") == ""
+
+
+def test_index_is_built_for_older_databases(tmp_path, feed):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE feeds (id INTEGER PRIMARY KEY, feed_link TEXT NOT NULL UNIQUE, "
+        "title TEXT NOT NULL DEFAULT '', website_link TEXT NOT NULL DEFAULT '', "
+        "description TEXT NOT NULL DEFAULT '', refreshed_at REAL);"
+        "CREATE TABLE posts (id INTEGER PRIMARY KEY, feed_id INTEGER NOT NULL, "
+        "guid TEXT NOT NULL, title TEXT NOT NULL DEFAULT '', "
+        "link TEXT NOT NULL DEFAULT '', description TEXT NOT NULL DEFAULT '', "
+        "published REAL NOT NULL, first_seen REAL NOT NULL, "
+        "updated_at REAL NOT NULL, content_hash TEXT NOT NULL, "
+        "read INTEGER NOT NULL DEFAULT 0, UNIQUE (feed_id, guid));"
+        "INSERT INTO feeds (id, feed_link, title) VALUES (1, 'x', 'Old');"
+        "INSERT INTO posts VALUES (1, 1, 'g', 'Archived story', '', '', 0, 0, 0, '', 0);"
+    )
+    conn.commit()
+    conn.close()
+
+    store = ArticleStore(path)
+    assert [hit.post.title for hit in store.search("archived")] == ["Archived story"]
+    store.close()
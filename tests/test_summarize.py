@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.modules.fetch import Fetcher
+from src.modules.memo import SummaryMemo
+from src.modules.rss import Post
+from src.modules.summarize import (
+    ExtractiveBackend,
+    HTTPBackend,
+    SummaryBackend,
+    SummaryPipeline,
+    TokenBucket,
+)
+
+
+class StubSummaryServer:
+    """A local stand-in for a summarization API that records every request"""
+
+    def __init__(self, serve) -> None:
+        self.requests: list[dict] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(body)
+                reply = json.dumps(
+                    {
+                        "summaries": [
+                            f"summary of {text.splitlines()[0]}"
+                            for text in body["inputs"]
+                        ]
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+        self.url = f"{serve(Handler)}/summarize"
+
+
+@pytest.fixture
+def stub(serve):
+    return StubSummaryServer(serve)
+
+
+def _pipeline(stub, tmp_path, **kwargs) -> SummaryPipeline:
+    backend = HTTPBackend(stub.url, fetcher=Fetcher())
+    memo = SummaryMemo(str(tmp_path / "summaries.db"))
+    return SummaryPipeline(backend, memo, **kwargs)
+
+
+def _post(n: int, text: str = "") -> Post:
+    return Post(f"Post {n}", f"https://example.com/{n}", text or f"About {n}.")
+
+
+def test_extractive_keeps_the_central_sentences():
+    text = (
+        "The council approved the new bridge budget. "
+        "Weather was mild. "
+        "The bridge budget covers repairs to the old bridge."
+    )
+    summary = ExtractiveBackend.summarize_one(text, max_words=16)
+    assert "bridge budget" in summary and "Weather" not in summary
+    assert len(ExtractiveBackend.summarize_one(text * 20, 30).split()) <= 31
+
+
+def test_batches_dedups_and_persists(stub, tmp_path):
+    pipeline = _pipeline(stub, tmp_path, batch_size=3)
+    posts = [_post(n) for n in range(7)]
+    # the same story carried by a second feed is summarized once
+    copy = _post(0)
+    pipeline.summarize_posts(posts + [copy])
+    assert pipeline.flush(timeout=5)
+    assert [len(request["inputs"]) for request in stub.requests] == [3, 3, 1]
+    assert posts[0].summary == copy.summary == "summary of Post 0"
+    pipeline.close()
+
+    # a restart answers from the memo without calling the service
+    again = _pipeline(stub, tmp_path)
+    fresh = [_post(n) for n in range(7)]
+    again.summarize_posts(fresh)
+    assert all(post.summary for post in fresh)
+    assert again.flush(timeout=5) and len(stub.requests) == 3
+    again.close()
+
+
+def test_digest_is_written_in_the_background(stub, tmp_path):
+    pipeline = _pipeline(stub, tmp_path)
+    posts = [_post(n) for n in range(3)]
+    assert pipeline.digest(posts) is None
+    assert pipeline.flush(timeout=5)
+    assert pipeline.digest(posts).startswith("summary of")
+    assert pipeline.digest([]) == ""
+    pipeline.close()
+
+
+def test_digest_is_written_once_per_set_of_posts(tmp_path):
+    class Gated(SummaryBackend):
+        name = "gated"
+
+        def __init__(self) -> None:
+            self.gate = threading.Event()
+            self.inputs: list[str] = []
+
+        def summarize(self, texts: list[str], max_words: int) -> list[str]:
+            self.gate.wait(5)
+            self.inputs.extend(texts)
+            return [f"summary of {text.splitlines()[0]}" for text in texts]
+
+    backend = Gated()
+    pipeline = SummaryPipeline(backend, SummaryMemo(str(tmp_path / "s.db")))
+    # keep the worker busy so the digests below wait in the queue
+    pipeline.summarize_posts([_post(99)])
+    first, second = [_post(n) for n in range(3)], [_post(n) for n in range(3, 6)]
+    assert pipeline.digest(first) is None
+    assert pipeline.digest(second) is None
+    backend.gate.set()
+    assert pipeline.flush(timeout=5)
+    # the first digest was superseded before it ran
+    assert [text.splitlines()[0] for text in backend.inputs] == [
+        "Post 99",
+        "Post 3: About 3.",
+    ]
+    # summaries arriving later do not make it a new digest
+    for post in second:
+        post.summary = "Changed"
+    assert pipeline.digest(second) == "summary of Post 3: About 3."
+    assert pipeline.flush(timeout=5) and len(backend.inputs) == 2
+    pipeline.close()
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.delay(60) == 0
+    bucket.take(60)
+    # one unit a second, so ten units are about ten seconds away
+    assert 9.5 < bucket.delay(10) <= 10
+    # more than a minute's budget waits for a full bucket, not forever
+    assert bucket.delay(1000) <= 60
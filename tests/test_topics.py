@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import os
+
+from src.modules.rss import Post
+from src.modules.topics import TopicFilter, TopicMatcher, read_topics
+
+
+def test_csv_lines_hold_any_number_of_keywords(tmp_path):
+    path = tmp_path / "topics.csv"
+    path.write_text(
+        "# comment\n"
+        "climate,climate change,heatwave\n"
+        "\n"
+        "NASA\n"
+        "climate,wildfire\n"
+    )
+    assert read_topics(str(path)) == {
+        "climate": ["climate change", "heatwave", "wildfire"],
+        "NASA": ["NASA"],
+    }
+
+
+def test_matches_whole_words_case_folded():
+    matcher = TopicMatcher({"ai": ["AI", "machine learning"], "he": ["he", "hers"]})
+    assert matcher.match("New ai chips") == {"ai"}
+    assert matcher.match("She said so") == frozenset()
+    assert matcher.match("MACHINE\n  learning, again") == {"ai"}
+    # overlapping keywords are all found through failure links
+    assert matcher.match("ushers hers") == {"he"}
+
+
+def test_reload_swaps_in_new_topics(tmp_path):
+    path = tmp_path / "topics.csv"
+    path.write_text("space,rocket\n")
+    topics = TopicFilter(str(path))
+    post = Post("Rocket launch delayed", "https://example.com/1", "<p>Budget cuts</p>")
+    topics.tag([post])
+    assert post.topics == {"space"}
+    assert not topics.reload_if_changed()
+
+    path.write_text("space,rocket\neconomy,budget cuts\n")
+    os.utime(path, (1, 1))
+    assert topics.reload_if_changed()
+    topics.tag([post])
+    assert post.topics == {"space", "economy"}
+
+
+def test_unread_counts():
+    posts = [Post(str(i), f"https://example.com/{i}", "") for i in range(3)]
+    posts[0].topics = frozenset({"space", "economy"})
+    posts[1].topics = frozenset({"space"})
+    posts[2].topics = frozenset({"space"})
+    posts[2].read = True
+    assert TopicFilter.unread_counts(posts) == {"space": 2, "economy": 1}
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import curses
+
+from src.modules.rss import Feed
+from src.modules.ui import FeedView, Pane
+
+
+class _Window:
+    """Records what a Pane writes instead of drawing it"""
+
+    def __init__(self, *args) -> None:
+        self.written: list[tuple[int, str]] = []
+        self.erased = 0
+
+    def box(self) -> None:
+        pass
+
+    def erase(self) -> None:
+        self.erased += 1
+
+    def addstr(self, y: int, x: int, text: str, *attributes) -> None:
+        self.written.append((y, text))
+
+    def noutrefresh(self) -> None:
+        pass
+
+
+def _frame(pane: Pane, lines: list[str]) -> list[tuple[int, str]]:
+    pane.window.written.clear()
+    pane.clear()
+    for row, line in enumerate(lines):
+        pane.add_text(row + 1, 1, line)
+    pane.refresh()
+    return pane.window.written
+
+
+def _feed() -> Feed:
+    return Feed("Example", "https://example.com", "https://example.com/rss", "")
+
+
+def test_description_shows_loading_then_the_result_or_the_failure():
+    feed = _feed()
+    assert FeedView.description_text(feed) == "Loading..."
+    # reading the placeholder must not start the fetch on the render thread
+    assert not feed.description_value.started()
+    feed.description = "About example"
+    assert FeedView.description_text(feed) == "About example"
+
+    failed = _feed()
+
+    def fail() -> str:
+        raise OSError("offline")
+
+    failed.description_value.run(fail)
+    assert FeedView.description_text(failed) == "Unable to fetch summary from website"
+
+
+def test_pane_redraws_only_the_rows_that_changed(monkeypatch):
+    monkeypatch.setattr(curses, "newwin", _Window)
+    pane = Pane(6, 12, 0, 0)
+    blank = " " * 10
+    # the first frame is drawn whole onto an erased window
+    assert _frame(pane, ["one", "two", "three"]) == [
+        (1, "one"),
+        (2, "two"),
+        (3, "three"),
+    ]
+    assert pane.window.erased == 1
+    assert _frame(pane, ["one", "two", "three"]) == []
+    # a changed row is blanked and rewritten, and a row no longer drawn is blanked
+    assert _frame(pane, ["one", "2"]) == [(2, blank), (2, "2"), (3, blank)]
+    # after a resize everything is repainted, whether it changed or not
+    pane.invalidate()
+    assert _frame(pane, ["one", "2"]) == [(1, "one"), (2, "2")]
+    assert pane.window.erased == 2